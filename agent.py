@@ -3,43 +3,25 @@ Email Agent - Email reading and management with memory
 
 Purpose: Read, search, and manage your email inbox (Gmail and/or Outlook)
 Pattern: Use ConnectOnion email tools + Memory system + Calendar + Shell + Plugins
+
+Nothing is built at import time. The shared tools, the provider tools, the
+crm-init sub-agent and the main agent are created the first time something
+needs them (get_agent(), get_email_tool(), or any attribute of `agent`), so
+`email --help` and other simple commands start fast.
 """
 
+import atexit
 import os
-from connectonion import Agent, Memory, WebFetch, Shell, TodoList
-from connectonion.useful_plugins import re_act, gmail_plugin, calendar_plugin
+from functools import cache
 
+from tools.lazy import Lazy
 
-# Create shared tool instances
-memory = Memory(memory_file="data/memory.md")
-web = WebFetch()  # For analyzing contact domains
-shell = Shell()  # For running shell commands (e.g., get current date)
-todo = TodoList()  # For tracking multi-step tasks
 
 # Build tools list based on .env flags
 # Note: Only one email provider at a time (tools have overlapping method names)
 has_gmail = os.getenv("LINKED_GMAIL", "").lower() == "true"
 has_outlook = os.getenv("LINKED_OUTLOOK", "").lower() == "true"
 
-tools = []
-plugins = [re_act]
-
-# Prefer Gmail if both are linked (can only use one due to method name conflicts)
-if has_gmail:
-    from connectonion import Gmail, GoogleCalendar
-    tools.append(Gmail())
-    tools.append(GoogleCalendar())
-    plugins.append(gmail_plugin)
-    plugins.append(calendar_plugin)
-elif has_outlook:
-    from connectonion import Outlook, MicrosoftCalendar
-    tools.append(Outlook())
-    tools.append(MicrosoftCalendar())
-
-# Warn if no email provider configured
-if not tools:
-    print("\n⚠️  No email account connected. Use /link-gmail or /link-outlook to connect.\n")
-
 # Select prompt based on linked provider
 if has_gmail:
     system_prompt = "prompts/gmail_agent.md"
@@ -48,15 +30,224 @@ elif has_outlook:
 else:
     system_prompt = "prompts/gmail_agent.md"  # Default
 
-# Create init sub-agent for CRM database setup
-init_crm = Agent(
-    name="crm-init",
-    system_prompt="prompts/crm_init.md",
-    tools=tools + [memory, web],
-    max_iterations=30,
-    model="co/claude-sonnet-4-5",
-    log=False  # Don't create separate log file
-)
+
+@cache
+def get_parallel_calls():
+    """Pool that runs a turn's independent read-only tool calls together, or None (PARALLEL_TOOLS=false)."""
+    if os.getenv("PARALLEL_TOOLS", "true").lower() == "false":
+        return None
+    from tools.parallel_calls import ParallelCalls
+    return ParallelCalls(
+        provider_limit=int(os.getenv("PROVIDER_CONCURRENCY", "4")),  # Provider API calls in flight at once
+        timeout=float(os.getenv("TOOL_TIMEOUT", "30")),
+    )
+
+
+@cache
+def get_rate_limiter():
+    """Process-wide, quota-weighted limits on provider API requests, or None (RATE_LIMIT=false)."""
+    if os.getenv("RATE_LIMIT", "true").lower() == "false":
+        return None
+    from tools.rate_limit import RateLimiter, QUOTAS
+    quotas = {}
+    if os.getenv("GMAIL_QUOTA"):  # Gmail quota units per second
+        quotas["gmail"] = (float(os.getenv("GMAIL_QUOTA")), float(os.getenv("GMAIL_QUOTA")))
+    if os.getenv("GRAPH_QUOTA"):  # Graph requests per second per mailbox
+        quotas["graph"] = (float(os.getenv("GRAPH_QUOTA")), QUOTAS["graph"][1])
+    if os.getenv("CRM_INIT_RATE"):  # LLM and web calls per second during a parallel CRM init
+        quotas["crm_init"] = (float(os.getenv("CRM_INIT_RATE")), float(os.getenv("CRM_INIT_RATE")))
+    return RateLimiter(quotas)
+
+
+@cache
+def get_briefing_cache():
+    """Last /today briefing, reused or extended while the day's mail is unchanged (TODAY_CACHE=false to disable)."""
+    if os.getenv("TODAY_CACHE", "true").lower() == "false":
+        return None
+    from tools.briefing_cache import BriefingCache
+    return BriefingCache()
+
+
+@cache
+def get_precomputed():
+    """Results the precompute worker stored for /today and /unanswered (data/precomputed.json)."""
+    from tools.precompute import Precomputed
+    return Precomputed()
+
+
+@cache
+def get_shared_tools() -> dict:
+    """Tool instances shared by the main agent and the crm-init sub-agent."""
+    from connectonion import Memory, WebFetch, Shell, TodoList
+
+    memory = Memory(memory_file="data/memory.md")
+    # Keyed, append-only storage behind the same memory tools (MEMORY_STORE=false to disable)
+    if os.getenv("MEMORY_STORE", "true").lower() != "false":
+        from tools.memory_store import MemoryStore
+        MemoryStore(legacy_file=memory.memory_file).attach(memory)
+
+    web = WebFetch()  # For analyzing contact domains
+    # Keep analyze_page results per domain across runs (WEB_CACHE=false to disable)
+    if os.getenv("WEB_CACHE", "true").lower() != "false":
+        from tools.web_cache import DomainCache
+        DomainCache().attach(web)
+
+    # Memory reads run alongside provider reads of the same turn (PARALLEL_TOOLS=false to disable)
+    parallel = get_parallel_calls()
+    if parallel:
+        parallel.attach(memory, provider=False)
+
+    return {
+        "memory": memory,
+        "web": web,
+        "shell": Shell(),  # For running shell commands (e.g., get current date)
+        "todo": TodoList(),  # For tracking multi-step tasks
+    }
+
+
+@cache
+def get_provider_tools() -> list:
+    """Email and calendar tools for the linked provider (SDKs are imported here)."""
+    provider_tools = []
+
+    # Prefer Gmail if both are linked (can only use one due to method name conflicts)
+    if has_gmail:
+        from connectonion import Gmail, GoogleCalendar
+        provider_tools = [Gmail(), GoogleCalendar()]
+    elif has_outlook:
+        from connectonion import Outlook, MicrosoftCalendar
+        provider_tools = [Outlook(), MicrosoftCalendar()]
+
+    # Warn if no email provider configured
+    if not provider_tools:
+        print("\n⚠️  No email account connected. Use /link-gmail or /link-outlook to connect.\n")
+        return provider_tools
+
+    # Charge every API request against the provider's quota, shared by all callers (RATE_LIMIT=false to disable)
+    limiter = get_rate_limiter()
+    if limiter:
+        for tool in provider_tools:
+            limiter.attach(tool)
+
+    # Serve inbox listing, search and bodies from the local mailbox mirror (MAILBOX_MIRROR=false to disable)
+    if os.getenv("MAILBOX_MIRROR", "true").lower() != "false":
+        from tools.mailbox import Mailbox
+        mailbox = Mailbox.for_tool(
+            provider_tools[0],
+            window_days=int(os.getenv("MAILBOX_DAYS", "90")),  # How far back the first sync goes
+            max_messages=int(os.getenv("MAILBOX_MAX_MESSAGES", "2000")),  # Cap on the first sync
+        )
+        if mailbox:
+            mailbox.attach(provider_tools[0])
+
+    # Read many bodies in one tool call through the provider's batch API (EMAIL_BODIES=false to disable)
+    if os.getenv("EMAIL_BODIES", "true").lower() != "false":
+        from tools.email_bodies import EmailBodies
+        bodies = EmailBodies.for_tool(provider_tools[0])
+        if bodies:
+            bodies.attach(provider_tools[0])
+
+    # Extract contacts page by page with a resumable checkpoint (CONTACT_SCAN=false to disable)
+    if os.getenv("CONTACT_SCAN", "true").lower() != "false":
+        from tools.contact_scan import ContactScan
+        scan = ContactScan.for_tool(provider_tools[0])
+        if scan:
+            scan.attach(provider_tools[0])
+
+    # Count threads and relationship strength per contact as mail arrives (CONTACT_STATS=false to disable)
+    if getattr(provider_tools[0], "contacts_csv", None) and os.getenv("CONTACT_STATS", "true").lower() != "false":
+        from tools.contact_stats import ContactStats
+        ContactStats().attach(provider_tools[0])
+
+    # Keep CRM fields in the indexed contact store, exported to contacts.csv (CONTACT_STORE=false to disable)
+    contacts_csv = getattr(provider_tools[0], "contacts_csv", None)
+    if contacts_csv and os.getenv("CONTACT_STORE", "true").lower() != "false":
+        from tools.contacts import ContactStore
+        store = ContactStore(csv_path=contacts_csv)
+        store.attach(provider_tools[0])
+        atexit.register(store.flush)
+
+    # Identical reads in flight at the same moment share one request (SINGLE_FLIGHT=false to disable)
+    if os.getenv("SINGLE_FLIGHT", "true").lower() != "false":
+        from tools.single_flight import SingleFlight
+        flights = SingleFlight()
+        for tool in provider_tools:
+            flights.attach(tool)
+
+    # Reuse recent read results, dropped when a mutation could change them (RESULT_CACHE=false to disable)
+    if os.getenv("RESULT_CACHE", "true").lower() != "false":
+        from tools.result_cache import ResultCache
+        result_cache = ResultCache()
+        for tool in provider_tools:
+            result_cache.attach(tool)
+
+    # Outermost layer: start the independent reads of one turn together (PARALLEL_TOOLS=false to disable)
+    parallel = get_parallel_calls()
+    if parallel:
+        for tool in provider_tools:
+            parallel.attach(tool)
+
+    return provider_tools
+
+
+def get_email_tool():
+    """The linked Gmail or Outlook tool instance, or None."""
+    provider_tools = get_provider_tools()
+    return provider_tools[0] if provider_tools else None
+
+
+def flush_contacts(agent=None):
+    """Write CRM updates from the contact store to contacts.csv (runs after each agent turn)."""
+    store = getattr(get_email_tool(), "contacts", None)
+    if store is not None:
+        store.flush()
+
+
+def log_cache_stats(agent):
+    """Write the result cache's hit rate, coalesced calls and rate limit waits to the agent log after each turn."""
+    email = get_email_tool()
+    result_cache = getattr(email, "result_cache", None)
+    if result_cache is not None and result_cache.hits + result_cache.misses:
+        agent.logger.print(f"[dim]{result_cache.summary()}[/dim]")
+    flights = getattr(email, "single_flight", None)
+    if flights is not None and sum(flights.coalesced.values()):
+        agent.logger.print(f"[dim]{flights.summary()}[/dim]")
+    limiter = getattr(email, "rate_limiter", None)
+    if limiter is not None and any(b["waited_seconds"] or b["throttles"] for b in limiter.stats().values()):
+        agent.logger.print(f"[dim]{limiter.summary()}[/dim]")
+
+
+def log_prompt_stats(agent):
+    """Write the turn's LLM calls (input tokens, cached tokens, latency) to the agent log."""
+    prompt_cache = getattr(agent.llm, "prompt_cache", None)
+    summary = prompt_cache.report_turn() if prompt_cache is not None else None
+    if summary:
+        agent.logger.print(f"[dim]{summary}[/dim]")
+
+
+def with_prompt_cache(agent):
+    """Let repeated requests reuse the cached system prompt and tool schemas (PROMPT_CACHE=false to disable)."""
+    if os.getenv("PROMPT_CACHE", "true").lower() != "false":
+        from tools.prompt_cache import PromptCache
+        PromptCache().attach(agent.llm)
+    return agent
+
+
+@cache
+def get_init_crm():
+    """Create init sub-agent for CRM database setup."""
+    from connectonion import Agent, on_complete
+
+    shared = get_shared_tools()
+    return Agent(
+        name="crm-init",
+        system_prompt="prompts/crm_init.md",
+        tools=get_provider_tools() + [shared["memory"], shared["web"]],
+        max_iterations=30,
+        model="co/claude-sonnet-4-5",
+        on_events=[on_complete(flush_contacts)],
+        log=False  # Don't create separate log file
+    )
 
 
 def init_crm_database(max_emails: int = 500, top_n: int = 10, exclude_domains: str = "openonion.ai,connectonion.com") -> str:
@@ -70,27 +261,254 @@ def init_crm_database(max_emails: int = 500, top_n: int = 10, exclude_domains: s
     Returns:
         Summary of initialization process including number of contacts analyzed
     """
-    result = init_crm.input(
-        f"Initialize CRM: Extract top {top_n} contacts from {max_emails} emails.\n"
-        f"IMPORTANT: Use get_all_contacts(max_emails={max_emails}, exclude_domains=\"{exclude_domains}\")\n"
-        f"Then use AI judgment to categorize and analyze the most important contacts."
-    )
+    # Extract once, analyze shards on a worker pool, merge once (CRM_INIT_PARALLEL=false for the single agent)
+    from tools.crm_init import CrmInit
+    email_tool = get_email_tool()
+    if os.getenv("CRM_INIT_PARALLEL", "true").lower() != "false" and CrmInit.supports(email_tool):
+        shared = get_shared_tools()
+        result = CrmInit(
+            email_tool,
+            web=shared["web"],
+            memory=shared["memory"],
+            workers=int(os.getenv("CRM_INIT_WORKERS", "4")),
+            limiter=get_rate_limiter(),  # its crm_init bucket spaces LLM and web calls (CRM_INIT_RATE)
+        ).run(max_emails=max_emails, top_n=top_n, exclude_domains=exclude_domains)
+        flush_contacts()
+    else:
+        result = get_init_crm().input(
+            f"Initialize CRM: Extract top {top_n} contacts from {max_emails} emails.\n"
+            f"IMPORTANT: Use get_all_contacts(max_emails={max_emails}, exclude_domains=\"{exclude_domains}\")\n"
+            f"Then use AI judgment to categorize and analyze the most important contacts."
+        )
     # Return clear completion message so main agent knows not to call again
     return f"CRM INITIALIZATION COMPLETE. Data saved to memory. Use read_memory() to access:\n- crm:all_contacts\n- crm:needs_reply\n- crm:init_report\n- contact:email@example.com\n\nDetails: {result}"
 
 
-# Add remaining tools to the list
-tools.extend([memory, shell, todo, init_crm_database])
+def top_contacts(limit: int = 10, by: str = "strength") -> str:
+    """List the people you email the most, over all mail seen (not just recent emails).
+
+    Args:
+        limit: Number of contacts to return (default: 10)
+        by: "strength" ranks by recent, two-way contact (older mail counts less);
+            "threads" ranks by total number of conversations
+
+    Returns:
+        Ranked contacts with thread count, last contact date and strength
+    """
+    email_tool = get_email_tool()
+    stats = getattr(email_tool, "contact_stats", None)
+    if stats is not None:
+        mailbox = getattr(email_tool, "mailbox", None)
+        if mailbox is not None:
+            mailbox.sync()
+        contacts = stats.top(limit, by=by)
+        if contacts:
+            lines = [f"Top {len(contacts)} contacts by {'thread count' if by == 'threads' else 'relationship strength'}:\n"]
+            for i, c in enumerate(contacts, 1):
+                lines.append(f"{i}. {c['name'] or c['email']} <{c['email']}> - {c['frequency']} threads, "
+                             f"{c['sent']} sent, last {c['last_contact']}, strength {c['strength']}")
+            return "\n".join(lines)
+    if hasattr(email_tool, "get_cached_contacts"):
+        return email_tool.get_cached_contacts()
+    return "No contact history yet. Run sync_contacts() or init_crm_database() first."
+
+
+def contact_context(email: str, max_tokens: int = 1500) -> str:
+    """Everything known about one contact in a single call: CRM record, memory notes,
+    upcoming meetings together, recent emails and the latest email's body.
+
+    Args:
+        email: The contact's email address
+        max_tokens: Size limit for the whole block (default: 1500)
+
+    Returns:
+        Compact context block, most important sections first
+    """
+    from tools.contact_context import ContactContext
+    provider_tools = get_provider_tools()
+    if not provider_tools:
+        return "No email account connected."
+    return ContactContext(
+        provider_tools[0],
+        calendar=provider_tools[1] if len(provider_tools) > 1 else None,
+        memory=get_shared_tools()["memory"],
+    ).build(email, max_tokens=max_tokens)
+
+
+def build_agent(compact: bool = False, todo=None):
+    """Create a main agent (a new one each call; get_agent() returns the shared one).
+
+    compact=True uses the compact variant of the system prompt (no worked
+    examples), for one-shot calls where time to first token matters more.
+    todo replaces the shared TodoList, for agents serving other sessions.
+    """
+    from connectonion import Agent, on_complete
+    from connectonion.useful_plugins import re_act, gmail_plugin, calendar_plugin
+
+    plugins = [re_act]
+    if has_gmail:
+        plugins.append(gmail_plugin)
+        plugins.append(calendar_plugin)
+
+    shared = get_shared_tools()
+    on_events = [on_complete(flush_contacts), on_complete(log_cache_stats), on_complete(log_prompt_stats)]
+    parallel = get_parallel_calls()
+    if parallel:
+        on_events += parallel.events()
+    prompt = system_prompt
+    if compact:
+        from tools.compact_prompt import compact_prompt_file
+        prompt = compact_prompt_file(system_prompt)
+    return with_prompt_cache(Agent(
+        name="email-agent",
+        system_prompt=prompt,
+        tools=get_provider_tools() + [shared["memory"], shared["shell"], todo or shared["todo"], init_crm_database, top_contacts, contact_context],
+        plugins=plugins,
+        on_events=on_events,
+        max_iterations=15,
+        model="co/claude-sonnet-4-5",
+    ))
+
+
+@cache
+def get_agent(compact: bool = False):
+    """The main agent (built once)."""
+    return build_agent(compact)
+
+
+@cache
+def get_admission():
+    """Concurrency limit and fair, bounded queue in front of host turns, or None (ADMISSION=false)."""
+    if os.getenv("ADMISSION", "true").lower() == "false":
+        return None
+    from tools.admission import AdmissionControl
+    return AdmissionControl(
+        limit=int(os.getenv("HOST_POOL_SIZE", "8")),  # Turns running at once
+        max_queue=int(os.getenv("HOST_QUEUE", "32")),  # Requests waiting for a turn
+        max_wait=float(os.getenv("HOST_QUEUE_WAIT", "30")),  # Seconds a request may wait before it is rejected
+    )
+
+
+@cache
+def get_host_agent():
+    """What host() serves: a pool of main agents, or the single shared one (HOST_POOL_SIZE=1, ADMISSION=false)."""
+    size = int(os.getenv("HOST_POOL_SIZE", "8"))  # Concurrent sessions served at once
+    admission = get_admission()
+    if size <= 1 and admission is None:
+        return get_agent()
+    from connectonion import TodoList
+    from tools.agent_pool import AgentPool, check_host_support
+
+    check_host_support()
+    # Requests queue for admission before they take an agent, so the pool never outgrows the limit
+    return AgentPool(
+        lambda: build_agent(todo=TodoList()),
+        max_size=size,
+        idle_timeout=float(os.getenv("HOST_POOL_IDLE", "600")),  # Seconds before an unused agent is dropped
+        admission=admission,
+    )
+
+
+def get_host_routes():
+    """Extra HTTP routes for host(): GET /admin/queue reports admission, pool, single-flight and rate limit metrics."""
+    from connectonion import HTTPRouter
+
+    router = HTTPRouter()
+
+    @router.admin.get("/queue")
+    def queue_metrics():
+        pool = get_host_agent()
+        admission = get_admission()
+        flights = getattr(get_email_tool(), "single_flight", None)
+        limiter = get_rate_limiter()
+        return {
+            "admission": admission.metrics() if admission else None,
+            "pool": pool.stats() if hasattr(pool, "stats") else None,
+            "single_flight": flights.stats() if flights else None,
+            "rate_limits": limiter.stats() if limiter else None,
+        }
+
+    return router
+
+
+def get_ask_agent():
+    """Agent for one-shot `email ask` questions: the compact prompt unless COMPACT_ASK=false."""
+    return get_agent(compact=os.getenv("COMPACT_ASK", "true").lower() != "false")
+
+
+# Frontmatter class names that mean "the linked email/calendar tool", whichever provider it is
+EMAIL_CLASSES = ("Gmail", "Outlook")
+CALENDAR_CLASSES = ("GoogleCalendar", "MicrosoftCalendar")
+
+
+def command_tools(names) -> list:
+    """Resolve a slash command's `tools:` frontmatter to tool instances, bound methods and functions.
+
+    Entries are "Class.method" (one method), "Class" (every method of that
+    tool) or a function tool name ("top_contacts"). Gmail/Outlook and the two
+    calendars are interchangeable, so commands written for Gmail also work
+    with Outlook. Entries that don't resolve are skipped.
+    """
+    provider_tools = get_provider_tools()
+    shared = get_shared_tools()
+    instances = list(provider_tools) + [shared["memory"], shared["shell"], shared["todo"]]
+    functions = {f.__name__: f for f in (init_crm_database, top_contacts, contact_context)}
+
+    def instance_for(class_name):
+        for role in (EMAIL_CLASSES, CALENDAR_CLASSES):
+            if class_name in role:
+                return next((t for t in instances if type(t).__name__ in role), None)
+        return next((t for t in instances if type(t).__name__ == class_name), None)
+
+    tools = []
+    for name in names:
+        class_name, _, method = str(name).partition(".")
+        if not method and class_name in functions:
+            tool = functions[class_name]
+        else:
+            instance = instance_for(class_name)
+            tool = getattr(instance, method, None) if method else instance
+        if tool is not None and tool not in tools:
+            tools.append(tool)
+    return tools
+
+
+@cache
+def get_command_agent(name: str, tools: tuple):
+    """Agent for one slash command: only the command's tools and a short system prompt."""
+    from connectonion import Agent, on_complete
+
+    on_events = [on_complete(log_cache_stats), on_complete(log_prompt_stats)]
+    parallel = get_parallel_calls()
+    if parallel:
+        on_events += parallel.events()
+    return with_prompt_cache(Agent(
+        name=f"email-agent-{name}",
+        system_prompt="prompts/command.md",
+        tools=command_tools(tools),
+        on_events=on_events,
+        max_iterations=8,
+        model="co/claude-sonnet-4-5",
+        log=".co/logs/email-agent.log",
+    ))
+
+
+def run_command(cmd, prompt: str) -> str:
+    """Run a slash command prompt with the tool subset its frontmatter declares.
+
+    Commands without a `tools:` list (or with SLIM_COMMANDS=false) use the main agent.
+    """
+    if cmd.tools is None or os.getenv("SLIM_COMMANDS", "true").lower() == "false":
+        return get_agent().input(prompt)
+    command_agent = get_command_agent(cmd.name, tuple(cmd.tools))
+    # Each run is self-contained; don't carry the last run's emails into this one
+    command_agent.reset_conversation()
+    return command_agent.input(prompt)
+
 
-# Create main agent
-agent = Agent(
-    name="email-agent",
-    system_prompt=system_prompt,
-    tools=tools,
-    plugins=plugins,
-    max_iterations=15,
-    model="co/claude-sonnet-4-5",
-)
+# Module-level handles, built on first attribute access
+agent = Lazy(get_agent)
+init_crm = Lazy(get_init_crm)
 
 # Example usage
 if __name__ == "__main__":
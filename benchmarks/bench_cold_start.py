@@ -0,0 +1,56 @@
+"""
+Benchmark: CLI cold start.
+
+Times fresh `python cli.py --help` and `python cli.py contacts` processes and
+reports them next to a bare `python -c pass`, so the CLI's own import cost is
+visible separately from interpreter startup on the machine.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs 10]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CONTACTS = "email,name,frequency,last_contact,type,company,relationship,priority\n" + "".join(
+    f"user{i}@example.com,User {i},{100 - i},2025-01-01,PERSON,Acme,client,medium\n" for i in range(100)
+)
+
+
+def measure(args: list[str], cwd: str, env: dict, runs: int) -> float:
+    """Median wall time in ms for a fresh process."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=cwd, env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    env = {**os.environ, "LINKED_GMAIL": "true", "PYTHONDONTWRITEBYTECODE": "1"}
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "data").mkdir()
+        (Path(tmp) / "data" / "contacts.csv").write_text(CONTACTS)
+
+        baseline = measure(["-c", "pass"], tmp, env, args.runs)
+        print(f"{'python -c pass':24s} {baseline:7.1f} ms")
+        for command in (["--help"], ["contacts"]):
+            ms = measure([str(ROOT / "cli.py"), *command], tmp, env, args.runs)
+            print(f"{'email ' + ' '.join(command):24s} {ms:7.1f} ms   (+{ms - baseline:.1f} ms over interpreter start)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark: @ contact autocomplete on a large CRM export.
+
+Writes a synthetic contacts.csv (100k rows by default) to a temp directory
+and times ContactProvider.search per keystroke, both for single queries and
+for a query typed one character at a time (the way the @ dropdown calls it),
+then times picking up appended rows, an edited row and a re-sorted file.
+
+Usage:
+    python benchmarks/bench_contacts.py [--contacts 100000]
+"""
+
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cli.contacts_provider import ContactProvider
+
+FIRST = ("james mary robert patricia john jennifer michael linda david elizabeth william barbara "
+         "richard susan joseph jessica thomas sarah charles karen wei yuki priya omar lena").split()
+LAST = ("smith johnson williams brown jones garcia miller davis rodriguez martinez hernandez "
+        "lopez wilson anderson thomas taylor moore jackson martin lee chen tanaka patel").split()
+FIELDS = ["email", "name", "frequency", "last_contact", "type", "company", "relationship", "priority"]
+QUERIES = ["d", "da", "dav", "davis", "jsm", "zq", "acme", "@company12", "noreply"]
+TYPED = ["sarah chen", "pat", "x"]
+
+
+def build(path: Path, count: int):
+    rng = random.Random(7)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for i in range(count):
+            first, last = rng.choice(FIRST), rng.choice(LAST)
+            if rng.random() < 0.1:
+                name, email = "", f"noreply{i}@service{i % 500}.com"
+            else:
+                name, email = f"{first.title()} {last.title()}", f"{first}.{last}{i}@company{i % 3000}.com"
+            writer.writerow({
+                "email": email,
+                "name": name,
+                "frequency": count - i,
+                "type": "PERSON" if name else "NOTIFICATION",
+                "company": f"Company {i % 3000}",
+                "priority": "high" if rng.random() < 0.01 else "",
+            })
+
+
+def _time(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], timings[-1], result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--contacts", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "contacts.csv"
+        build(path, args.contacts)
+        provider = ContactProvider(str(path))
+
+        start = time.perf_counter()
+        provider._load_contacts()
+        loaded = time.perf_counter()
+        provider._get_index()
+        print(f"Loaded {args.contacts:,} contacts in {loaded - start:.2f}s, "
+              f"indexed in {time.perf_counter() - loaded:.2f}s\n")
+
+        print("Single query (cold, no previous keystroke):")
+        for query in QUERIES:
+            def run():
+                provider._last = None
+                return provider.search(query)
+            median, worst, results = _time(run, args.runs)
+            print(f"  {query!r:14s} median {median:6.2f} ms   max {worst:6.2f} ms   ({len(results)} results)")
+
+        print("\nTyped one character at a time:")
+        for text in TYPED:
+            per_key = []
+            for _ in range(args.runs):
+                provider._last = None
+                for n in range(1, len(text) + 1):
+                    start = time.perf_counter()
+                    provider.search(text[:n])
+                    per_key.append((time.perf_counter() - start) * 1000)
+            per_key.sort()
+            print(f"  {text!r:14s} median {per_key[len(per_key) // 2]:6.2f} ms/key   max {per_key[-1]:6.2f} ms/key")
+
+        print("\nPicking up changes to contacts.csv (then one search):")
+        with open(path, "a") as f:
+            f.writelines(f"new{i}@example.com,New Person {i},1,,PERSON,,,\r\n" for i in range(100))
+        _report("100 rows appended", provider)
+
+        lines = path.read_bytes().decode().splitlines(keepends=True)
+        lines[10] = lines[10].replace(",,", ",VIP Corp,", 1)
+        path.write_bytes("".join(lines).encode())
+        _report("one row edited", provider)
+
+        path.write_bytes((lines[0] + "".join(reversed(lines[1:]))).encode())
+        _report("file re-sorted", provider)
+
+        start = time.perf_counter()
+        ContactProvider(str(path)).search("d")
+        print(f"  {'fresh provider':20s} {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+def _report(label, provider):
+    start = time.perf_counter()
+    provider.search("d")
+    print(f"  {label:20s} {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: CRM field updates through the contact store vs. contacts.csv.
+
+Writes a synthetic contacts.csv, then times 10k updates applied as one
+bulk_update_contacts call, as batches of 100 (the way crm-init sends them)
+and 100 single update_contact calls. Each runs first through the provider's
+CSV implementation (read + rewrite the file per call), then through the
+SQLite contact store plus the one CSV export at the end of the agent turn.
+
+Usage:
+    python benchmarks/bench_crm_updates.py [--contacts 20000] [--updates 10000]
+"""
+
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.contacts import ContactStore, FIELDS
+
+
+def build(path: Path, count: int):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for i in range(count):
+            writer.writerow({"email": f"user{i}@company{i % 300}.com", "name": f"User {i}",
+                             "frequency": count - i, "notes": "met at conference " * 3})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--contacts", type=int, default=20_000)
+    parser.add_argument("--updates", type=int, default=10_000)
+    args = parser.parse_args()
+
+    batch = [{"email": f"user{i}@company{i % 300}.com", "type": "PERSON",
+              "priority": random.choice(["high", "medium", "low"]), "tags": "bench"}
+             for i in random.Random(7).sample(range(args.contacts), min(args.updates, args.contacts))]
+    singles = batch[:100]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "contacts.csv"
+        build(csv_path, args.contacts)
+        print(f"{args.contacts:,} contacts, {len(batch):,} bulk updates, {len(singles)} single updates\n")
+
+        def run(bulk_update, update, flush=lambda: None):
+            timings = []
+            for calls in ([batch], [batch[i:i + 100] for i in range(0, len(batch), 100)]):
+                start = time.perf_counter()
+                for chunk in calls:
+                    bulk_update(chunk)
+                flush()
+                timings.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            for u in singles:
+                update(**u)
+            flush()
+            timings.append(time.perf_counter() - start)
+            return "   ".join(f"{label} {t * 1000:8.1f} ms" for label, t in
+                              zip(("one call", "batches of 100", "100 singles"), timings))
+
+        try:
+            from connectonion import Gmail
+        except ImportError:
+            Gmail = None
+        if Gmail is not None:
+            tool = SimpleNamespace(contacts_csv=str(csv_path))
+            print("contacts.csv    " + run(lambda u: Gmail.bulk_update_contacts(tool, u),
+                                           lambda **u: Gmail.update_contact(tool, **u)))
+
+        store = ContactStore(db_path=str(Path(tmp) / "contacts.db"), csv_path=str(csv_path))
+        start = time.perf_counter()
+        store.count()
+        print(f"contact store   (import of contacts.csv: {(time.perf_counter() - start) * 1000:.1f} ms)")
+        print("contact store   " + run(store.bulk_update, store.update, store.flush))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: `email <cmd>` as a fresh process vs. forwarded to the warm daemon.
+
+Runs each command several times with EMAIL_DAEMON=false (everything is
+imported, built and authenticated in the new process), then starts
+`email daemon` on a temporary socket and runs them again through the thin
+client. Uses the linked account from .env; without one, the commands only
+report that no account is connected and the two columns differ by little.
+
+Usage:
+    python benchmarks/bench_daemon.py [--runs 5] [--commands inbox,contacts]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def timed(args: list[str], env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "cli.py", *args], cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--commands", default="inbox,contacts")
+    args = parser.parse_args()
+    commands = args.commands.split(",")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "DAEMON_SOCKET": str(Path(tmp) / "bench.sock")}
+        cold = {c: [timed([c], {**env, "EMAIL_DAEMON": "false"}) for _ in range(args.runs)] for c in commands}
+
+        daemon = subprocess.Popen([sys.executable, "cli.py", "daemon"], cwd=ROOT, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            deadline = time.monotonic() + 60
+            while not Path(env["DAEMON_SOCKET"]).exists():
+                if time.monotonic() > deadline or daemon.poll() is not None:
+                    sys.exit("daemon did not start")
+                time.sleep(0.1)
+            warm = {c: [timed([c], env) for _ in range(args.runs)] for c in commands}
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+    print(f"Median of {args.runs} runs per command:")
+    print(f"  {'command':<12} {'fresh process':>14} {'via daemon':>12}")
+    for c in commands:
+        fresh, forwarded = statistics.median(cold[c]), statistics.median(warm[c])
+        print(f"  {c:<12} {fresh * 1000:11.0f} ms {forwarded * 1000:9.0f} ms   ({fresh / forwarded:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
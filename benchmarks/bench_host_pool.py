@@ -0,0 +1,75 @@
+"""
+Benchmark: host mode with one shared agent vs. a pool of agents.
+
+N clients send requests at once. Each request does what host() does per
+turn (get an agent from create_agent, hold its _host_turn_lock, run the
+turn), with the turn itself simulated as `--turn` seconds of LLM/API wait.
+A shared agent runs one turn at a time; AgentPool runs up to its size.
+
+Usage:
+    python benchmarks/bench_host_pool.py [--turn 0.2] [--requests 4] [--pool 8,32]
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.agent_pool import AgentPool
+
+
+def shared_agent():
+    agent = SimpleNamespace(_host_turn_lock=threading.Lock())  # what host(agent) installs
+    return lambda: agent
+
+
+def load(create_agent, clients: int, requests: int, turn: float) -> tuple[float, list[float]]:
+    """Run `clients` threads of `requests` turns each. Returns (seconds, per-request latencies)."""
+    latencies = []
+
+    def client():
+        for _ in range(requests):
+            started = time.perf_counter()
+            agent = create_agent()
+            with agent._host_turn_lock:
+                time.sleep(turn)
+            latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - started, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turn", type=float, default=0.2, help="seconds per simulated turn")
+    parser.add_argument("--requests", type=int, default=4, help="requests per client")
+    parser.add_argument("--pool", default="8,32", help="pool sizes to compare")
+    args = parser.parse_args()
+
+    setups = [("shared agent", shared_agent)]
+    setups += [(f"pool of {n}", lambda n=n: AgentPool(lambda: SimpleNamespace(), max_size=n))
+               for n in map(int, args.pool.split(","))]
+
+    print(f"{args.requests} requests per client, {args.turn * 1000:.0f} ms per turn")
+    print(f"  {'clients':>7}  {'setup':<14} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for clients in (1, 8, 32):
+        for name, make in setups:
+            seconds, latencies = load(make(), clients, args.requests, args.turn)
+            latencies.sort()
+            p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+            print(f"  {clients:>7}  {name:<14} {len(latencies) / seconds:7.1f} "
+                  f"{statistics.median(latencies) * 1000:8.0f} {p95 * 1000:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: Memory tool calls through the keyed store vs. memory.md.
+
+Seeds N contact keys (the way CRM init writes them), then times
+read_memory, write_memory and listing the contact keys, first through
+connectonion's Memory (parses the whole markdown file per call) and then
+with the MemoryStore attached (dict lookup / one appended line / sorted
+key range).
+
+Usage:
+    python benchmarks/bench_memory.py [--keys 1000 10000 50000] [--calls 200]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.memory_store import MemoryStore
+
+
+def seed(memory_file: Path, count: int):
+    """memory.md with `count` contact sections, as Memory would write them."""
+    memory_file.write_text("".join(
+        f"## contactuser{i}company{i % 300}com\n\nUser {i}, met at conference, prefers email\n\n"
+        for i in range(count)
+    ))
+
+
+def timed(fn, args_list) -> float:
+    """Median milliseconds per call."""
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def run(memory, count: int, calls: int) -> str:
+    rng = random.Random(7)
+    reads = [(f"contact:user{i}@company{i % 300}.com",) for i in rng.sample(range(count), min(calls, count))]
+    writes = [(f"contact:new{i}@example.com", f"New contact {i}") for i in range(calls)]
+    read = timed(memory.read_memory, reads)
+    write = timed(memory.write_memory, writes)
+    listing = timed(memory.read_memory if hasattr(memory, "store") else memory.list_memories,
+                    [("contact:*",) if hasattr(memory, "store") else ()] * 5)
+    return f"read {read:8.2f} ms   write {write:8.2f} ms   list contacts {listing:8.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    from connectonion import Memory
+
+    for count in args.keys:
+        print(f"{count:,} keys (median per call)")
+        with tempfile.TemporaryDirectory() as tmp:
+            memory_file = Path(tmp) / "memory.md"
+            seed(memory_file, count)
+            calls = args.calls if count <= 10_000 else max(args.calls // 10, 10)
+            print("  memory.md      " + run(Memory(memory_file=str(memory_file)), count, calls))
+
+            seed(memory_file, count)
+            memory = Memory(memory_file=str(memory_file))
+            store = MemoryStore(path=str(Path(tmp) / "memory.log"), legacy_file=str(memory_file))
+            start = time.perf_counter()
+            store.keys()
+            import_ms = (time.perf_counter() - start) * 1000
+            store.attach(memory)
+            print("  memory store   " + run(memory, count, args.calls) + f"   (import {import_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
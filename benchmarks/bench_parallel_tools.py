@@ -0,0 +1,84 @@
+"""
+Benchmark: one scheduling turn with and without concurrent tool calls.
+
+Replays the lookups the agent makes before proposing a meeting
+(find_free_slots, search_emails, read_memory, get_today_events) against
+stand-in tools with a fixed latency each, first one after another as the
+agent loop runs them, then with ParallelCalls starting the turn's calls
+together.
+
+Usage:
+    python benchmarks/bench_parallel_tools.py [--latency 0.4] [--provider-limit 4]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.parallel_calls import ParallelCalls
+
+
+class Provider:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def find_free_slots(self, date: str, duration_minutes: int = 30) -> str:
+        time.sleep(self.latency)
+        return "10:00, 14:00"
+
+    def search_emails(self, query: str, max_results: int = 10) -> str:
+        time.sleep(self.latency)
+        return "Found 5 email(s)"
+
+    def get_today_events(self) -> str:
+        time.sleep(self.latency)
+        return "standup 9:00"
+
+
+class Memory:
+    def read_memory(self, key: str) -> str:
+        time.sleep(0.005)
+        return "prefers mornings"
+
+
+TURN = [
+    ("find_free_slots", {"date": "2026-01-02", "duration_minutes": 30}),
+    ("search_emails", {"query": "from:ann@acme.com OR to:ann@acme.com", "max_results": 5}),
+    ("read_memory", {"key": "contact:ann@acme.com"}),
+    ("get_today_events", {}),
+]
+
+
+def replay(provider, memory) -> float:
+    """Run the turn's calls in order, as the agent loop does. Returns seconds."""
+    start = time.perf_counter()
+    for name, args in TURN:
+        getattr(memory if name == "read_memory" else provider, name)(**args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.4, help="seconds per provider call")
+    parser.add_argument("--provider-limit", type=int, default=4)
+    args = parser.parse_args()
+
+    sequential = replay(Provider(args.latency), Memory())
+
+    parallel = ParallelCalls(provider_limit=args.provider_limit)
+    provider, memory = parallel.attach(Provider(args.latency)), parallel.attach(Memory(), provider=False)
+    start = time.perf_counter()
+    parallel.start(TURN)  # before_tools
+    replay(provider, memory)
+    concurrent = time.perf_counter() - start
+
+    print(f"{len(TURN)} tool calls, {args.latency * 1000:.0f} ms per provider call")
+    print(f"  sequential     {sequential * 1000:7.0f} ms")
+    print(f"  parallel       {concurrent * 1000:7.0f} ms   ({sequential / concurrent:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
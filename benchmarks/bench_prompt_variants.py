@@ -0,0 +1,98 @@
+"""
+Benchmark: full vs. compact system prompt, with and without prompt caching.
+
+Always prints the size of each prompt (characters and estimated tokens).
+With --live it also sends the same one-shot question a few times per
+variant through the managed co/ endpoint, streaming, and reports time to
+first token, input tokens and cached input tokens per call. The first call
+of a cached variant writes the prefix; the following ones should read it.
+
+Needs OPENONION_API_KEY (run `co auth`) for --live.
+
+Usage:
+    python benchmarks/bench_prompt_variants.py [--prompt prompts/gmail_agent.md]
+    python benchmarks/bench_prompt_variants.py --live [--calls 3] [--model co/claude-sonnet-4-5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.compact_prompt import compact
+from tools.prompt_cache import with_breakpoints
+
+
+QUESTION = "In one sentence: which tool would you use to check my unanswered emails?"
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def stream_call(llm, system: str, cached: bool) -> dict:
+    """One streamed request. Returns ttft/total seconds and input/cached token counts."""
+    messages = [{"role": "system", "content": system}, {"role": "user", "content": QUESTION}]
+    if cached:
+        messages = with_breakpoints(messages)
+    start = time.perf_counter()
+    ttft, usage = None, None
+    stream = llm.client.chat.completions.create(
+        model=llm.model, messages=messages, max_tokens=60, stream=True,
+        stream_options={"include_usage": True},
+    )
+    for chunk in stream:
+        if ttft is None and chunk.choices and chunk.choices[0].delta.content:
+            ttft = time.perf_counter() - start
+        if getattr(chunk, "usage", None):
+            usage = chunk.usage
+    total = time.perf_counter() - start
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "ttft": ttft if ttft is not None else total,
+        "total": total,
+        "input_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--prompt", default="prompts/gmail_agent.md")
+    parser.add_argument("--live", action="store_true", help="measure real calls (needs OPENONION_API_KEY)")
+    parser.add_argument("--calls", type=int, default=3, help="calls per variant with --live")
+    parser.add_argument("--model", default="co/claude-sonnet-4-5")
+    args = parser.parse_args()
+
+    full = Path(args.prompt).read_text(encoding="utf-8")
+    variants = {"full": full, "compact": compact(full),
+                "command": Path("prompts/command.md").read_text(encoding="utf-8")}
+
+    print(f"System prompts ({args.prompt}):")
+    for name, text in variants.items():
+        print(f"  {name:<8} {len(text):7,} chars  ~{estimate_tokens(text):6,} tokens  "
+              f"({len(text) / len(full):.0%} of full)")
+    if not args.live:
+        print("\nRun with --live to measure time to first token and input tokens per call.")
+        return
+
+    from connectonion.core.llm import create_llm
+    llm = create_llm(args.model)
+    runs = [("full", False), ("full", True), ("compact", False), ("compact", True)]
+    print(f"\n{args.calls} call(s) per variant, {args.model}, streaming:")
+    print(f"  {'variant':<16} {'call':>4} {'ttft ms':>8} {'total ms':>9} {'input':>7} {'cached':>7}")
+    for name, cached in runs:
+        results = [stream_call(llm, variants[name], cached) for _ in range(args.calls)]
+        label = f"{name}{' +cache' if cached else ''}"
+        for i, r in enumerate(results, 1):
+            print(f"  {label:<16} {i:>4} {r['ttft'] * 1000:8.0f} {r['total'] * 1000:9.0f} "
+                  f"{r['input_tokens']:7,} {r['cached_tokens']:7,}")
+        warm = results[1:] or results
+        print(f"  {label:<16} {'avg':>4} {sum(r['ttft'] for r in warm) / len(warm) * 1000:8.0f}"
+              f"   (after the first call)")
+
+
+if __name__ == "__main__":
+    main()
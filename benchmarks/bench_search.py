@@ -0,0 +1,89 @@
+"""
+Benchmark: local mailbox search on a large mirror.
+
+Builds a synthetic 200k-message mirror in a temp directory and times the
+queries the agent issues most (contact history, free text, date windows).
+The live mirror holds MAILBOX_MAX_MESSAGES (default 2000) from the last
+MAILBOX_DAYS; a mirror this size needs both raised.
+
+Usage:
+    python benchmarks/bench_search.py [--messages 200000]
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools import search_index
+from tools.mailbox import SCHEMA
+
+TOPICS = ("meeting invoice contract launch quarterly review lunch budget hiring roadmap "
+          "feedback deadline proposal pricing renewal demo offsite travel report update").split()
+# Long-tailed vocabulary so term frequencies look like real mail, not 20 words everywhere
+FILLER = [f"w{i}" for i in range(20_000)]
+QUERIES = [
+    "from:user42@company42.com OR to:user42@company42.com",
+    "quarterly report",
+    "subject:invoice newer_than:30d",
+    "after:2024/01/01 is:unread pricing",
+    "label:inbox -from:noreply",
+]
+
+
+def _filler(rng) -> str:
+    return FILLER[min(int(rng.paretovariate(1.2)) - 1, len(FILLER) - 1)]
+
+
+def build(path: Path, count: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    rng = random.Random(7)
+    now = time.time()
+    rows = []
+    for i in range(count):
+        user = rng.randrange(2000)
+        sender = f"user{user}@company{user % 300}.com"
+        subject = " ".join([rng.choice(TOPICS)] + [_filler(rng) for _ in range(3)])
+        snippet = " ".join([rng.choice(TOPICS)] + [_filler(rng) for _ in range(19)])
+        labels = ",INBOX,UNREAD," if rng.random() < 0.1 else ",INBOX,"
+        rows.append((str(i), f"t{i // 3}", now - rng.randrange(730) * 86400, "", sender,
+                     "me@example.com", subject, snippet, labels, int("UNREAD" in labels)))
+    with conn:
+        conn.executemany(
+            "INSERT INTO messages (id, thread_id, date, date_header, sender, recipients, subject, snippet, labels, unread)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    search_index.ensure_index(conn)
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        conn = build(Path(tmp) / "mailbox.db", args.messages)
+        print(f"Built {args.messages:,} message mirror in {time.perf_counter() - start:.1f}s\n")
+
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                rows = search_index.search(conn, query, max_results=10)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            print(f"{query:55s} median {timings[len(timings) // 2]:6.1f} ms   "
+                  f"p95 {timings[int(len(timings) * 0.95) - 1]:6.1f} ms   ({len(rows)} results)")
+
+
+if __name__ == "__main__":
+    main()
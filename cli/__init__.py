@@ -6,6 +6,7 @@ Structure:
 - setup.py     - Auth and CRM setup checks
 - interactive.py - Interactive REPL mode
 - commands.py  - Typer CLI commands
+- daemon.py    - Warm daemon behind a Unix socket, and the thin client the commands forward through
 """
 
 from .commands import app
@@ -7,14 +7,13 @@ All commands use the core do_* functions from cli.core.
 import typer
 from rich.console import Console
 from rich.panel import Panel
-from rich.markdown import Markdown
 
 from .core import (
     do_inbox, do_search, do_contacts, do_sync,
-    do_init, do_unanswered, do_identity, do_today, do_ask, do_host
+    do_init, do_unanswered, do_identity, do_today, do_ask, do_host, do_worker, do_daemon
 )
+from .daemon import forward
 from .setup import check_setup
-from .interactive import interactive
 
 app = typer.Typer(
     name="email",
@@ -24,11 +23,19 @@ app = typer.Typer(
 console = Console()
 
 
+def _run(name: str, command, **kwargs) -> str:
+    """Run a command in the warm daemon when one is running, otherwise in this process."""
+    result = forward(name, **kwargs)
+    return result if result is not None else command(**kwargs)
+
+
 @app.callback()
 def main(ctx: typer.Context):
     """Email Agent - Interactive email management from your terminal."""
     if ctx.invoked_subcommand is None:
         if check_setup():
+            # The Textual UI is heavy to import; only load it for interactive mode
+            from .interactive import interactive
             interactive()
 
 
@@ -39,7 +46,7 @@ def inbox(
 ):
     """Show recent inbox emails."""
     with console.status("[bold blue]Fetching emails...[/bold blue]"):
-        result = do_inbox(count=count, unread=unread)
+        result = _run("inbox", do_inbox, count=count, unread=unread)
     console.print(Panel(result, title="[bold]Inbox[/bold]", border_style="green"))
 
 
@@ -50,14 +57,14 @@ def search(
 ):
     """Search emails using Gmail query syntax."""
     with console.status(f"[bold blue]Searching...[/bold blue]"):
-        result = do_search(query=query, count=count)
+        result = _run("search", do_search, query=query, count=count)
     console.print(Panel(result, title=f"[bold]Search: {query}[/bold]", border_style="yellow"))
 
 
 @app.command()
 def contacts():
     """Show cached contacts."""
-    result = do_contacts()
+    result = _run("contacts", do_contacts)
     console.print(Panel(result, title="[bold]Contacts[/bold]", border_style="cyan"))
 
 
@@ -67,8 +74,9 @@ def sync(
     exclude: str = typer.Option("openonion.ai,connectonion.com", "--exclude", "-e", help="Domains to exclude")
 ):
     """Sync contacts from Gmail."""
-    with console.status("[bold blue]Syncing contacts...[/bold blue]"):
-        result = do_sync(max_emails=max_emails, exclude=exclude)
+    with console.status("[bold blue]Syncing contacts...[/bold blue]") as status:
+        result = _run("sync", do_sync, max_emails=max_emails, exclude=exclude,
+                      progress=lambda text: status.update(f"[bold blue]{text}[/bold blue]"))
     console.print(Panel(result, title="[bold]Sync Complete[/bold]", border_style="green"))
 
 
@@ -79,20 +87,23 @@ def init(
     exclude: str = typer.Option("openonion.ai,connectonion.com", "--exclude", "-e", help="Domains to exclude")
 ):
     """Initialize CRM database."""
+    from rich.markdown import Markdown
     console.print("[dim]Initializing CRM (this may take a few minutes)...[/dim]")
-    with console.status("[bold blue]Processing...[/bold blue]"):
-        result = do_init(max_emails=max_emails, top_n=top_n, exclude=exclude)
+    with console.status("[bold blue]Processing...[/bold blue]") as status:
+        result = _run("init", do_init, max_emails=max_emails, top_n=top_n, exclude=exclude,
+                      progress=lambda text: status.update(f"[bold blue]{text}[/bold blue]"))
     console.print(Panel(Markdown(result), title="[bold green]CRM Initialized[/bold green]", border_style="green"))
 
 
 @app.command()
 def unanswered(
     days: int = typer.Option(120, "--days", "-d", help="Look back N days"),
-    count: int = typer.Option(20, "--count", "-n", help="Max results")
+    count: int = typer.Option(20, "--count", "-n", help="Max results"),
+    fresh: bool = typer.Option(False, "--fresh", "-f", help="Ignore the precomputed list")
 ):
     """Find emails you haven't replied to."""
     with console.status("[bold blue]Finding unanswered emails...[/bold blue]"):
-        result = do_unanswered(days=days, count=count)
+        result = _run("unanswered", do_unanswered, days=days, count=count, fresh=fresh)
     console.print(Panel(result, title="[bold]Unanswered[/bold]", border_style="red"))
 
 
@@ -100,32 +111,58 @@ def unanswered(
 def identity(detect: bool = typer.Option(False, "--detect", "-d", help="Detect forwarded addresses")):
     """Show your email identity."""
     with console.status("[bold blue]Getting identity...[/bold blue]"):
-        result = do_identity(detect=detect)
+        result = _run("identity", do_identity, detect=detect)
     console.print(Panel(result, title="[bold]Identity[/bold]", border_style="cyan"))
 
 
 @app.command()
-def today():
+def today(fresh: bool = typer.Option(False, "--fresh", "-f", help="Ignore the precomputed briefing")):
     """Daily email briefing."""
+    from rich.markdown import Markdown
     console.print("[dim]Analyzing today's emails...[/dim]")
     with console.status("[bold blue]Fetching and analyzing...[/bold blue]"):
-        result = do_today()
+        result = _run("today", do_today, fresh=fresh)
     console.print(Panel(Markdown(result), title="[bold blue]Today's Briefing[/bold blue]", border_style="blue"))
 
 
 @app.command()
 def ask(question: str = typer.Argument(..., help="Question to ask the agent")):
     """Ask a single question to the Gmail agent."""
+    from rich.markdown import Markdown
     with console.status("[bold blue]Thinking...[/bold blue]"):
-        result = do_ask(question)
+        result = _run("ask", do_ask, question=question)
     console.print(Panel(Markdown(result), title="[bold blue]Agent[/bold blue]", border_style="blue"))
 
 
 @app.command()
 def host(
     port: int = typer.Option(8000, "--port", "-p", help="Port to listen on"),
-    trust: str = typer.Option("careful", "--trust", "-t", help="Trust level: open/careful/strict")
+    trust: str = typer.Option("careful", "--trust", "-t", help="Trust level: open/careful/strict"),
+    precompute: bool = typer.Option(False, "--precompute", help="Also precompute /today and /unanswered in the background")
 ):
     """Start as HTTP/WebSocket server."""
     console.print(f"[bold cyan]Starting server on port {port}...[/bold cyan]")
-    do_host(port=port, trust=trust)
+    do_host(port=port, trust=trust, precompute=precompute)
+
+
+@app.command()
+def worker(interval: int = typer.Option(300, "--interval", "-i", help="Seconds between refreshes")):
+    """Precompute /today and /unanswered in the background (Ctrl+C to stop)."""
+    console.print(f"[bold cyan]Precomputing every {interval}s (Ctrl+C to stop)...[/bold cyan]")
+
+    def report(name: str, seconds: float, error: str | None):
+        status = f"[red]failed: {error}[/red]" if error else "[green]ok[/green]"
+        console.print(f"[dim]{name}[/dim] {status} [dim]({seconds:.1f}s)[/dim]")
+
+    console.print(do_worker(interval=interval, on_run=report))
+
+
+@app.command()
+def daemon(precompute: bool = typer.Option(False, "--precompute", help="Also precompute /today and /unanswered")):
+    """Keep the agent and provider clients warm; other commands forward to it (Ctrl+C to stop)."""
+    console.print("[dim]Warming up...[/dim]")
+    result = do_daemon(
+        precompute=precompute,
+        ready=lambda path: console.print(f"[bold cyan]Daemon listening on {path} (Ctrl+C to stop)[/bold cyan]"),
+    )
+    console.print(result)
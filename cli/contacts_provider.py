@@ -1,18 +1,195 @@
 """Contact provider for @ autocomplete in Input."""
 
 import csv
+import heapq
+import io
+import re
+import zlib
+from array import array
+from bisect import bisect_left, insort
 from pathlib import Path
 
 from connectonion.tui.dropdown import DropdownItem
 from connectonion.tui.fuzzy import fuzzy_match
 
 
+# Candidate lists at or below this size are scored exactly with fuzzy_match
+EXACT_LIMIT = 400
+
+# Max contacts checked for scattered (non-contiguous) matches per keystroke
+SCAN_LIMIT = 2000
+
+# Max edited rows patched into the index in place; more than this rebuilds it
+PATCH_LIMIT = 1000
+
+_WORD_SPLIT = re.compile(r"[^\w]+")
+
+
+def _is_subsequence(query: str, text: str) -> bool:
+    """True if query's characters appear in text in order (fuzzy_match's rule)."""
+    it = iter(text)
+    return all(c in it for c in query)
+
+
+def _grams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _words(text: str) -> str:
+    return " " + " ".join(w for w in _WORD_SPLIT.split(text) if w)
+
+
+def _post(index: dict, keys, contact_id: int):
+    """Append contact_id to the posting list of every key."""
+    for key in keys:
+        posting = index.get(key)
+        if posting is None:
+            posting = index[key] = array("i")
+        posting.append(contact_id)
+
+
+class ContactIndex:
+    """Search index over contacts.
+
+    Ids are positions in the contacts list (contacts.csv is written sorted by
+    frequency, so lower ids are more important). Posting lists are arrays of
+    ids in ascending order:
+    - trigrams: every 3-character substring of the search text
+    - chars:    every character (for short and scattered matches)
+    High-priority contacts are kept in their own short list and checked first.
+    """
+
+    def __init__(self):
+        self.texts = []  # lowercase "name email" per id
+        self.words = []  # " word word ..." per id, for word-prefix checks
+        self.high = array("i")
+        self.trigrams = {}
+        self.chars = {}
+
+    def add(self, text: str, high_priority: bool = False) -> int:
+        """Index one contact's search text. Returns its id."""
+        contact_id = len(self.texts)
+        text = text.lower()
+        self.texts.append(text)
+        self.words.append(_words(text))
+        if high_priority:
+            self.high.append(contact_id)
+
+        _post(self.trigrams, _grams(text), contact_id)
+        _post(self.chars, set(text), contact_id)
+        return contact_id
+
+    def replace(self, contact_id: int, text: str, high_priority: bool = False):
+        """Re-index one contact in place after its record changed."""
+        old = self.texts[contact_id]
+        for key in _grams(old):
+            self.trigrams[key].remove(contact_id)
+        for key in set(old):
+            self.chars[key].remove(contact_id)
+        if contact_id in self.high:
+            self.high.remove(contact_id)
+        self._insert(contact_id, text, high_priority)
+
+    def remap(self, old_ids: list[int | None], texts: list[tuple[str, bool]]):
+        """Renumber the index for a rewritten contacts list without rebuilding it.
+
+        old_ids[i] is the previous id of the contact now at position i, or None
+        if it is new or its search text changed; those are indexed from
+        texts[i] (search text, high priority). Old ids not listed are dropped.
+        """
+        renumbered = array("i", [-1]) * len(self.texts)
+        for new_id, old_id in enumerate(old_ids):
+            if old_id is not None:
+                renumbered[old_id] = new_id
+        renumber = renumbered.__getitem__
+
+        def remapped(posting):
+            ids = sorted(map(renumber, posting))
+            return array("i", ids[bisect_left(ids, 0):])  # -1 sorts first: dropped contacts
+
+        for index in (self.trigrams, self.chars):
+            for key, posting in index.items():
+                index[key] = remapped(posting)
+        self.high = remapped(self.high)
+
+        old_texts, old_words = self.texts, self.words
+        self.texts = [old_texts[i] if i is not None else "" for i in old_ids]
+        self.words = [old_words[i] if i is not None else "" for i in old_ids]
+        for new_id, old_id in enumerate(old_ids):
+            if old_id is None:
+                self._insert(new_id, *texts[new_id])
+
+    def _insert(self, contact_id: int, text: str, high_priority: bool):
+        """Index a contact at an existing id, keeping posting lists sorted."""
+        text = text.lower()
+        self.texts[contact_id] = text
+        self.words[contact_id] = _words(text)
+        if high_priority:
+            insort(self.high, contact_id)
+        for index, keys in ((self.trigrams, _grams(text)), (self.chars, set(text))):
+            for key in keys:
+                insort(index.setdefault(key, array("i")), contact_id)
+
+    def candidates(self, query: str) -> list[int] | None:
+        """All ids that fuzzy-match query, or None if there are too many to list cheaply."""
+        postings = [self.chars.get(c, ()) for c in set(query)]
+        rarest = min(postings, key=len)
+        if len(rarest) > SCAN_LIMIT:
+            return None
+        return [i for i in rarest if _is_subsequence(query, self.texts[i])]
+
+    def tiered(self, query: str, limit: int) -> list[int]:
+        """Up to `limit` ids from each tier: word-prefix, then substring, then scattered matches.
+
+        Each tier checks high-priority contacts first and scans at most
+        SCAN_LIMIT ids of its posting list, so broad queries stay cheap.
+        The caller scores the candidates; a later tier can outscore an earlier one.
+        """
+        found, seen = [], set()
+
+        def take(ids, test, stop):
+            for i in ids[:SCAN_LIMIT]:
+                if len(found) >= stop:
+                    return
+                if i not in seen and test(i):
+                    seen.add(i)
+                    found.append(i)
+
+        rarest_char = min((self.chars.get(c, ()) for c in set(query)), key=len)
+        if len(query) >= 3:
+            grams = (self.trigrams.get(query[i:i + 3], ()) for i in range(len(query) - 2))
+            contains = min(grams, key=len)
+        else:
+            contains = rarest_char
+
+        word_prefix = " " + query
+        tiers = [
+            (contains, lambda i: word_prefix in self.words[i]),
+            (contains, lambda i: query in self.texts[i]),
+            (rarest_char, lambda i: _is_subsequence(query, self.texts[i])),
+        ]
+        for ids, test in tiers:
+            stop = len(found) + limit
+            take(self.high, test, stop)
+            take(ids, test, stop)
+        return found
+
+
 class ContactProvider:
     """Autocomplete provider for email contacts.
 
     Reads contacts from data/contacts.csv and provides fuzzy search
     with rich metadata display (name, email, company, relationship).
 
+    Search goes through a ContactIndex built on the first search, and
+    returns the top `limit` matches. Typing one more character reuses the
+    previous keystroke's candidates instead of searching from scratch.
+
+    Changes to contacts.csv are picked up on the next call: appended rows
+    are parsed on their own and edited or re-sorted files patch the index
+    rather than rebuilding it. refresh() updates a to_command_items() list
+    in place for the @ trigger.
+
     Usage:
         from cli.contacts_provider import ContactProvider
 
@@ -20,41 +197,170 @@ class ContactProvider:
         results = provider.search("dav")  # Fuzzy matches "Davis", "David", etc.
     """
 
-    def __init__(self, contacts_file: str = "data/contacts.csv"):
+    def __init__(self, contacts_file: str = "data/contacts.csv", limit: int = 20):
         self.contacts_file = Path(contacts_file)
+        self.limit = limit
         self._contacts = None
+        self._index = None
+        self._last = None  # (query, candidate ids) from the previous keystroke
+
+        # What was read, so a change can be applied without re-parsing everything
+        self._stamp = None      # (inode, mtime, size) of the file last read
+        self._fieldnames = None
+        self._records = []      # raw CSV record per contact, aligned with _contacts
+        self._offset = None     # bytes read, if the file ended on a complete record
+        self._crc = 0           # crc32 of those bytes
+
+    def _stat(self) -> tuple | None:
+        try:
+            st = self.contacts_file.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
 
     def _load_contacts(self) -> list[dict]:
-        """Load contacts from CSV file."""
-        if self._contacts is not None:
+        """Load contacts from CSV file, re-reading only what changed since the last call.
+
+        The file's inode, mtime and size are checked on every call. Rows
+        appended to an otherwise unchanged file are parsed on their own;
+        after a rewrite only records whose text changed are parsed again.
+        """
+        stamp = self._stat()
+        if self._contacts is not None and stamp == self._stamp:
             return self._contacts
 
-        self._contacts = []
-        if not self.contacts_file.exists():
+        self._stamp = stamp
+        self._last = None
+        if stamp is None:
+            self._contacts, self._records, self._index = [], [], None
             return self._contacts
 
-        with open(self.contacts_file, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                email = row.get("email", "").strip()
-                name = row.get("name", "").strip()
-                company = row.get("company", "").strip()
-                relationship = row.get("relationship", "").strip()
-                priority = row.get("priority", "").strip()
-                contact_type = row.get("type", "").strip()
-
-                if email:
-                    self._contacts.append({
-                        "email": email,
-                        "name": name,
-                        "company": company,
-                        "relationship": relationship,
-                        "priority": priority,
-                        "type": contact_type,
-                    })
+        data = self.contacts_file.read_bytes()
+        offset = self._offset
+        if (self._contacts is not None and offset is not None and len(data) > offset
+                and zlib.crc32(data[:offset]) == self._crc):
+            self._append(data[offset:])
+        else:
+            self._reload(data)
 
+        self._offset = len(data) if data.endswith(b"\n") else None
+        self._crc = zlib.crc32(data) if self._offset else 0
         return self._contacts
 
+    def _split(self, text: str) -> list[str]:
+        """Split CSV text into raw records (quoted fields may span lines)."""
+        lines = io.StringIO(text, newline="").readlines()
+        if '"' not in text:
+            return lines
+        records, pending = [], ""
+        for line in lines:
+            if pending:
+                pending += line
+                if pending.count('"') % 2 == 0:
+                    records.append(pending)
+                    pending = ""
+            elif line.count('"') % 2:
+                pending = line
+            else:
+                records.append(line)
+        if pending:
+            records.append(pending)
+        return records
+
+    def _parse(self, record: str) -> dict | None:
+        """Parse one raw record into a contact, or None if it has no email."""
+        row = dict(zip(self._fieldnames, next(csv.reader([record]), [])))
+        email = row.get("email", "").strip()
+        if not email:
+            return None
+        return {
+            "email": email,
+            "name": row.get("name", "").strip(),
+            "company": row.get("company", "").strip(),
+            "relationship": row.get("relationship", "").strip(),
+            "priority": row.get("priority", "").strip(),
+            "type": row.get("type", "").strip(),
+        }
+
+    def _append(self, data: bytes):
+        """Parse rows appended after the last read and add them to the index."""
+        for record in self._split(data.decode("utf-8", errors="replace")):
+            contact = self._parse(record)
+            if contact:
+                self._contacts.append(contact)
+                self._records.append(record)
+                if self._index is not None:
+                    self._index.add(self._search_text(contact), contact["priority"] == "high")
+
+    def _reload(self, data: bytes):
+        """Re-read a rewritten file, reusing contacts whose record text is unchanged."""
+        records = self._split(data.decode("utf-8", errors="replace"))
+        header = next(csv.reader(records[:1]), None)
+        if header != self._fieldnames:
+            self._fieldnames = header
+            self._records = []  # Column layout changed, nothing can be reused
+
+        known = dict(zip(self._records, self._contacts or []))
+        contacts, kept = [], []
+        for record in records[1:]:
+            contact = known.get(record) or self._parse(record)
+            if contact:
+                contacts.append(contact)
+                kept.append(record)
+
+        index, old_records = self._index, self._records
+        self._contacts, self._records = contacts, kept
+        if index is None:
+            return
+
+        def key(contact):
+            return self._search_text(contact).lower(), contact["priority"] == "high"
+
+        high = set(index.high)
+        if len(kept) == len(old_records):
+            # Same rows in the same order with a few edited (update_contact): patch in place
+            changed = [i for i, (old, new) in enumerate(zip(old_records, kept)) if old != new]
+            if len(changed) <= PATCH_LIMIT:
+                for i in changed:
+                    if key(contacts[i]) != (index.texts[i], i in high):
+                        index.replace(i, *key(contacts[i]))
+                return
+
+        # Rows added, removed or reordered (sync_contacts re-sorts): renumber the index
+        keys = [key(contact) for contact in contacts]
+        old_ids = {(text, i in high): i for i, text in enumerate(index.texts)}
+        order = [old_ids.pop(k, None) for k in keys]
+        if order.count(None) <= PATCH_LIMIT:
+            index.remap(order, keys)
+        else:
+            self._index = None  # Mostly new contacts: rebuild on next search
+
+    def refresh(self, items: list) -> bool:
+        """Update a list from to_command_items() in place if contacts.csv changed.
+
+        The @ autocomplete keeps a reference to its candidate list, so this
+        refreshes it live. Returns True if the list was updated.
+        """
+        if self._contacts is not None and self._stat() == self._stamp:
+            return False
+        items[:] = self.to_command_items()
+        return True
+
+    def _get_index(self) -> ContactIndex:
+        """Build the search index on first use (to_command_items doesn't need it)."""
+        contacts = self._load_contacts()
+        if self._index is None:
+            self._index = ContactIndex()
+            for contact in contacts:
+                self._index.add(self._search_text(contact), contact["priority"] == "high")
+        return self._index
+
+    def _search_text(self, contact: dict) -> str:
+        """Text matched against a query: name and email."""
+        name = contact["name"]
+        email = contact["email"]
+        return f"{name} {email}" if name else email
+
     def _get_icon(self, contact: dict) -> str:
         """Get icon based on contact type."""
         contact_type = contact.get("type", "").upper()
@@ -75,42 +381,67 @@ class ContactProvider:
             parts.append(contact["relationship"])
         return " · ".join(parts)
 
+    def _candidates(self, query: str) -> list[int] | None:
+        """Every matching id if cheap to list, narrowing the previous keystroke's list when possible."""
+        if self._last is not None:
+            last_query, last_ids = self._last
+            if last_ids is not None and query.startswith(last_query):
+                texts = self._index.texts
+                return [i for i in last_ids if _is_subsequence(query, texts[i])]
+        return self._index.candidates(query)
+
+    def _item(self, contact: dict, score: int, positions: list[int]) -> DropdownItem:
+        email = contact["email"]
+        name = contact["name"]
+
+        # Priority contacts get a boost
+        if contact.get("priority") == "high":
+            score += 50
+
+        return DropdownItem(
+            display=name if name else email,  # Display name if available, otherwise email
+            value=email,
+            score=score,
+            positions=positions,
+            description=email if name else "",  # Show email as description if we're showing name
+            subtitle=self._build_subtitle(contact),
+            icon=self._get_icon(contact),
+        )
+
     def search(self, query: str) -> list[DropdownItem]:
         """Search contacts with fuzzy matching.
 
-        Returns list of DropdownItem with rich metadata.
+        Returns the best `limit` matches as DropdownItem with rich metadata.
         """
         contacts = self._load_contacts()
-        results = []
+        index = self._get_index()
+        query = query.lower()
+        if not query:
+            # Everything matches: priority contacts, then the most frequent
+            self._last = None
+            top = list(index.high[:self.limit])
+            top += [i for i in range(min(len(contacts), self.limit * 2)) if i not in top]
+            return [self._item(contacts[i], 0, []) for i in top[:self.limit]]
 
-        for contact in contacts:
-            email = contact["email"]
-            name = contact["name"]
-
-            # Match against both name and email
-            search_text = f"{name} {email}" if name else email
-            matched, score, positions = fuzzy_match(query, search_text)
-
-            if matched:
-                # Display name if available, otherwise email
-                display = name if name else email
-
-                # Priority contacts get a boost
-                if contact.get("priority") == "high":
-                    score += 50
-
-                results.append(DropdownItem(
-                    display=display,
-                    value=email,
-                    score=score,
-                    positions=positions,
-                    description=email if name else "",  # Show email as description if we're showing name
-                    subtitle=self._build_subtitle(contact),
-                    icon=self._get_icon(contact),
-                ))
-
-        # Sort by score (highest first)
-        return sorted(results, key=lambda x: -x.score)
+        ids = self._candidates(query)
+        self._last = (query, ids)
+
+        if ids is not None and len(ids) <= EXACT_LIMIT:
+            # Few enough to score every match exactly
+            scored = []
+            for i in ids:
+                contact = contacts[i]
+                _, score, positions = fuzzy_match(query, self._search_text(contact))
+                scored.append(self._item(contact, score, positions))
+            return heapq.nlargest(self.limit, scored, key=lambda x: x.score)
+
+        # Broad query: score only the first matches of each tier, then take the best
+        scored = []
+        for i in index.tiered(query, self.limit):
+            contact = contacts[i]
+            _, score, positions = fuzzy_match(query, self._search_text(contact))
+            scored.append(self._item(contact, score, positions))
+        return heapq.nlargest(self.limit, scored, key=lambda x: x.score)
 
     def to_command_items(self) -> list:
         """Convert contacts to Textual CommandItem format for autocomplete.
@@ -2,20 +2,48 @@
 Core logic functions for Email Agent CLI.
 
 These functions are shared by CLI commands and interactive slash commands.
+Heavy imports (connectonion, provider SDKs) and the agent itself are deferred
+until a command actually needs them.
 """
 
-from connectonion import SlashCommand
-from agent import agent
+import csv
+import os
+from contextlib import nullcontext
+from pathlib import Path
+
+import agent as agent_config
+from agent import get_ask_agent, get_host_agent, get_host_routes, get_briefing_cache, get_email_tool, get_precomputed, run_command
+from tools.lazy import Lazy
+
+
+def _slash_command():
+    from connectonion import SlashCommand
+    return SlashCommand
+
+
+SlashCommand = Lazy(_slash_command)
 
 
 def _get_email_tool():
     """Get the first configured email tool (Gmail or Outlook)."""
-    # Access via agent's tool registry
-    if hasattr(agent.tools, 'gmail'):
-        return agent.tools.gmail
-    if hasattr(agent.tools, 'outlook'):
-        return agent.tools.outlook
-    return None
+    return get_email_tool()
+
+
+def _precomputed(name: str) -> str | None:
+    """A result the precompute worker stored for `name`, with its freshness, if recent enough."""
+    if not (agent_config.has_gmail or agent_config.has_outlook):
+        return None
+    from tools.precompute import freshness
+    entry = get_precomputed().get(name, max_age=float(os.getenv("PRECOMPUTE_MAX_AGE", "900")))
+    if entry is None:
+        return None
+    return f"{entry['result']}\n\n(Precomputed {freshness(entry['computed_at'])})"
+
+
+def _scan_progress(email, progress):
+    """Report contact scan progress to progress(text) while the block runs."""
+    scan = getattr(email, "contact_scan", None)
+    return scan.reporting(progress) if scan and progress else nullcontext()
 
 
 def do_inbox(count: int = 10, unread: bool = False) -> str:
@@ -32,31 +60,48 @@ def do_search(query: str, count: int = 10) -> str:
     return email.search_emails(query=query, max_results=count)
 
 
-def do_contacts() -> str:
-    email = _get_email_tool()
-    if not email:
+def do_contacts(contacts_file: str = "data/contacts.csv") -> str:
+    if not (agent_config.has_gmail or agent_config.has_outlook):
         return "No email account connected. Use /link-gmail or /link-outlook to connect."
-    # Gmail has get_cached_contacts, Outlook may not
-    if hasattr(email, 'get_cached_contacts'):
-        return email.get_cached_contacts()
-    return "Contact caching not available for this provider."
-
-
-def do_sync(max_emails: int = 500, exclude: str = "openonion.ai,connectonion.com") -> str:
+    if not agent_config.has_gmail:
+        return "Contact caching not available for this provider."
+    # Read the CSV cache directly (same output as Gmail.get_cached_contacts) so
+    # listing contacts doesn't import the provider SDK or authenticate
+    path = Path(contacts_file)
+    if not path.exists():
+        return "No cached contacts. Run sync_contacts() first."
+    with open(path, 'r', encoding="utf-8") as f:
+        contacts = list(csv.DictReader(f))
+    if not contacts:
+        return "No contacts in cache. Run sync_contacts() first."
+
+    result = [f"Cached contacts ({len(contacts)}):\n"]
+    for c in contacts[:50]:
+        result.append(f"- {c.get('name', '')} <{c['email']}> ({c.get('frequency', 0)} emails)")
+    return "\n".join(result)
+
+
+def do_sync(max_emails: int = 500, exclude: str = "openonion.ai,connectonion.com", progress=None) -> str:
     email = _get_email_tool()
     if not email:
         return "No email account connected. Use /link-gmail or /link-outlook to connect."
     if hasattr(email, 'sync_contacts'):
-        return email.sync_contacts(max_emails=max_emails, exclude_domains=exclude)
+        with _scan_progress(email, progress):
+            return email.sync_contacts(max_emails=max_emails, exclude_domains=exclude)
     return "Contact syncing not available for this provider."
 
 
-def do_init(max_emails: int = 500, top_n: int = 10, exclude: str = "openonion.ai,connectonion.com") -> str:
+def do_init(max_emails: int = 500, top_n: int = 10, exclude: str = "openonion.ai,connectonion.com",
+            progress=None) -> str:
     from agent import init_crm_database
-    return init_crm_database(max_emails=max_emails, top_n=top_n, exclude_domains=exclude)
+    with _scan_progress(_get_email_tool(), progress):
+        return init_crm_database(max_emails=max_emails, top_n=top_n, exclude_domains=exclude)
 
 
-def do_unanswered(days: int = 120, count: int = 20) -> str:
+def do_unanswered(days: int = 120, count: int = 20, fresh: bool = False) -> str:
+    stored = None if fresh else _precomputed(f"unanswered:{days}:{count}")
+    if stored:
+        return stored
     email = _get_email_tool()
     if not email:
         return "No email account connected. Use /link-gmail or /link-outlook to connect."
@@ -78,8 +123,11 @@ def do_identity(detect: bool = False) -> str:
     return "Identity detection not available for this provider."
 
 
-def do_today() -> str:
-    """Run /today command using SlashCommand."""
+def do_today(fresh: bool = False) -> str:
+    """Run /today command using SlashCommand (served from the precompute worker when it has a recent briefing)."""
+    stored = None if fresh else _precomputed("today")
+    if stored:
+        return stored
     from datetime import datetime, timedelta
     email = _get_email_tool()
     if not email:
@@ -93,16 +141,83 @@ def do_today() -> str:
     yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y/%m/%d')
     emails = email.search_emails(query=f"after:{yesterday}", max_results=50)
 
-    # Replace {emails} placeholder in prompt
-    prompt = cmd.prompt.replace("{emails}", emails)
-    return agent.input(prompt)
+    def run(listing: str) -> str:
+        # Replace {emails} placeholder in prompt
+        prompt = cmd.prompt.replace("{emails}", listing)
+        # Only the tools the command declares, with the short command prompt
+        return run_command(cmd, prompt)
+
+    # Unchanged mail returns the last briefing; a few new emails are classified on their own and merged in
+    briefings = get_briefing_cache()
+    if briefings is None:
+        return run(emails)
+    mailbox = getattr(email, "mailbox", None)
+    return briefings.brief(emails, day=yesterday, run=run, labels_for=mailbox.labels_for if mailbox else None)
 
 
 def do_ask(question: str) -> str:
-    return agent.input(question)
+    # One-shot question: compact system prompt, see get_ask_agent()
+    return get_ask_agent().input(question)
 
 
-def do_host(port: int = 8000, trust: str = "careful"):
-    """Start the agent as an HTTP/WebSocket server."""
+def do_host(port: int = 8000, trust: str = "careful", precompute: bool = False):
+    """Start the agent as an HTTP/WebSocket server (optionally with the precompute worker alongside)."""
     from connectonion import host
-    host(agent, port=port, trust=trust)
+    if precompute:
+        precompute_worker().start()
+    host(get_host_agent(), port=port, trust=trust, http=get_host_routes())
+
+
+def precompute_worker(interval: float = None, on_run=None):
+    """Worker that refreshes the mailbox, the /today briefing and the unanswered list on a schedule."""
+    from tools.precompute import PrecomputeWorker
+
+    def sync_mailbox():
+        email = _get_email_tool()
+        mailbox = getattr(email, "mailbox", None)
+        changed = mailbox.sync(force=True) if mailbox is not None else None
+        # New mail (or no mirror to tell): recompute the reads instead of reusing cached ones
+        result_cache = getattr(email, "result_cache", None)
+        if result_cache is not None and changed != 0:
+            result_cache.invalidate()
+
+    jobs = [
+        ("mailbox", sync_mailbox),
+        ("today", lambda: do_today(fresh=True)),
+        ("unanswered:120:20", lambda: do_unanswered(fresh=True)),
+    ]
+    interval = interval or float(os.getenv("PRECOMPUTE_INTERVAL", "300"))
+    return PrecomputeWorker(get_precomputed(), jobs, interval=interval, on_run=on_run)
+
+
+def do_daemon(precompute: bool = False, ready=None) -> str:
+    """Serve CLI commands from this warm process over the daemon socket until interrupted."""
+    from .daemon import running, socket_path, start_server, warm_up
+    if running():
+        return f"A daemon is already running on {socket_path()}."
+    warm_up()
+    if precompute and (agent_config.has_gmail or agent_config.has_outlook):
+        precompute_worker().start()
+    server = start_server()
+    if ready:
+        ready(socket_path())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        socket_path().unlink(missing_ok=True)
+    return "Daemon stopped."
+
+
+def do_worker(interval: float = None, on_run=None):
+    """Run the precompute worker in the foreground until interrupted."""
+    if not (agent_config.has_gmail or agent_config.has_outlook):
+        return "No email account connected. Use /link-gmail or /link-outlook to connect."
+    worker = precompute_worker(interval, on_run=on_run)
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        pass
+    return "Precompute worker stopped."
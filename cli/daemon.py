@@ -0,0 +1,179 @@
+"""
+Warm daemon for the CLI.
+
+Every `email <cmd>` is a new process that imports connectonion, builds the
+provider tools and agents, authenticates and opens new connections before it
+does any real work. `email daemon` keeps all of that alive in one process
+behind a Unix socket (data/daemon.sock, DAEMON_SOCKET to change it), and the
+Typer commands forward to it when it is running, so a command costs the
+client's start-up plus the API/LLM work itself.
+
+Protocol: one JSON request line {"command", "kwargs"}; the daemon answers
+with JSON lines, {"progress": text} while the command runs and a final
+{"result": text} or {"error": text}.
+
+Commands that run an agent (today, ask, init) go one at a time; reads run
+concurrently. `ask` reaches the agent's shell tool, so the socket is created
+owner-only and connections from other users are refused (peer credentials).
+Without a daemon (or with EMAIL_DAEMON=false) forward() returns None and the
+command runs in-process as before.
+
+Usage:
+    email daemon                 # foreground, Ctrl+C to stop
+    email inbox                  # forwarded while the daemon runs
+"""
+
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+from contextlib import nullcontext
+from pathlib import Path
+
+
+AGENT_COMMANDS = {"today", "ask", "init"}
+
+
+class DaemonError(Exception):
+    """The daemon ran the command and it failed."""
+
+
+def socket_path() -> Path:
+    return Path(os.getenv("DAEMON_SOCKET", "data/daemon.sock"))
+
+
+# === Client ===
+
+def forward(command: str, progress=None, **kwargs) -> str | None:
+    """Run `command` in the daemon and return its output, or None if no daemon is running."""
+    path = socket_path()
+    if os.getenv("EMAIL_DAEMON", "true").lower() == "false" or not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except (ConnectionRefusedError, FileNotFoundError):
+        sock.close()
+        return None  # stale socket left by a daemon that didn't exit cleanly
+    try:
+        with sock, sock.makefile("rwb") as stream:
+            stream.write((json.dumps({"command": command, "kwargs": kwargs}) + "\n").encode())
+            stream.flush()
+            for line in stream:
+                message = json.loads(line)
+                if "progress" in message:
+                    if progress:
+                        progress(message["progress"])
+                elif "error" in message:
+                    raise DaemonError(message["error"])
+                else:
+                    return message["result"]
+    except (BrokenPipeError, ConnectionResetError):
+        pass  # refused (another user's daemon) or the daemon stopped
+    raise DaemonError("Daemon closed the connection without a result")
+
+
+# === Server ===
+
+def default_commands() -> dict:
+    from . import core
+    return {
+        "inbox": core.do_inbox, "search": core.do_search, "contacts": core.do_contacts,
+        "sync": core.do_sync, "init": core.do_init, "unanswered": core.do_unanswered,
+        "identity": core.do_identity, "today": core.do_today, "ask": _one_shot_ask,
+    }
+
+
+def _one_shot_ask(question: str) -> str:
+    """do_ask with a fresh conversation each time, like a separate `email ask` process."""
+    from agent import get_ask_agent
+    from .core import do_ask
+    get_ask_agent().reset_conversation()
+    return do_ask(question)
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, commands: dict):
+        self.commands = commands
+        self.agent_lock = threading.Lock()
+        super().__init__(str(path), _Handler)
+
+    def verify_request(self, request, client_address) -> bool:
+        """Serve only processes of the user running the daemon."""
+        uid = peer_uid(request)
+        return uid is None or uid == os.getuid()
+
+
+def peer_uid(sock) -> int | None:
+    """Uid of the process at the other end of a Unix socket, or None where the OS doesn't say."""
+    if hasattr(socket, "SO_PEERCRED"):  # Linux: struct ucred {pid, uid, gid}
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        return struct.unpack("3i", creds)[1]
+    if hasattr(socket, "LOCAL_PEERCRED"):  # macOS/BSD: struct xucred {version, uid, ngroups, groups[16]}
+        creds = sock.getsockopt(0, socket.LOCAL_PEERCRED, struct.calcsize("2Ih16I"))
+        return struct.unpack_from("2I", creds)[1]
+    return None  # the socket's owner-only mode still applies
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        def send(message: dict):
+            self.wfile.write((json.dumps(message, ensure_ascii=False) + "\n").encode())
+            self.wfile.flush()
+
+        line = self.rfile.readline()
+        if not line.strip():
+            return  # connection check (running()), no request
+        try:
+            request = json.loads(line)
+            name, kwargs = request["command"], request.get("kwargs", {})
+            command = self.server.commands.get(name)
+            if command is None:
+                send({"error": f"Unknown command: {name}"})
+                return
+            if name in ("sync", "init"):
+                kwargs["progress"] = lambda text: send({"progress": text})
+            with self.server.agent_lock if name in AGENT_COMMANDS else nullcontext():
+                result = command(**kwargs)
+            send({"result": result})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client went away
+        except Exception as e:
+            send({"error": f"{type(e).__name__}: {e}"})
+
+
+def running() -> bool:
+    """Whether a daemon is answering on the socket."""
+    path = socket_path()
+    if not path.exists():
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+            return True
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+
+
+def start_server(commands: dict = None) -> DaemonServer:
+    """Bind the socket, replacing a stale one. It is owner-only from the moment it exists."""
+    path = socket_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    # bind() creates the file with the umask's mode; a chmod afterwards leaves a window
+    umask = os.umask(0o177)
+    try:
+        return DaemonServer(path, commands or default_commands())
+    finally:
+        os.umask(umask)
+
+
+def warm_up():
+    """Import the SDK and build the provider tools and agents before the first request."""
+    from agent import get_ask_agent, get_email_tool
+    if get_email_tool():
+        get_ask_agent()
@@ -7,9 +7,10 @@ Textual-based chat interface with slash commands and autocomplete.
 import subprocess
 from pathlib import Path
 
+from connectonion import on_complete
 from connectonion.tui import Chat, CommandItem
 
-from agent import agent
+from agent import get_agent
 from .core import (
     do_inbox, do_search, do_contacts, do_sync,
     do_init, do_unanswered, do_identity, do_today,
@@ -121,6 +122,7 @@ def interactive():
     contacts = contact_provider.to_command_items()
 
     # Create chat UI
+    agent = get_agent()
     chat = Chat(
         agent=agent,
         title="Email Agent",
@@ -158,8 +160,27 @@ def interactive():
     chat.command("/search", _search)
 
     chat.command("/contacts", lambda _: do_contacts())
-    chat.command("/sync", lambda _: do_sync())
-    chat.command("/init", lambda _: do_init())
+
+    # Keep @ autocomplete fresh: /sync, /init and agent tools (update_contact) rewrite contacts.csv
+    def _refreshing_contacts(handler):
+        def run(text: str) -> str:
+            result = handler(text)
+            contact_provider.refresh(contacts)
+            return result
+        return run
+
+    @on_complete
+    def _refresh_contacts(_agent):
+        contact_provider.refresh(contacts)
+
+    agent._register_event(_refresh_contacts)
+
+    # Long scans report progress in the status bar (handlers run on a worker thread)
+    def _progress(text: str):
+        chat.call_from_thread(chat._update_status, text)
+
+    chat.command("/sync", _refreshing_contacts(lambda _: do_sync(progress=_progress)))
+    chat.command("/init", _refreshing_contacts(lambda _: do_init(progress=_progress)))
     chat.command("/unanswered", lambda _: do_unanswered())
     chat.command("/identity", lambda _: do_identity())
 
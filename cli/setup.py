@@ -6,7 +6,6 @@ from pathlib import Path
 import os
 from rich.console import Console
 from rich.panel import Panel
-from rich.markdown import Markdown
 
 console = Console()
 
@@ -87,9 +86,10 @@ def check_setup(skip_init: bool = False) -> bool:
 
             if "Yes" in choice:
                 console.print("\n[dim]Starting CRM initialization...[/dim]\n")
+                from rich.markdown import Markdown
                 from .core import do_init
-                with console.status("[bold blue]Processing...[/bold blue]"):
-                    result = do_init()
+                with console.status("[bold blue]Processing...[/bold blue]") as status:
+                    result = do_init(progress=lambda text: status.update(f"[bold blue]{text}[/bold blue]"))
                 console.print(Panel(Markdown(result), title="[bold green]✓ Done[/bold green]", border_style="green"))
 
     return True
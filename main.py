@@ -5,9 +5,11 @@ Purpose: Deploy email-agent as HTTP server on ConnectOnion Cloud
 Usage: co deploy (uses this file as entrypoint)
 """
 
-from agent import agent
+from agent import get_host_agent, get_host_routes
 from connectonion import host
 
 # trust="strict" requires signed requests with Ed25519 signature
 # This prevents unauthorized access to email tools
-host(agent, trust="strict")
+# A pool of agents serves concurrent sessions (HOST_POOL_SIZE, default 8); requests
+# past that wait in a bounded queue (HOST_QUEUE, HOST_QUEUE_WAIT), see GET /admin/queue
+host(get_host_agent(), trust="strict", http=get_host_routes())
@@ -0,0 +1,116 @@
+"""Tests for admission control in front of host turns."""
+
+import threading
+import time
+
+import pytest
+
+from tools.admission import AdmissionControl, Busy
+
+
+class SlowAgent:
+    """Agent stand-in whose turns take `delay` seconds and record their order."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.served = []
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def input(self, prompt, session=None):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.served.append(prompt)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        return prompt
+
+
+def ask(agent, prompt, client, errors=None):
+    try:
+        agent.input(prompt, session={"requester": {"address": client, "level": "contact"}})
+    except Busy as e:
+        if errors is None:
+            raise
+        errors.append(e)
+
+
+def run_all(threads):
+    for t in threads:
+        t.start()
+        time.sleep(0.005)  # keep arrival order deterministic
+    for t in threads:
+        t.join()
+
+
+class TestAdmission:
+    """Tests for the concurrency limit, fairness and rejections."""
+
+    def test_limit_bounds_running_turns(self):
+        """Verify no more than `limit` turns run at once and queued ones all finish."""
+        agent = AdmissionControl(limit=2, max_queue=10).attach(SlowAgent())
+        run_all([threading.Thread(target=ask, args=(agent, i, f"c{i}")) for i in range(6)])
+        assert agent.peak == 2
+        assert len(agent.served) == 6
+        assert agent.admission.metrics()["admitted"] == 6
+
+    def test_clients_take_turns(self):
+        """Verify a client with many queued requests doesn't starve one that arrives later."""
+        agent = AdmissionControl(limit=1, max_queue=10, max_per_client=10).attach(SlowAgent())
+        threads = [threading.Thread(target=ask, args=(agent, f"a{i}", "alice")) for i in range(4)]
+        threads.append(threading.Thread(target=ask, args=(agent, "b0", "bob")))
+        run_all(threads)
+        # a0 was running; of the queued requests, bob's comes right after alice's first
+        assert agent.served[:3] == ["a0", "a1", "b0"]
+
+    def test_full_queue_rejects_with_retry_hint(self):
+        """Verify a request that doesn't fit the queue is rejected at once with a retry time."""
+        agent = AdmissionControl(limit=1, max_queue=1).attach(SlowAgent(delay=0.2))
+        errors = []
+        run_all([threading.Thread(target=ask, args=(agent, i, f"c{i}", errors)) for i in range(3)])
+        assert len(errors) == 1
+        assert errors[0].retry_after >= 1
+        assert "Retry after" in str(errors[0])
+        assert agent.admission.metrics()["rejected_full"] == 1
+
+    def test_per_client_queue_cap(self):
+        """Verify one client can't fill the whole queue."""
+        agent = AdmissionControl(limit=1, max_queue=10, max_per_client=1).attach(SlowAgent(delay=0.1))
+        errors = []
+        run_all([threading.Thread(target=ask, args=(agent, i, "alice", errors)) for i in range(3)])
+        assert len(errors) == 1
+        assert "of your requests already queued" in str(errors[0])
+
+    def test_deadline_rejects_and_frees_the_queue(self):
+        """Verify a request queued past max_wait is rejected and leaves the queue."""
+        agent = AdmissionControl(limit=1, max_queue=5, max_wait=0.05).attach(SlowAgent(delay=0.3))
+        errors = []
+        run_all([threading.Thread(target=ask, args=(agent, i, f"c{i}", errors)) for i in range(2)])
+        assert len(errors) == 1
+        assert "waited" in str(errors[0])
+        metrics = agent.admission.metrics()
+        assert metrics["rejected_deadline"] == 1
+        assert metrics["queued"] == 0
+        assert metrics["running"] == 0
+
+    def test_failed_turn_frees_its_slot(self):
+        """Verify an exception in a turn still releases the slot."""
+        class Failing:
+            def input(self, prompt, session=None):
+                raise RuntimeError("llm down")
+
+        agent = AdmissionControl(limit=1).attach(Failing())
+        with pytest.raises(RuntimeError):
+            agent.input("x")
+        assert agent.admission.metrics()["running"] == 0
+
+    def test_metrics_report_waits(self):
+        """Verify wait percentiles reflect time spent queued."""
+        agent = AdmissionControl(limit=1, max_queue=5).attach(SlowAgent(delay=0.1))
+        run_all([threading.Thread(target=ask, args=(agent, i, f"c{i}")) for i in range(2)])
+        metrics = agent.admission.metrics()
+        assert metrics["wait_max"] >= 0.05
+        assert metrics["turn_avg"] > 0
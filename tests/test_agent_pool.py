@@ -0,0 +1,163 @@
+"""Tests for the host-mode agent pool."""
+
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from tools.admission import AdmissionControl, Busy
+from tools.agent_pool import AgentPool, check_host_support
+
+
+def turn(pool, seconds=0.0):
+    """What host() does per request: get an agent, hold its turn lock, run the turn."""
+    agent = pool()
+    agent._host_turn_lock.acquire()
+    try:
+        time.sleep(seconds)
+        return agent
+    finally:
+        agent._host_turn_lock.release()
+
+
+@pytest.fixture
+def pool():
+    return AgentPool(lambda: SimpleNamespace(), max_size=3)
+
+
+class TestAgentPool:
+    """Tests for handing out, growing, sharing and trimming agents."""
+
+    def test_idle_agent_reused(self, pool):
+        """Verify back-to-back requests get the same agent instead of a new one."""
+        assert turn(pool) is turn(pool)
+        assert pool.stats()["created"] == 1
+
+    def test_grows_while_busy_up_to_max(self, pool):
+        """Verify concurrent requests get separate agents, at most max_size of them."""
+        agents = []
+        threads = [threading.Thread(target=lambda: agents.append(turn(pool, 0.2))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len({id(a) for a in agents}) == 3
+        assert pool.stats()["size"] == 3
+        assert pool.stats()["waits"] >= 1
+
+    def test_turns_on_one_agent_never_overlap(self):
+        """Verify a full pool queues requests on an agent instead of running two turns on it."""
+        pool = AgentPool(lambda: SimpleNamespace(), max_size=1)
+        active, overlaps = [], []
+
+        def run():
+            agent = pool()
+            with agent._host_turn_lock:
+                active.append(1)
+                overlaps.append(len(active) > 1)
+                time.sleep(0.05)
+                active.pop()
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert overlaps == [False] * 4
+
+    def test_idle_agents_evicted(self):
+        """Verify agents unused past idle_timeout are dropped, keeping min_size."""
+        pool = AgentPool(lambda: SimpleNamespace(), max_size=3, min_size=1, idle_timeout=0.05)
+        threads = [threading.Thread(target=turn, args=(pool, 0.1)) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        time.sleep(0.1)
+        turn(pool)
+        assert pool.stats()["size"] == 1
+        assert pool.stats()["evicted"] == 2
+
+    def test_claim_without_turn_lapses(self, pool):
+        """Verify an agent handed out outside a turn (startup metadata) is free again later."""
+        first = pool()
+        with patch("tools.agent_pool.CLAIM_TTL", 0):
+            assert turn(pool) is first
+        assert pool.stats()["created"] == 1
+
+    def test_failed_build_frees_the_slot(self):
+        """Verify a factory error doesn't leave the pool believing an agent is being built."""
+        calls = []
+
+        def factory():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("auth failed")
+            return SimpleNamespace()
+
+        pool = AgentPool(factory, max_size=1)
+        with pytest.raises(RuntimeError):
+            pool()
+        assert turn(pool) is not None
+
+
+def host_turn(pool, seconds=0.0):
+    """host()'s order exactly: the lease is acquired inside the try and released in its finally."""
+    agent = pool()
+    lock = agent._host_turn_lock
+    try:
+        lock.acquire()
+        time.sleep(seconds)
+        return agent
+    finally:
+        lock.release()
+
+
+class TestAdmission:
+    """Tests for admission in front of the pool."""
+
+    def test_queued_requests_hold_no_agent(self):
+        """Verify requests beyond the limit wait in the admission queue and the pool stays at the limit."""
+        admission = AdmissionControl(limit=2, max_queue=10)
+        pool = AgentPool(lambda: SimpleNamespace(), max_size=2, admission=admission)
+        threads = [threading.Thread(target=host_turn, args=(pool, 0.1)) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert pool.stats()["size"] == 2
+        metrics = admission.metrics()
+        assert metrics["admitted"] == 6
+        assert metrics["running"] == 0
+        assert metrics["wait_max"] >= 0.05
+
+    def test_rejected_request_releases_nothing(self):
+        """Verify a Busy rejection leaves the running turn's lease and slot alone."""
+        admission = AdmissionControl(limit=1, max_queue=0)
+        pool = AgentPool(lambda: SimpleNamespace(), max_size=1, admission=admission)
+        running = threading.Thread(target=host_turn, args=(pool, 0.2))
+        running.start()
+        time.sleep(0.05)
+        with pytest.raises(Busy):
+            host_turn(pool)
+        assert admission.metrics()["running"] == 1
+        running.join()
+        assert admission.metrics()["running"] == 0
+        assert host_turn(pool) is not None
+
+
+class TestHostSupport:
+    """Tests for detecting a host() that no longer uses _host_turn_lock."""
+
+    def test_installed_host_supported(self):
+        """Verify the installed connectonion passes the check."""
+        check_host_support()
+
+    def test_missing_turn_lock_raises(self, monkeypatch):
+        """Verify a host() that doesn't take _host_turn_lock is reported clearly."""
+        from connectonion.network.host.session import turn as host_turn_module
+        monkeypatch.setattr(host_turn_module, "input_handler", lambda *a, **kw: None)
+        with pytest.raises(RuntimeError, match="_host_turn_lock"):
+            check_host_support()
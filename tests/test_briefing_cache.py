@@ -0,0 +1,120 @@
+"""Tests for the memoized /today briefing."""
+
+import pytest
+
+from tools.briefing_cache import BriefingCache, merge, parse_entries
+
+
+def listing(*emails):
+    """search_emails-style listing for (id, sender, unread) tuples."""
+    lines = [f"Found {len(emails)} email(s):\n"]
+    for i, (email_id, sender, unread) in enumerate(emails, 1):
+        lines.append(f"{i}. {'[UNREAD]' if unread else ''} From: {sender}")
+        lines.append(f"   Subject: About {email_id}")
+        lines.append(f"   ID: {email_id}\n")
+    return "\n".join(lines)
+
+
+BRIEFING = """## Summary
+2 emails from 2 senders
+
+## 🔴 High Priority (Urgent - needs immediate action)
+1. **From Ann**: Contract needs signature today
+
+## ⚪ Automated/FYI (No action needed)
+1. **From GitHub**: CI passed
+"""
+
+UPDATE = """## Summary
+1 emails from 1 senders
+
+## 🔴 High Priority (Urgent - needs immediate action)
+1. **From Bob**: Server down, needs fix
+
+## 🟢 Low Priority (Can wait)
+1. **From Bob**: Lunch next week
+"""
+
+TWO = [("m1", "Ann <ann@acme.com>", True), ("m2", "GitHub <noreply@github.com>", False)]
+
+
+class FakeLLM:
+    def __init__(self):
+        self.listings = []
+
+    def __call__(self, listing):
+        self.listings.append(listing)
+        return BRIEFING if len(self.listings) == 1 else UPDATE
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return BriefingCache(path=str(tmp_path / "today_briefing.json"))
+
+
+class TestBrief:
+    """Tests for reuse, incremental merge and rebuild."""
+
+    def test_same_messages_served_from_cache(self, cache):
+        """Verify an unchanged listing returns the stored briefing without the LLM."""
+        run = FakeLLM()
+        first = cache.brief(listing(*TWO), day="2026/10/17", run=run)
+        assert cache.brief(listing(*TWO), day="2026/10/17", run=run) == first
+        assert len(run.listings) == 1 and cache.hits == 1
+
+    def test_new_messages_classified_alone_and_merged(self, cache):
+        """Verify only the new message goes to the LLM and its lines join the right sections."""
+        run = FakeLLM()
+        cache.brief(listing(*TWO), day="2026/10/17", run=run)
+        briefing = cache.brief(listing(("m3", "Bob <bob@x.io>", True), *TWO), day="2026/10/17", run=run)
+        assert "ID: m3" in run.listings[1] and "ID: m1" not in run.listings[1]
+        assert "3 emails from 3 senders" in briefing
+        assert "1. **From Ann**: Contract needs signature today\n2. **From Bob**: Server down" in briefing
+        assert briefing.index("🟢") < briefing.index("⚪")
+        assert cache.merges == 1
+
+    def test_read_state_change_rebuilds(self, cache):
+        """Verify marking a message read invalidates the stored briefing."""
+        run = FakeLLM()
+        cache.brief(listing(*TWO), day="2026/10/17", run=run)
+        cache.brief(listing(("m1", "Ann <ann@acme.com>", False), TWO[1]), day="2026/10/17", run=run)
+        assert cache.rebuilds == 2 and "ID: m2" in run.listings[1]
+
+    def test_label_change_rebuilds(self, cache):
+        """Verify a label change reported by the mirror invalidates the stored briefing."""
+        run = FakeLLM()
+        cache.brief(listing(*TWO), day="2026/10/17", run=run, labels_for=lambda ids: {"m1": "INBOX"})
+        cache.brief(listing(*TWO), day="2026/10/17", run=run, labels_for=lambda ids: {"m1": "INBOX,STARRED"})
+        assert cache.rebuilds == 2
+
+    def test_new_day_rebuilds(self, cache):
+        """Verify a briefing from another day is never reused."""
+        run = FakeLLM()
+        cache.brief(listing(*TWO), day="2026/10/17", run=run)
+        cache.brief(listing(*TWO), day="2026/10/18", run=run)
+        assert cache.rebuilds == 2
+
+    def test_too_many_new_rebuilds(self, tmp_path):
+        """Verify a burst of new mail gets a full briefing instead of a merge."""
+        cache = BriefingCache(path=str(tmp_path / "b.json"), max_new=1)
+        run = FakeLLM()
+        cache.brief(listing(*TWO), day="2026/10/17", run=run)
+        cache.brief(listing(("m3", "a@x.io", True), ("m4", "b@x.io", True), *TWO), day="2026/10/17", run=run)
+        assert cache.rebuilds == 2 and cache.merges == 0
+
+
+class TestParsing:
+    """Tests for listing parsing and section merge."""
+
+    def test_parse_entries(self):
+        """Verify ids, read state and senders are read from the listing."""
+        entries = parse_entries(listing(*TWO))
+        assert list(entries) == ["m1", "m2"]
+        assert entries["m1"]["unread"] and not entries["m2"]["unread"]
+        assert entries["m2"]["sender"] == "GitHub <noreply@github.com>"
+
+    def test_merge_keeps_section_order(self):
+        """Verify merged sections follow the command's priority order."""
+        merged = merge(BRIEFING, UPDATE, parse_entries(listing(*TWO)))
+        markers = [line[3] for line in merged.splitlines() if line.startswith("## ") and line[3] in "🔴🟡🟢⚪"]
+        assert markers == ["🔴", "🟢", "⚪"]
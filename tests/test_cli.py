@@ -8,6 +8,15 @@ from unittest.mock import Mock, patch, MagicMock
 class TestDoToday:
     """Tests for do_today function."""
 
+    @pytest.fixture(autouse=True)
+    def briefings(self, tmp_path):
+        from tools.briefing_cache import BriefingCache
+        from tools.precompute import Precomputed
+        cache = BriefingCache(path=str(tmp_path / "today_briefing.json"))
+        with patch('cli.core.get_briefing_cache', return_value=cache), \
+                patch('cli.core.get_precomputed', return_value=Precomputed(str(tmp_path / "precomputed.json"))):
+            yield cache
+
     def test_date_query_format(self):
         """Verify date query format is correct."""
         yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y/%m/%d')
@@ -18,9 +27,9 @@ class TestDoToday:
         assert len(date_part.split('/')) == 3  # YYYY/MM/DD
 
     @patch('cli.core._get_email_tool')
-    @patch('cli.core.agent')
+    @patch('cli.core.run_command')
     @patch('cli.core.SlashCommand')
-    def test_calls_search_with_correct_query(self, mock_cmd_class, mock_agent, mock_get_email):
+    def test_calls_search_with_correct_query(self, mock_cmd_class, mock_run, mock_get_email):
         """Verify do_today calls search_emails with yesterday's date."""
         mock_email = Mock()
         mock_get_email.return_value = mock_email
@@ -28,7 +37,7 @@ class TestDoToday:
         mock_cmd.prompt = "Analyze: {emails}"
         mock_cmd_class.load.return_value = mock_cmd
         mock_email.search_emails.return_value = "email results"
-        mock_agent.input.return_value = "briefing"
+        mock_run.return_value = "briefing"
 
         from cli.core import do_today
         result = do_today()
@@ -40,9 +49,9 @@ class TestDoToday:
         )
 
     @patch('cli.core._get_email_tool')
-    @patch('cli.core.agent')
+    @patch('cli.core.run_command')
     @patch('cli.core.SlashCommand')
-    def test_replaces_emails_placeholder(self, mock_cmd_class, mock_agent, mock_get_email):
+    def test_replaces_emails_placeholder(self, mock_cmd_class, mock_run, mock_get_email):
         """Verify {emails} placeholder is replaced in prompt."""
         mock_email = Mock()
         mock_get_email.return_value = mock_email
@@ -50,12 +59,41 @@ class TestDoToday:
         mock_cmd.prompt = "Analyze these: {emails}"
         mock_cmd_class.load.return_value = mock_cmd
         mock_email.search_emails.return_value = "test email data"
-        mock_agent.input.return_value = "result"
+        mock_run.return_value = "result"
 
         from cli.core import do_today
         do_today()
 
-        mock_agent.input.assert_called_once_with("Analyze these: test email data")
+        mock_run.assert_called_once_with(mock_cmd, "Analyze these: test email data")
+
+    @patch('cli.core._get_email_tool')
+    @patch('cli.core.run_command')
+    @patch('cli.core.SlashCommand')
+    def test_unchanged_mail_reuses_briefing(self, mock_cmd_class, mock_run, mock_get_email, briefings):
+        """Verify a second /today over the same messages doesn't run the LLM again."""
+        mock_email = Mock(spec=["search_emails"])
+        mock_get_email.return_value = mock_email
+        mock_cmd_class.load.return_value = Mock(prompt="Analyze: {emails}")
+        mock_email.search_emails.return_value = "1. [UNREAD] From: ann@acme.com\n   Subject: Hi\n   ID: m1\n"
+        mock_run.return_value = "## Summary\n1 emails from 1 senders\n"
+
+        from cli.core import do_today
+        assert do_today() == do_today()
+        assert mock_run.call_count == 1
+        assert briefings.hits == 1
+
+    @patch('cli.core.agent_config')
+    @patch('cli.core._get_email_tool')
+    def test_serves_precomputed_briefing(self, mock_get_email, mock_config):
+        """Verify a recent worker briefing is returned with its freshness, without touching the provider."""
+        from cli.core import do_today, get_precomputed
+        get_precomputed().put("today", "## Summary\n3 emails from 2 senders")
+
+        result = do_today()
+
+        assert result.startswith("## Summary\n3 emails from 2 senders")
+        assert "(Precomputed as of " in result
+        mock_get_email.assert_not_called()
 
     @patch('cli.core._get_email_tool')
     @patch('cli.core.SlashCommand')
@@ -166,12 +204,67 @@ class TestDoSearch:
         )
 
 
+class Outlook:
+    def search_emails(self, query: str, max_results: int = 10) -> str:
+        return "results"
+
+    def get_email_body(self, email_id: str) -> str:
+        return "body"
+
+    def send(self, to: str, subject: str, body: str) -> str:
+        return "sent"
+
+
+class MicrosoftCalendar:
+    def get_today_events(self) -> str:
+        return "events"
+
+
+class TestCommandTools:
+    """Tests for slash command tool subsets."""
+
+    @pytest.fixture
+    def tools(self):
+        outlook, calendar = Outlook(), MicrosoftCalendar()
+        shared = {"memory": Mock(), "shell": Mock(), "todo": Mock()}
+        with patch('agent.get_provider_tools', return_value=[outlook, calendar]), \
+                patch('agent.get_shared_tools', return_value=shared):
+            yield outlook, calendar
+
+    def test_gmail_names_resolve_to_linked_provider(self, tools):
+        """Verify Gmail.* entries pick the linked email tool's methods, and nothing else."""
+        from agent import command_tools
+        outlook, calendar = tools
+        resolved = command_tools(["Gmail.search_emails", "Gmail.get_email_body", "GoogleCalendar"])
+        assert resolved == [outlook.search_emails, outlook.get_email_body, calendar]
+
+    def test_functions_and_unknown_entries(self, tools):
+        """Verify function tools resolve by name and unknown entries are skipped."""
+        from agent import command_tools, top_contacts
+        assert command_tools(["top_contacts", "Gmail.no_such_method", "Slack.post"]) == [top_contacts]
+
+    @patch('agent.get_agent')
+    @patch('agent.get_command_agent')
+    def test_run_command_uses_subset_agent(self, mock_command_agent, mock_agent):
+        """Verify a command with a tools list runs on its own agent, others on the main agent."""
+        from agent import run_command
+        cmd = Mock(tools=["Gmail.search_emails"])
+        cmd.name = "today"
+        run_command(cmd, "brief me")
+        mock_command_agent.assert_called_once_with("today", ("Gmail.search_emails",))
+        mock_command_agent.return_value.input.assert_called_once_with("brief me")
+
+        run_command(Mock(tools=None), "brief me")
+        mock_agent.return_value.input.assert_called_once_with("brief me")
+
+
 class TestDoAsk:
     """Tests for do_ask function."""
 
-    @patch('cli.core.agent')
-    def test_passes_question_to_agent(self, mock_agent):
-        """Verify do_ask passes question to agent.input."""
+    @patch('cli.core.get_ask_agent')
+    def test_passes_question_to_agent(self, mock_get_agent):
+        """Verify do_ask passes question to the one-shot agent's input."""
+        mock_agent = mock_get_agent.return_value
         mock_agent.input.return_value = "agent response"
 
         from cli.core import do_ask
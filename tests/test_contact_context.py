@@ -0,0 +1,139 @@
+"""Tests for the contact context pack."""
+
+import csv
+import time
+
+import pytest
+
+from tools.contact_context import ContactContext, _parse_listing
+
+
+LISTING = """Found 2 email(s):
+
+1. [UNREAD] From: Ann Lee <ann@acme.com>
+   Subject: Pricing for Q3
+   Date: Tue, 6 Oct 2026 09:00:00 +0000
+   Preview: Could you send the updated pricing sheet before Friday...
+   ID: m2
+
+2.  From: me@example.com
+   Subject: Re: Intro
+   Date: Mon, 5 Oct 2026 17:00:00 +0000
+   Preview: Great to meet you...
+   ID: m1
+"""
+
+
+class FakeGmail:
+    def __init__(self, tmp_path, delay=0.0):
+        self.delay = delay
+        self.contacts_csv = str(tmp_path / "contacts.csv")
+        with open(self.contacts_csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["email", "name", "frequency", "type", "priority", "company"])
+            writer.writeheader()
+            writer.writerow({"email": "ann@acme.com", "name": "Ann Lee", "frequency": "12",
+                             "type": "PERSON", "priority": "high", "company": "Acme"})
+        self.bodies = []
+
+    def search_emails(self, query: str, max_results: int = 10) -> str:
+        time.sleep(self.delay)
+        return LISTING if "ann@acme.com" in query else "No emails found."
+
+    def get_email_body(self, email_id: str) -> str:
+        self.bodies.append(email_id)
+        return "From: Ann Lee\nSubject: Pricing for Q3\n\n--- Email Body ---\n\n" + "Details. " * 300
+
+
+class FakeCalendar:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def get_upcoming_meetings(self, days_ahead: int = 7) -> str:
+        time.sleep(self.delay)
+        return ("Upcoming meetings (next 14 days):\n\n- Oct 8 10:00: Pricing review\n   Attendees: ann@acme.com\n\n"
+                "- Oct 9 11:00: Board\n   Attendees: bob@other.com\n")
+
+
+class FakeMemory:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def read_memory(self, key: str) -> str:
+        time.sleep(self.delay)
+        if key == "contact:ann@acme.com":
+            return "Prefers calls in the morning. Decision maker for the Q3 deal."
+        return f"Memory not found: {key}"
+
+
+@pytest.fixture
+def pack(tmp_path):
+    return ContactContext(FakeGmail(tmp_path), calendar=FakeCalendar(), memory=FakeMemory())
+
+
+class TestBuild:
+    """Tests for the assembled context block."""
+
+    def test_all_sources_in_one_block(self, pack):
+        """Verify CRM row, notes, shared meetings, recent emails and latest body are included."""
+        block = pack.build("ann@acme.com")
+        assert block.startswith("# Context for ann@acme.com")
+        assert "frequency: 12 | type: PERSON | company: Acme | priority: high" in block
+        assert "Prefers calls in the morning" in block
+        assert "Pricing review" in block and "Board" not in block
+        assert "- Tue, 6 Oct 2026 09:00:00 +0000 | Ann Lee <ann@acme.com> | Pricing for Q3" in block
+        assert "## Latest email" in block
+        assert pack.email_tool.bodies == ["m2"]
+
+    def test_token_budget(self, pack):
+        """Verify the block fits the budget, cutting the latest body first."""
+        block = pack.build("ann@acme.com", max_tokens=300)
+        assert len(block) <= 300 * 4
+        assert "Pricing review" in block
+        assert block.endswith("…")
+
+    def test_sources_run_concurrently(self, tmp_path):
+        """Verify slow sources overlap instead of adding up."""
+        pack = ContactContext(FakeGmail(tmp_path, delay=0.2), calendar=FakeCalendar(delay=0.2),
+                              memory=FakeMemory(delay=0.2))
+        started = time.monotonic()
+        pack.build("ann@acme.com")
+        assert time.monotonic() - started < 0.5
+
+    def test_timeout_bounds_latency(self, tmp_path):
+        """Verify a hung source is reported as timed out without waiting for it."""
+        pack = ContactContext(FakeGmail(tmp_path, delay=2), calendar=FakeCalendar(delay=2),
+                              memory=FakeMemory(), timeout=0.3)
+        started = time.monotonic()
+        block = pack.build("ann@acme.com")
+        assert time.monotonic() - started < 1
+        assert "(unavailable: timed out)" in block
+        assert "Prefers calls in the morning" in block
+
+    def test_failed_source_reported(self, pack):
+        """Verify a failing source is marked unavailable and the rest still come back."""
+        def broken(days_ahead=7):
+            raise ConnectionError("calendar down")
+        pack.calendar.get_upcoming_meetings = broken
+        block = pack.build("ann@acme.com")
+        assert "(unavailable: ConnectionError)" in block
+        assert "Prefers calls in the morning" in block
+
+    def test_unknown_contact(self, pack):
+        """Verify a stranger gets a short block without notes or latest body."""
+        block = pack.build("zed@nowhere.io")
+        assert "Not in contacts." in block
+        assert "## Notes" not in block and "## Latest email" not in block
+
+    def test_not_an_address(self, pack):
+        """Verify anything without an @ is rejected."""
+        assert pack.build("Ann") == "Not an email address: Ann"
+
+
+class TestParseListing:
+    """Tests for reading search_emails output."""
+
+    def test_fields_in_order(self):
+        """Verify each email's fields are picked up, newest first as listed."""
+        emails = _parse_listing(LISTING)
+        assert [e["ID"] for e in emails] == ["m2", "m1"]
+        assert emails[0]["From"] == "Ann Lee <ann@acme.com>"
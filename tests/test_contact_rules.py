@@ -0,0 +1,38 @@
+"""Tests for the rule-based contact first pass."""
+
+import pytest
+
+from tools.contact_rules import classify_one
+
+
+class TestClassify:
+    """Tests for address and name patterns."""
+
+    @pytest.mark.parametrize("email", [
+        "noreply@github.com", "no-reply@accounts.google.com", "notifications@stripe.com",
+        "newsletter@substack.com", "alerts+123@bank.com", "hello@mail.notion.so", "jobs-noreply@linkedin.com",
+    ])
+    def test_notifications(self, email):
+        """Verify automated senders are low-priority notifications."""
+        update = classify_one({"email": email, "name": ""})
+        assert (update["type"], update["priority"]) == ("NOTIFICATION", "low")
+
+    @pytest.mark.parametrize("email", ["support@vercel.com", "team@linear.app", "help.desk@acme.io", "billing@aws.com"])
+    def test_services(self, email):
+        """Verify support/team style addresses are services."""
+        assert classify_one({"email": email, "name": "Acme"})["type"] == "SERVICE"
+
+    def test_freemail_with_real_name_is_person(self):
+        """Verify a freemail address with a display name is a person."""
+        assert classify_one({"email": "dana.scully@gmail.com", "name": "Dana Scully"})["type"] == "PERSON"
+        assert classify_one({"email": "jg@outlook.com", "name": "José García"})["type"] == "PERSON"
+
+    @pytest.mark.parametrize("contact", [
+        {"email": "dana.scully@gmail.com", "name": "dana.scully"},  # name fell back to the local part
+        {"email": "dana@gmail.com", "name": "Dana"},                # single word
+        {"email": "dana@acme.com", "name": "Dana Scully"},          # business domain: needs the LLM
+        {"email": "noreplyguy@acme.com", "name": ""},               # prefix only, not a separator
+    ])
+    def test_ambiguous_left_for_llm(self, contact):
+        """Verify contacts the rules can't settle are returned as ambiguous."""
+        assert classify_one(contact) is None
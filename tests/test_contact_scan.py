@@ -0,0 +1,190 @@
+"""Tests for resumable contact extraction."""
+
+import csv
+import pytest
+
+from tools.contact_scan import ContactScan
+
+
+class _Request:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result() if callable(self.result) else self.result
+
+
+class FakeService:
+    """Gmail API stand-in: 250 messages, newest first, paged like messages.list."""
+
+    def __init__(self, count=250):
+        self.mail = [{
+            "id": f"m{i}", "threadId": f"t{i // 2}", "snippet": f"hello {i}",
+            "payload": {"headers": [
+                {"name": "From", "value": f"Person {i % 7} <p{i % 7}@acme.com>"},
+                {"name": "To", "value": "me@example.com, noreply@spam.com"},
+                {"name": "Subject", "value": f"Subject {i}"},
+                {"name": "Date", "value": f"Mon, {28 - i % 28:02d} Sep 2026 10:00:00 +0000"},
+            ]},
+        } for i in range(count)]
+        self.listed = []
+        self.fetched = []
+        self.fail_on_page = None
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def settings(self):
+        return self
+
+    def sendAs(self):
+        return self
+
+    def getProfile(self, userId):
+        return _Request({"emailAddress": "me@example.com"})
+
+    def list(self, userId, maxResults=None, pageToken=None):
+        if maxResults is None:  # sendAs().list()
+            return _Request({"sendAs": [{"sendAsEmail": "me@mycompany.com"}]})
+        start = int(pageToken or 0)
+        if self.fail_on_page == start:
+            return _Request(ConnectionError("network down"))
+        self.listed.append(start)
+        page = self.mail[start:start + maxResults]
+        end = start + len(page)
+        result = {"messages": [{"id": m["id"]} for m in page]}
+        if end < len(self.mail):
+            result["nextPageToken"] = str(end)
+        return _Request(result)
+
+    def messages_get(self, message_id):
+        self.fetched.append(message_id)
+        return next(m for m in self.mail if m["id"] == message_id)
+
+    def get(self, userId, id, format, metadataHeaders):
+        return _Request(lambda: self.messages_get(id))
+
+    def new_batch_http_request(self, callback):
+        class Batch:
+            def __init__(self):
+                self.requests = []
+
+            def add(self, request, request_id):
+                self.requests.append((request, request_id))
+
+            def execute(self):
+                for request, request_id in self.requests:
+                    callback(request_id, request.execute(), None)
+
+        return Batch()
+
+
+class FakeGmail:
+    def __init__(self, service, tmp_path):
+        self.service = service
+        self.contacts_csv = str(tmp_path / "contacts.csv")
+        self.emails_csv = str(tmp_path / "emails.csv")
+
+    def _get_service(self):
+        return self.service
+
+    def get_all_contacts(self, max_emails: int = 500, exclude_automated: bool = True, exclude_domains: str = "") -> str:
+        """Get all unique contacts from emails with frequency count."""
+        raise AssertionError("should be served by the scan")
+
+    def sync_contacts(self, max_emails: int = 500, exclude_domains: str = "") -> str:
+        """Sync contacts."""
+        raise AssertionError("should be served by the scan")
+
+
+@pytest.fixture
+def service():
+    return FakeService()
+
+
+@pytest.fixture
+def gmail(service, tmp_path):
+    gmail = FakeGmail(service, tmp_path)
+    ContactScan(gmail, checkpoint_path=str(tmp_path / "contact_scan.json")).attach(gmail)
+    return gmail
+
+
+def _read(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+class TestScan:
+    """Tests for aggregation and the tool replies."""
+
+    def test_get_all_contacts(self, gmail, tmp_path):
+        """Verify contacts are counted by thread, own and automated addresses skipped."""
+        result = gmail.get_all_contacts(max_emails=250)
+        assert result.startswith("Found 7 unique contacts (sorted by thread count):")
+        rows = _read(gmail.contacts_csv)
+        assert {r["email"] for r in rows} == {f"p{i}@acme.com" for i in range(7)}
+        assert rows[0]["name"].startswith("Person") and rows[0]["last_contact"].startswith("2026-09-")
+        assert len(_read(gmail.emails_csv)) == 250
+        assert not (tmp_path / "contact_scan.json").exists()
+
+    def test_max_emails_respected(self, gmail, service):
+        """Verify only the newest max_emails messages are read."""
+        gmail.get_all_contacts(max_emails=150)
+        assert len(service.fetched) == 150
+
+    def test_sync_keeps_crm_fields(self, gmail):
+        """Verify sync_contacts merges counts into the existing CSV."""
+        with open(gmail.contacts_csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["email", "name", "frequency", "priority"])
+            writer.writeheader()
+            writer.writerow({"email": "P1@acme.com", "name": "", "frequency": "1", "priority": "high"})
+            writer.writerow({"email": "old@x.com", "name": "Old", "frequency": "3"})
+        assert gmail.sync_contacts(max_emails=250) == "Synced 8 contacts (6 new, 1 updated, 1 unchanged)"
+        p1 = next(r for r in _read(gmail.contacts_csv) if r["email"] == "P1@acme.com")
+        assert p1["priority"] == "high" and p1["name"] == "Person 1" and int(p1["frequency"]) > 1
+
+    def test_progress_reported_per_page(self, gmail):
+        """Verify the callback gets one update per page."""
+        updates = []
+        with gmail.contact_scan.reporting(updates.append):
+            gmail.get_all_contacts(max_emails=250)
+        assert updates[0] == "Scanning emails (0/250), 0 contacts"
+        assert updates[-1] == "Scanning emails (250/250), 7 contacts"
+        assert len(updates) == 4
+
+
+class TestResume:
+    """Tests for checkpoints."""
+
+    def test_interrupted_scan_resumes(self, gmail, service, tmp_path_factory):
+        """Verify a failed scan continues from the last page and matches an uninterrupted one."""
+        service.fail_on_page = 200
+        with pytest.raises(ConnectionError):
+            gmail.get_all_contacts(max_emails=250)
+        assert len(service.fetched) == 200
+
+        service.fail_on_page = None
+        resumed = gmail.get_all_contacts(max_emails=250)
+        assert service.listed == [0, 100, 200]
+        assert len(service.fetched) == 250
+        assert len(_read(gmail.emails_csv)) == 250
+
+        other = tmp_path_factory.mktemp("uninterrupted")
+        fresh = FakeGmail(FakeService(), other)
+        ContactScan(fresh, checkpoint_path=str(other / "contact_scan.json")).attach(fresh)
+        assert fresh.get_all_contacts(max_emails=250) == resumed
+        assert _read(fresh.contacts_csv) == _read(gmail.contacts_csv)
+
+    def test_changed_exclusions_restart(self, gmail, service):
+        """Verify a checkpoint is only reused for the same exclusions."""
+        service.fail_on_page = 100
+        with pytest.raises(ConnectionError):
+            gmail.get_all_contacts(max_emails=250)
+        service.fail_on_page = None
+        gmail.get_all_contacts(max_emails=250, exclude_domains="other.com")
+        assert service.listed == [0, 0, 100, 200]
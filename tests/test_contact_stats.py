@@ -0,0 +1,150 @@
+"""Tests for incremental contact counters."""
+
+import csv
+import time
+import pytest
+
+from tools.contact_stats import ContactStats, parse_addresses
+from tools.contacts import ContactStore, FIELDS
+
+
+DAY = 86400
+NOW = time.time()
+
+
+def _message(i, sender, recipients="me@example.com", thread=None, days_ago=0, labels=("INBOX",)):
+    return {"id": f"m{i}", "thread_id": thread or f"t{i}", "date": NOW - days_ago * DAY,
+            "sender": sender, "recipients": recipients, "labels": list(labels)}
+
+
+@pytest.fixture
+def stats(tmp_path):
+    return ContactStats(db_path=str(tmp_path / "contact_stats.db"), identify=lambda: ["Me@example.com"])
+
+
+class TestCounters:
+    """Tests for counting messages once and ranking."""
+
+    def test_parse_addresses(self):
+        """Verify quoted names with commas and bare addresses are parsed."""
+        assert parse_addresses('"Scully, Dana" <dana@fbi.gov>, fox@fbi.gov') == [
+            ("Scully, Dana", "dana@fbi.gov"), ("", "fox@fbi.gov")]
+
+    def test_messages_counted_once(self, stats):
+        """Verify re-delivered records (label changes) don't double count."""
+        records = [_message(1, "Dana <dana@acme.com>", thread="t1"), _message(2, "Dana <dana@acme.com>", thread="t1")]
+        assert stats.add_messages(records) == 2
+        assert stats.add_messages(records) == 0
+        dana = stats.top(1)[0]
+        assert (dana["email"], dana["name"], dana["frequency"], dana["messages"]) == ("dana@acme.com", "Dana", 1, 2)
+        assert stats.get("DANA@acme.com") == dana
+        assert stats.get("nobody@acme.com") is None
+
+    def test_own_address_learned_from_sent(self, stats):
+        """Verify the sender of SENT mail is treated as the user, not a contact."""
+        stats.add_messages([
+            _message(1, "Fox <fox@acme.com>"),
+            _message(2, "Me <me@work.com>", recipients="fox@acme.com, me@work.com", labels=("SENT",)),
+            _message(3, "Fox <fox@acme.com>", recipients="me@work.com"),
+        ])
+        assert [c["email"] for c in stats.all()] == ["fox@acme.com"]
+        assert stats.top(1)[0]["sent"] == 1
+
+    def test_automated_senders_skipped(self, stats):
+        """Verify noreply-style addresses are not counted."""
+        stats.add_messages([_message(1, "noreply@github.com")])
+        assert stats.count() == 0
+
+    def test_strength_decays(self, stats):
+        """Verify recent mail outranks a larger volume of old mail."""
+        stats.add_messages([_message(i, "old@acme.com", days_ago=400) for i in range(5)])
+        stats.add_messages([_message(10 + i, "new@acme.com", days_ago=1) for i in range(2)])
+        assert [c["email"] for c in stats.top(2)] == ["new@acme.com", "old@acme.com"]
+        assert [c["email"] for c in stats.top(2, by="threads")] == ["old@acme.com", "new@acme.com"]
+        assert stats.top(1)[0]["strength"] == pytest.approx(2, rel=0.02)
+
+
+class FakeMailbox:
+    def __init__(self):
+        self.subscribers = []
+        self.pending = []
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def sync(self, force=False):
+        for callback in self.subscribers:
+            callback(self.pending)
+        self.pending = []
+
+
+class FakeScan:
+    def subscribe(self, callback):
+        pass
+
+    def finish(self, publish_emails: bool = True):
+        pass
+
+
+class FakeGmail:
+    def __init__(self, contacts_csv):
+        self.contacts_csv = contacts_csv
+        self.mailbox = FakeMailbox()
+        self.contact_scan = FakeScan()
+        self.scans = 0
+
+    def sync_contacts(self, max_emails: int = 500, exclude_domains: str = "") -> str:
+        self.scans += 1
+        self.contact_scan.finish(publish_emails=False)
+        return "scanned"
+
+
+class TestSync:
+    """Tests for sync_contacts served from the counters."""
+
+    @pytest.fixture
+    def gmail(self, stats, tmp_path):
+        path = tmp_path / "contacts.csv"
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerow({"email": "Dana@acme.com", "name": "", "frequency": 3, "priority": "high"})
+            writer.writerow({"email": "old@x.com", "name": "Old", "frequency": 9})
+        gmail = FakeGmail(str(path))
+        stats.attach(gmail)
+        ContactStore(db_path=str(tmp_path / "contacts.db"), csv_path=str(path)).attach(gmail)
+        return gmail
+
+    def test_first_sync_scans(self, gmail):
+        """Verify sync falls back to a scan until there are counters to merge."""
+        assert gmail.sync_contacts() == "scanned"
+
+    def test_mirror_counts_are_not_a_backfill(self, gmail, stats, tmp_path):
+        """Verify counts fed by the mirror alone still leave the next sync to a scan, which is remembered."""
+        gmail.mailbox.sync()
+        stats.add_messages([_message(1, "Dana <dana@acme.com>")])
+        assert gmail.sync_contacts() == "scanned"
+        assert ContactStats(db_path=str(tmp_path / "contact_stats.db")).backfilled
+        gmail.sync_contacts()
+        assert gmail.scans == 1
+
+    def test_merges_new_mail_without_scanning(self, gmail, stats):
+        """Verify counters update frequency and add new contacts, keeping CRM fields."""
+        stats.mark_backfilled()
+        stats.add_messages([_message(i, "Dana Scully <dana@acme.com>") for i in range(12)])
+        gmail.mailbox.pending = [_message(99, "New Person <new@acme.com>"), _message(100, "x@mycorp.com")]
+        result = gmail.sync_contacts(exclude_domains="mycorp.com")
+        assert gmail.scans == 0
+        assert result == "Synced 3 contacts (1 new, 1 updated, 1 unchanged)"
+        dana = gmail.contacts.get("dana@acme.com")
+        assert (dana["frequency"], dana["priority"], dana["name"]) == (12, "high", "Dana Scully")
+        assert gmail.contacts.get("new@acme.com")["frequency"] == 1
+        assert gmail.contacts.get("x@mycorp.com") is None
+
+    def test_merged_counts_written_to_csv(self, gmail, stats):
+        """Verify contacts.csv has the merged contacts as soon as sync_contacts returns."""
+        stats.mark_backfilled()
+        gmail.mailbox.pending = [_message(1, "New Person <new@acme.com>")]
+        gmail.sync_contacts()
+        with open(gmail.contacts_csv, newline="") as f:
+            assert "new@acme.com" in [row["email"] for row in csv.DictReader(f)]
@@ -0,0 +1,177 @@
+"""Tests for the indexed contact store."""
+
+import csv
+import os
+import pytest
+
+from tools.contacts import ContactStore, FIELDS
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _read_csv(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "contacts.csv"
+    _write_csv(path, [
+        {"email": "alice@example.com", "name": "Alice", "frequency": 12},
+        {"email": "Bob@Acme.com", "name": "Bob", "frequency": 30, "company": "Acme"},
+        {"email": "noreply@github.com", "frequency": 5, "type": "NOTIFICATION"},
+    ])
+    return path
+
+
+@pytest.fixture
+def store(csv_path, tmp_path):
+    return ContactStore(db_path=str(tmp_path / "contacts.db"), csv_path=str(csv_path))
+
+
+class FakeGmail:
+    """Stand-in provider tool with the CRM methods the store wraps."""
+
+    def __init__(self, contacts_csv):
+        self.contacts_csv = contacts_csv
+        self.calls = []
+
+    def update_contact(self, email: str, type: str = None, company: str = None,
+                       relationship: str = None, priority: str = None, deal: str = None,
+                       next_contact_date: str = None, tags: str = None, notes: str = None,
+                       last_contact: str = None) -> str:
+        self.calls.append("update_contact")
+        return "csv"
+
+    def bulk_update_contacts(self, updates: list) -> str:
+        self.calls.append("bulk_update_contacts")
+        return "csv"
+
+    def get_cached_contacts(self) -> str:
+        return "No cached contacts. Run sync_contacts() first."
+
+    def sync_contacts(self, max_emails: int = 500, exclude_domains: str = "") -> str:
+        # Reads and rewrites the CSV itself, like the real tool
+        rows = _read_csv(self.contacts_csv)
+        rows.append({"email": "new@example.com", "name": "New", "frequency": "1"})
+        _write_csv(self.contacts_csv, rows)
+        return "Synced"
+
+
+class TestStore:
+    """Tests for reads, writes and CSV round-trips."""
+
+    def test_imports_csv_on_first_use(self, store):
+        """Verify an existing contacts.csv seeds the store."""
+        assert store.count() == 3
+        assert store.get("bob@acme.com")["company"] == "Acme"
+
+    def test_find_uses_filters_and_frequency_order(self, store):
+        """Verify filtered queries return the most frequent contacts first."""
+        store.bulk_update([
+            {"email": "alice@example.com", "priority": "high", "next_contact_date": "2026-01-10"},
+            {"email": "bob@acme.com", "priority": "high", "next_contact_date": "2026-03-01"},
+        ])
+        assert [c["email"] for c in store.find(priority="high")] == ["Bob@Acme.com", "alice@example.com"]
+        assert [c["email"] for c in store.find(due_by="2026-02-01")] == ["alice@example.com"]
+        assert [c["email"] for c in store.find(company="acme")] == ["Bob@Acme.com"]
+
+    def test_bulk_update_counts_matches(self, store):
+        """Verify unknown emails are skipped and None fields left alone."""
+        changed = store.bulk_update([
+            {"email": "ALICE@example.com", "type": "PERSON", "notes": None},
+            {"email": "ghost@nowhere.com", "type": "PERSON"},
+        ])
+        assert changed == 1
+        assert store.get("alice@example.com")["type"] == "PERSON"
+
+    def test_writes_deferred_until_flush(self, store, csv_path):
+        """Verify updates reach contacts.csv on flush, not per call."""
+        before = csv_path.read_bytes()
+        store.update("alice@example.com", priority="high")
+        assert csv_path.read_bytes() == before
+
+        store.flush()
+        rows = _read_csv(csv_path)
+        assert [r["email"] for r in rows] == ["Bob@Acme.com", "alice@example.com", "noreply@github.com"]
+        assert rows[1]["priority"] == "high"
+
+    def test_external_rewrite_reimported(self, store, csv_path):
+        """Verify a CSV rewritten by someone else replaces the store contents."""
+        store.count()
+        _write_csv(csv_path, [{"email": "solo@example.com", "frequency": 1}])
+        os.utime(csv_path, ns=(0, 1))  # Same-size rewrites still change mtime
+        assert [c["email"] for c in store.find()] == ["solo@example.com"]
+
+    def test_external_rewrite_keeps_unflushed_updates(self, store, csv_path):
+        """Verify a re-import keeps contacts changed since the last flush and takes the rest from the file."""
+        store.update("alice@example.com", priority="high")
+        _write_csv(csv_path, [
+            {"email": "alice@example.com", "name": "Alice", "frequency": 40},
+            {"email": "bob@acme.com", "name": "Bob", "frequency": 31},
+        ])
+        os.utime(csv_path, ns=(0, 1))
+        assert store.get("alice@example.com")["priority"] == "high"
+        assert store.get("bob@acme.com")["frequency"] == 31
+        assert store.get("noreply@github.com") is None
+
+        store.flush()
+        _write_csv(csv_path, [{"email": "alice@example.com", "frequency": 1}])
+        os.utime(csv_path, ns=(0, 2))
+        assert store.get("alice@example.com")["priority"] == ""
+
+    def test_own_export_not_reimported(self, store, csv_path, monkeypatch):
+        """Verify the store doesn't re-read the CSV it just wrote."""
+        store.update("alice@example.com", priority="high")
+        store.flush()
+        monkeypatch.setattr(store, "import_csv", None)
+        assert store.count() == 3
+
+    def test_shared_between_instances(self, store, csv_path, tmp_path):
+        """Verify a second store on the same database sees committed updates."""
+        other = ContactStore(db_path=str(tmp_path / "contacts.db"), csv_path=str(csv_path))
+        store.update("alice@example.com", tags="vip")
+        assert other.get("alice@example.com")["tags"] == "vip"
+
+
+class TestAttach:
+    """Tests for serving the CRM tool methods from the store."""
+
+    def test_update_contact(self, store, csv_path):
+        """Verify update_contact writes the store and keeps the tool's reply format."""
+        gmail = FakeGmail(str(csv_path))
+        store.attach(gmail)
+        assert gmail.update_contact("alice@example.com", priority="high", type="PERSON") == \
+            "Updated alice@example.com: type=PERSON, priority=high"
+        assert gmail.update_contact("ghost@nowhere.com", priority="low") == \
+            "Contact ghost@nowhere.com not found in contacts.csv"
+        assert gmail.calls == []
+
+    def test_bulk_update_contacts(self, store, csv_path):
+        """Verify bulk_update_contacts goes through one store transaction."""
+        gmail = FakeGmail(str(csv_path))
+        store.attach(gmail)
+        result = gmail.bulk_update_contacts([{"email": "bob@acme.com", "priority": "high"}])
+        assert result == "Bulk updated 1 contacts"
+        assert store.get("bob@acme.com")["priority"] == "high"
+
+    def test_cached_contacts_from_store(self, store, csv_path):
+        """Verify get_cached_contacts lists contacts by frequency."""
+        gmail = FakeGmail(str(csv_path))
+        store.attach(gmail)
+        assert gmail.get_cached_contacts().splitlines()[2] == "- Bob <Bob@Acme.com> (30 emails)"
+
+    def test_sync_merges_pending_updates(self, store, csv_path):
+        """Verify sync_contacts sees unflushed updates and its result is re-imported."""
+        gmail = FakeGmail(str(csv_path))
+        store.attach(gmail)
+        gmail.update_contact("alice@example.com", priority="high")
+        gmail.sync_contacts()
+        assert store.get("alice@example.com")["priority"] == "high"
+        assert store.get("new@example.com") is not None
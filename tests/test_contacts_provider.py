@@ -0,0 +1,164 @@
+"""Tests for @ contact autocomplete."""
+
+import csv
+import pytest
+
+from cli import contacts_provider
+from cli.contacts_provider import ContactProvider
+
+
+FIELDS = ["email", "name", "frequency", "type", "company", "relationship", "priority"]
+
+
+def _write(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+
+
+@pytest.fixture
+def contacts_file(tmp_path):
+    path = tmp_path / "contacts.csv"
+    _write(path, [
+        {"email": "dana@acme.com", "name": "Dana Scully", "type": "PERSON", "company": "Acme"},
+        {"email": "david.davis@example.com", "name": "David Davis", "type": "PERSON"},
+        {"email": "noreply@github.com", "name": "", "type": "NOTIFICATION"},
+        {"email": "vip@bigco.com", "name": "Avery Vip", "type": "PERSON", "priority": "high"},
+    ])
+    return path
+
+
+def _values(items):
+    return [item.value for item in items]
+
+
+class TestSearch:
+    """Tests for indexed fuzzy search."""
+
+    def test_matches_name_and_email(self, contacts_file):
+        """Verify queries match names and email addresses."""
+        provider = ContactProvider(str(contacts_file))
+        assert _values(provider.search("davis")) == ["david.davis@example.com"]
+        assert _values(provider.search("github")) == ["noreply@github.com"]
+
+    def test_scores_like_fuzzy_match(self, contacts_file):
+        """Verify ranking and positions match the original full scan."""
+        provider = ContactProvider(str(contacts_file))
+        items = provider.search("da")
+        assert _values(items) == ["dana@acme.com", "david.davis@example.com"]
+        assert items[0].positions == [0, 1]
+
+    def test_priority_boost(self, contacts_file):
+        """Verify high-priority contacts get +50."""
+        provider = ContactProvider(str(contacts_file))
+        assert provider.search("vip")[0].score > 50
+
+    def test_empty_query_lists_priority_first(self, contacts_file):
+        """Verify an empty query returns priority contacts, then file order."""
+        provider = ContactProvider(str(contacts_file))
+        assert _values(provider.search(""))[:2] == ["vip@bigco.com", "dana@acme.com"]
+
+    def test_results_capped_at_limit(self, contacts_file):
+        """Verify only the top `limit` matches are returned."""
+        provider = ContactProvider(str(contacts_file), limit=2)
+        assert len(provider.search("a")) == 2
+
+    def test_incremental_typing_narrows_previous_candidates(self, contacts_file):
+        """Verify typing one more character gives the same results as a fresh search."""
+        provider = ContactProvider(str(contacts_file))
+        for n in range(1, 6):
+            typed = _values(provider.search("david"[:n]))
+            assert typed == _values(ContactProvider(str(contacts_file)).search("david"[:n]))
+
+    def test_missing_file(self, tmp_path):
+        """Verify a missing contacts.csv gives no results."""
+        assert ContactProvider(str(tmp_path / "missing.csv")).search("a") == []
+
+
+class TestLargeContactList:
+    """Tests for the tiered path used when a query matches too many contacts to score."""
+
+    @pytest.fixture
+    def provider(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(contacts_provider, "SCAN_LIMIT", 50)
+        monkeypatch.setattr(contacts_provider, "EXACT_LIMIT", 10)
+        path = tmp_path / "contacts.csv"
+        rows = [{"email": f"user{i}@company.com", "name": f"Person {i}"} for i in range(300)]
+        rows.append({"email": "sam@company.com", "name": "Sam Person", "priority": "high"})
+        _write(path, rows)
+        return ContactProvider(str(path), limit=5)
+
+    def test_priority_then_word_prefix(self, provider):
+        """Verify broad queries return priority contacts, then word-prefix matches in file order."""
+        assert _values(provider.search("per")) == [
+            "sam@company.com", "user0@company.com", "user1@company.com",
+            "user2@company.com", "user3@company.com",
+        ]
+
+    def test_scattered_match_found(self, provider):
+        """Verify non-contiguous matches are still found."""
+        assert "user7@company.com" in _values(provider.search("pn7"))
+
+    def test_tiers_merged_by_score(self, tmp_path, monkeypatch):
+        """Verify a substring match that scores higher beats an earlier word-prefix match."""
+        monkeypatch.setattr(contacts_provider, "EXACT_LIMIT", 0)
+        path = tmp_path / "contacts.csv"
+        _write(path, [{"email": "max@x.com", "name": "Max Ab"},
+                      {"email": "kabir@x.com", "name": "Kabir"}])
+        assert _values(ContactProvider(str(path), limit=1).search("ab")) == ["kabir@x.com"]
+
+
+class TestReload:
+    """Tests for picking up changes to contacts.csv."""
+
+    @pytest.fixture
+    def provider(self, contacts_file):
+        provider = ContactProvider(str(contacts_file))
+        provider.search("a")  # Load and index
+        return provider
+
+    def test_unchanged_file_not_reread(self, provider, contacts_file, monkeypatch):
+        """Verify an unchanged file is only stat'ed."""
+        monkeypatch.setattr(provider, "_reload", None)
+        monkeypatch.setattr(provider, "_append", None)
+        assert len(provider._load_contacts()) == 4
+
+    def test_appended_rows_parsed_alone(self, provider, contacts_file, monkeypatch):
+        """Verify appended rows are added without re-reading the rest."""
+        monkeypatch.setattr(provider, "_reload", None)
+        with open(contacts_file, "a", newline="") as f:
+            csv.DictWriter(f, fieldnames=FIELDS).writerow({"email": "zed@new.com", "name": "Zed New"})
+        assert _values(provider.search("zed")) == ["zed@new.com"]
+        assert len(provider._contacts) == 5
+
+    def test_edited_row_patches_index(self, provider, contacts_file):
+        """Verify an edited name is searchable and the old one is gone."""
+        index = provider._index
+        text = contacts_file.read_text().replace("Dana Scully", "Fox Mulder")
+        contacts_file.write_text(text)
+        assert _values(provider.search("mulder")) == ["dana@acme.com"]
+        assert provider.search("scully") == []
+        assert provider._index is index
+
+    def test_resorted_file_renumbers_index(self, provider, contacts_file):
+        """Verify a re-sorted rewrite keeps search consistent with a fresh provider."""
+        lines = contacts_file.read_text().splitlines(keepends=True)
+        contacts_file.write_text(lines[0] + "".join(reversed(lines[2:])) + "new@x.com,Dan New\n")
+        for query in ["", "da", "vip", "new", "github"]:
+            assert _values(provider.search(query)) == _values(ContactProvider(str(contacts_file)).search(query))
+
+    def test_deleted_file(self, provider, contacts_file):
+        """Verify removing contacts.csv empties the list."""
+        contacts_file.unlink()
+        assert provider.search("a") == []
+
+    def test_refresh_updates_items_in_place(self, provider, contacts_file):
+        """Verify the @ trigger list is refreshed only when the file changed."""
+        items = provider.to_command_items()
+        assert provider.refresh(items) is False
+        with open(contacts_file, "a", newline="") as f:
+            csv.DictWriter(f, fieldnames=FIELDS).writerow({"email": "zed@new.com"})
+        assert provider.refresh(items) is True
+        assert items[-1].id == "@zed@new.com"
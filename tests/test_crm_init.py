@@ -0,0 +1,200 @@
+"""Tests for the parallel CRM init pipeline."""
+
+import threading
+import time
+import pytest
+
+from tools.crm_init import CrmInit
+from tools.rate_limit import RateLimiter
+
+
+CONTACTS = [
+    {"email": f"person{i}@acme{i % 3}.com", "name": f"Person {i}", "frequency": 100 - i, "last_contact": "2026-01-01"}
+    for i in range(10)
+] + [{"email": "friend@gmail.com", "name": "Friend", "frequency": 1, "last_contact": ""}]
+
+
+class FakeStore:
+    def __init__(self, contacts):
+        self.contacts = contacts
+
+    def find(self):
+        return [dict(c) for c in self.contacts]
+
+
+class FakeGmail:
+    """Provider tool that records its calls."""
+
+    def __init__(self, contacts=CONTACTS):
+        self.contacts = FakeStore(contacts)
+        self.calls = []
+        self.bulk = []
+
+    def _call(self, name):
+        self.calls.append(name)
+        time.sleep(0.001)
+
+    def get_all_contacts(self, max_emails=500, exclude_automated=True, exclude_domains=""):
+        self._call("get_all_contacts")
+        return f"Found {len(self.contacts.contacts)} unique contacts"
+
+    def search_emails(self, query, max_results=10):
+        self._call("search_emails")
+        return f"1. Re: intro ({query})"
+
+    def bulk_update_contacts(self, updates):
+        self._call("bulk_update_contacts")
+        self.bulk.append(updates)
+        return f"Bulk updated {len(updates)} contacts"
+
+    def get_unanswered_emails(self, within_days=120, max_results=20):
+        self._call("get_unanswered_emails")
+        return "No unanswered emails"
+
+
+class FakeWeb:
+    def __init__(self):
+        self.pages = []
+
+    def analyze_page(self, url):
+        self.pages.append(url)
+        time.sleep(0.01)
+        return f"{url} sells widgets"
+
+
+class FakeMemory:
+    def __init__(self):
+        self.saved = {}
+
+    def write_memory(self, key, content):
+        self.saved[key] = content
+
+
+class Categorizer:
+    """Stand-in for the LLM: tags every contact in the shard, tracks concurrency."""
+
+    def __init__(self, fail_on=None):
+        self.inputs = []
+        self.active = 0
+        self.peak = 0
+        self.fail_on = fail_on
+        self._lock = threading.Lock()
+
+    def __call__(self, text):
+        with self._lock:
+            self.inputs.append(text)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.02)
+            if self.fail_on and self.fail_on in text:
+                raise RuntimeError("model error")
+            emails = [line.split("<")[1].split(">")[0] for line in text.splitlines() if line.startswith("- ")]
+            return [{"email": e, "type": "PERSON", "priority": "high"} for e in emails] + \
+                [{"email": "stranger@elsewhere.com", "type": "PERSON", "priority": "high"}]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def gmail():
+    return FakeGmail()
+
+
+def _pipeline(gmail, categorize, **kwargs):
+    return CrmInit(gmail, web=FakeWeb(), memory=FakeMemory(), shard_size=3,
+                   categorize=categorize, **kwargs)
+
+
+class TestPipeline:
+    """Tests for extraction, sharding and the merge step."""
+
+    def test_extracts_once_and_merges_once(self, gmail):
+        """Verify one get_all_contacts and one bulk_update_contacts for all shards."""
+        categorize = Categorizer()
+        _pipeline(gmail, categorize).run(top_n=2)
+        assert gmail.calls.count("get_all_contacts") == 1
+        assert gmail.calls.count("bulk_update_contacts") == 1
+        assert len(categorize.inputs) == 4
+        assert sorted(u["email"] for u in gmail.bulk[0]) == sorted(c["email"] for c in CONTACTS)
+
+    def test_worker_pool_is_bounded(self, gmail):
+        """Verify shards run concurrently but never more than `workers` at once."""
+        categorize = Categorizer()
+        _pipeline(gmail, categorize, workers=2).run()
+        assert categorize.peak == 2
+
+    def test_domains_looked_up_once(self, gmail):
+        """Verify each business domain is analyzed once and generic ones are skipped."""
+        pipeline = _pipeline(gmail, Categorizer(), workers=4)
+        pipeline.run()
+        assert sorted(pipeline.web.pages) == ["https://acme0.com", "https://acme1.com", "https://acme2.com"]
+
+    def test_top_contacts_get_recent_emails(self, gmail):
+        """Verify only the top_n contacts are searched and saved to memory."""
+        pipeline = _pipeline(gmail, Categorizer())
+        pipeline.run(top_n=2)
+        assert gmail.calls.count("search_emails") == 2
+        assert {"crm:all_contacts", "crm:needs_reply", "crm:init_report",
+                "contact:person0@acme0.com", "contact:person1@acme1.com"} == set(pipeline.memory.saved)
+
+    def test_rule_settled_contacts_skip_llm(self):
+        """Verify obvious contacts are written without an LLM call, except top people."""
+        gmail = FakeGmail([
+            {"email": "noreply@github.com", "name": "GitHub", "frequency": 50},
+            {"email": "dana.scully@gmail.com", "name": "Dana Scully", "frequency": 40},
+            {"email": "fox.mulder@gmail.com", "name": "Fox Mulder", "frequency": 30},
+            {"email": "support@vercel.com", "name": "Vercel", "frequency": 20},
+        ])
+        categorize = Categorizer()
+        report = _pipeline(gmail, categorize).run(top_n=2)
+        assert len(categorize.inputs) == 1
+        assert "dana.scully@gmail.com" in categorize.inputs[0]
+        assert "fox.mulder@gmail.com" not in categorize.inputs[0]
+        types = {u["email"]: (u["type"], u["priority"]) for u in gmail.bulk[0]}
+        assert types == {
+            "noreply@github.com": ("NOTIFICATION", "low"),
+            "dana.scully@gmail.com": ("PERSON", "high"),
+            "fox.mulder@gmail.com": ("PERSON", "medium"),
+            "support@vercel.com": ("SERVICE", "medium"),
+        }
+        assert "3 by rules, 1 by the LLM" in report
+
+    def test_failed_shard_reported(self, gmail):
+        """Verify a failing shard doesn't stop the others."""
+        pipeline = _pipeline(gmail, Categorizer(fail_on="person4@"))
+        report = pipeline.run()
+        assert len(gmail.bulk[0]) == len(CONTACTS) - 3
+        assert "1 shard(s) failed" in report
+        assert "Shard of 3 (person3@acme0.com, ...): RuntimeError: model error" in report
+
+    def test_failed_lookup_reported(self, gmail):
+        """Verify a failing domain lookup is listed in the report and the shard still runs."""
+        pipeline = _pipeline(gmail, Categorizer())
+        pipeline.web.analyze_page = lambda url: int("x")
+        report = pipeline.run()
+        assert len(gmail.bulk[0]) == len(CONTACTS)
+        assert "Lookup of acme0.com: ValueError" in report
+
+
+class TestRateLimit:
+    """Tests for drawing from the shared rate limiter."""
+
+    def test_llm_and_web_calls_charged_to_crm_init(self, gmail):
+        """Verify every LLM and web call is charged to the limiter's crm_init bucket."""
+        limiter = RateLimiter(quotas={"crm_init": (1000, 1000)})
+        categorize = Categorizer()
+        pipeline = _pipeline(gmail, categorize, limiter=limiter)
+        pipeline.run()
+        assert limiter.stats()["crm_init"]["units"] == len(categorize.inputs) + len(pipeline.web.pages)
+
+    def test_calls_spaced_by_rate(self, gmail):
+        """Verify the crm_init rate bounds how fast shards are categorized."""
+        limiter = RateLimiter(quotas={"crm_init": (50, 1)})
+        categorize = Categorizer()
+        pipeline = CrmInit(gmail, memory=FakeMemory(), shard_size=3, categorize=categorize, limiter=limiter)
+        started = time.monotonic()
+        pipeline.run()
+        assert len(categorize.inputs) == 4
+        assert time.monotonic() - started >= 0.055
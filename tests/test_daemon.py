@@ -0,0 +1,117 @@
+"""Tests for the warm CLI daemon and its thin client."""
+
+import os
+import threading
+import time
+
+import pytest
+
+from cli.daemon import DaemonError, forward, running, start_server
+
+
+@pytest.fixture
+def sock(tmp_path, monkeypatch):
+    path = tmp_path / "d.sock"
+    monkeypatch.setenv("DAEMON_SOCKET", str(path))
+    return path
+
+
+@pytest.fixture
+def serve(sock):
+    servers = []
+
+    def start(commands):
+        server = start_server(commands)
+        threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class TestForward:
+    """Tests for forwarding commands to the daemon."""
+
+    def test_no_daemon_runs_locally(self, sock):
+        """Verify forward() returns None when nothing is listening."""
+        assert forward("inbox", count=5) is None
+        sock.touch()  # stale socket file
+        assert forward("inbox", count=5) is None
+
+    def test_result_returned(self, serve):
+        """Verify keyword arguments reach the command and its output comes back."""
+        serve({"inbox": lambda count=10, unread=False: f"{count} emails, unread={unread}"})
+        assert forward("inbox", count=5, unread=True) == "5 emails, unread=True"
+        assert running()
+
+    def test_progress_streamed(self, serve):
+        """Verify progress updates arrive before the result."""
+        def sync(max_emails=500, progress=None):
+            progress("Scanned 100 emails")
+            progress("Scanned 200 emails")
+            return "done"
+
+        serve({"sync": sync})
+        seen = []
+        assert forward("sync", progress=seen.append, max_emails=200) == "done"
+        assert seen == ["Scanned 100 emails", "Scanned 200 emails"]
+
+    def test_errors_raised(self, serve):
+        """Verify a failing or unknown command raises DaemonError on the client."""
+        def broken():
+            raise ValueError("bad query")
+
+        serve({"search": broken})
+        with pytest.raises(DaemonError, match="ValueError: bad query"):
+            forward("search")
+        with pytest.raises(DaemonError, match="Unknown command"):
+            forward("nope")
+
+    def test_disabled_by_env(self, serve, monkeypatch):
+        """Verify EMAIL_DAEMON=false keeps commands in-process."""
+        serve({"inbox": lambda: "from daemon"})
+        monkeypatch.setenv("EMAIL_DAEMON", "false")
+        assert forward("inbox") is None
+
+
+class TestConcurrency:
+    """Tests for how the daemon runs overlapping requests."""
+
+    def test_reads_overlap_agent_commands_serialize(self, serve):
+        """Verify reads run side by side while agent commands take turns."""
+        def slow(**kwargs):
+            time.sleep(0.2)
+            return "ok"
+
+        serve({"inbox": slow, "ask": slow})
+
+        def elapsed(name):
+            threads = [threading.Thread(target=forward, args=(name,)) for _ in range(3)]
+            started = time.monotonic()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            return time.monotonic() - started
+
+        assert elapsed("inbox") < 0.5
+        assert elapsed("ask") >= 0.6
+
+
+class TestAccess:
+    """Tests for keeping other local users out."""
+
+    def test_socket_owner_only(self, serve, sock):
+        """Verify the socket is created readable and writable by its owner only."""
+        serve({})
+        assert sock.stat().st_mode & 0o777 == 0o600
+
+    def test_other_users_refused(self, serve, monkeypatch):
+        """Verify a connection from another uid gets no answer."""
+        serve({"ask": lambda question="": "ran"})
+        monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+        with pytest.raises(DaemonError, match="without a result"):
+            forward("ask", question="rm -rf ~")
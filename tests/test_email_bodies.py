@@ -0,0 +1,189 @@
+"""Tests for batched email body retrieval."""
+
+import base64
+
+import pytest
+
+from tools.email_bodies import EmailBodies, html_to_text
+
+
+def _encode(text):
+    return base64.urlsafe_b64encode(text.encode()).decode()
+
+
+class _Request:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class FakeService:
+    """Gmail API stand-in that records batch sizes."""
+
+    def __init__(self, count=60):
+        self.mail = {f"m{i}": {
+            "id": f"m{i}", "snippet": f"snippet {i}",
+            "payload": {
+                "mimeType": "text/plain",
+                "headers": [{"name": "From", "value": f"p{i}@acme.com"}, {"name": "Subject", "value": f"S{i}"}],
+                "body": {"data": _encode(f"body {i} " + "x" * 100)},
+            },
+        } for i in range(count)}
+        self.batches = []
+        self.rejected = set()
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def get(self, userId, id, format):
+        if id in self.rejected:
+            return _Request(ConnectionError("rate limited"))
+        return _Request(self.mail[id])
+
+    def new_batch_http_request(self, callback):
+        service = self
+
+        class Batch:
+            def __init__(self):
+                self.requests = []
+
+            def add(self, request, request_id):
+                self.requests.append((request, request_id))
+
+            def execute(self):
+                service.batches.append(len(self.requests))
+                for request, request_id in self.requests:
+                    try:
+                        callback(request_id, request.execute(), None)
+                    except Exception as e:
+                        callback(request_id, None, e)
+
+        return Batch()
+
+
+class FakeGmail:
+    def __init__(self, service):
+        self.service = service
+        self.single = []
+
+    def _get_service(self):
+        return self.service
+
+    def _extract_body(self, payload):
+        return base64.urlsafe_b64decode(payload["body"]["data"]).decode()
+
+    def get_email_body(self, email_id: str) -> str:
+        """Get full email body."""
+        self.single.append(email_id)
+        return f"single {email_id}"
+
+
+class FakeOutlook:
+    GRAPH_API_URL = "https://graph.microsoft.com/v1.0"
+
+    def __init__(self):
+        self.posts = []
+
+    def _request(self, method, endpoint, **kwargs):
+        requests = kwargs["json"]["requests"]
+        self.posts.append(len(requests))
+        return {"responses": [{
+            "id": r["id"], "status": 200,
+            "body": {"subject": r["url"].split("/")[3].split("?")[0],
+                     "from": {"emailAddress": {"name": "Ann", "address": "ann@acme.com"}},
+                     "body": {"contentType": "html", "content": "<p>Hi&nbsp;there</p><p>Bye</p>"}},
+        } for r in requests]}
+
+    def get_email_body(self, email_id: str) -> str:
+        """Get full email body."""
+        return f"single {email_id}"
+
+
+class FakeMailbox:
+    def __init__(self, bodies):
+        self.bodies = bodies
+
+    def body(self, email_id):
+        return self.bodies.get(email_id)
+
+    def store_body(self, email_id, body):
+        self.bodies[email_id] = body
+
+
+@pytest.fixture
+def gmail():
+    tool = FakeGmail(FakeService())
+    return EmailBodies.for_tool(tool).attach(tool)
+
+
+class TestGmail:
+    """Tests for Gmail batch retrieval."""
+
+    def test_fifty_bodies_in_one_batch(self, gmail):
+        """Verify 50 bodies cost one batch request and come back in order."""
+        ids = [f"m{i}" for i in range(50)]
+        result = gmail.get_email_bodies(ids)
+        assert gmail.service.batches == [50]
+        assert result.index("(ID: m0)") < result.index("(ID: m49)")
+        assert "=== Email 50/50 (ID: m49) ===" in result
+        assert "Subject: S7" in result and "body 7" in result
+
+    def test_body_length_capped(self, gmail):
+        """Verify each body is cut at max_chars with a pointer to the full text."""
+        result = gmail.get_email_bodies(["m1"], max_chars=40)
+        assert 'get_email_body("m1") for the full text' in result
+        assert "x" * 100 not in result
+
+    def test_failed_items_fetched_singly(self, gmail):
+        """Verify messages the batch rejected fall back to get_email_body."""
+        gmail.service.rejected = {"m2"}
+        result = gmail.get_email_bodies(["m1", "m2"])
+        assert gmail.single == ["m2"]
+        assert "single m2" in result
+
+    def test_ids_deduplicated_and_limited(self, gmail):
+        """Verify repeated ids are read once and ids past the limit are reported."""
+        ids = ["m1", "m1"] + [f"m{i}" for i in range(2, 60)]
+        result = gmail.get_email_bodies(ids)
+        assert sum(gmail.service.batches) == 50
+        assert "9 more ID(s) not read" in result
+
+    def test_mirror_bodies_read_locally(self):
+        """Verify bodies the mirror has skip the API, and fetched ones are stored."""
+        tool = FakeGmail(FakeService())
+        tool.mailbox = FakeMailbox({"m1": "cached m1"})
+        EmailBodies.for_tool(tool).attach(tool)
+        result = tool.get_email_bodies(["m1", "m2"])
+        assert "cached m1" in result
+        assert tool.service.batches == [1]
+        assert "body 2" in tool.mailbox.bodies["m2"]
+
+
+class TestOutlook:
+    """Tests for Graph $batch retrieval."""
+
+    def test_batches_of_twenty(self):
+        """Verify ids are split into $batch requests of 20 with text bodies."""
+        tool = FakeOutlook()
+        EmailBodies.for_tool(tool).attach(tool)
+        result = tool.get_email_bodies([f"id{i}" for i in range(45)])
+        assert sorted(tool.posts) == [5, 20, 20]
+        assert "Subject: id44" in result
+        assert "Hi there\nBye" in result
+
+
+class TestHtmlToText:
+    """Tests for HTML conversion."""
+
+    def test_blocks_links_and_entities(self):
+        """Verify paragraphs become lines, links keep their URL and styles are dropped."""
+        markup = ('<style>p{color:red}</style><p>Hello&amp;welcome</p>'
+                  '<div>See <a href="https://x.io/a?t=1">the <b>report</b></a></div>')
+        assert html_to_text(markup) == "Hello&welcome\nSee the report <https://x.io/a?t=1>"
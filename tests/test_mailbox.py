@@ -0,0 +1,301 @@
+"""Tests for the local mailbox mirror."""
+
+import time
+import pytest
+from unittest.mock import Mock
+
+from tools.mailbox import Mailbox, CursorExpired
+
+
+def _message(id, subject="Hello", sender="Alice <alice@example.com>", labels=("INBOX",), age_days=1):
+    return {
+        'id': id,
+        'thread_id': f"t-{id}",
+        'date': time.time() - age_days * 86400,
+        'date_header': "Mon, 1 Jan 2024 10:00:00 +0000",
+        'sender': sender,
+        'recipients': "me@example.com",
+        'subject': subject,
+        'snippet': f"snippet {id}",
+        'labels': list(labels),
+    }
+
+
+class FakeSource:
+    """Delta source returning canned messages."""
+
+    name = "fake"
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.pending = ([], set())
+        self.initial_calls = 0
+        self.change_calls = 0
+
+    def initial(self, days, limit):
+        self.initial_calls += 1
+        return list(self.messages), "cursor-1"
+
+    def changes(self, cursor):
+        self.change_calls += 1
+        upserts, deleted = self.pending
+        self.pending = ([], set())
+        return upserts, deleted, "cursor-2"
+
+
+class FakeGmail:
+    """Stand-in provider tool with the methods the mirror wraps."""
+
+    def __init__(self):
+        self.calls = []
+
+    def read_inbox(self, last: int = 10, unread: bool = False) -> str:
+        self.calls.append(("read_inbox", last, unread))
+        return "api inbox"
+
+    def search_emails(self, query: str, max_results: int = 10) -> str:
+        self.calls.append(("search_emails", query, max_results))
+        return "api search"
+
+    def get_email_body(self, email_id: str) -> str:
+        self.calls.append(("get_email_body", email_id))
+        return f"body of {email_id}"
+
+    def mark_read(self, email_id: str) -> str:
+        return "ok"
+
+
+class FlakyGmail(FakeGmail):
+    """FakeGmail whose first body fetches fail with the given exceptions or error replies."""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = list(failures)
+
+    def get_email_body(self, email_id: str) -> str:
+        if not self.failures:
+            return super().get_email_body(email_id)
+        self.calls.append(("get_email_body", email_id))
+        failure = self.failures.pop(0)
+        if isinstance(failure, Exception):
+            raise failure
+        return failure
+
+
+@pytest.fixture
+def source():
+    return FakeSource([
+        _message("1", subject="Quarterly report", age_days=1),
+        _message("2", subject="Lunch?", sender="Bob <bob@acme.com>", labels=("INBOX", "UNREAD"), age_days=2),
+        _message("3", subject="Sent note", labels=("SENT",), age_days=3),
+    ])
+
+
+@pytest.fixture
+def mailbox(source, tmp_path):
+    return Mailbox(source, db_path=str(tmp_path / "mailbox.db"))
+
+
+class TestSync:
+    """Tests for initial and delta sync."""
+
+    def test_first_sync_is_full(self, mailbox, source):
+        """Verify an empty mirror does a full initial sync."""
+        assert mailbox.sync() == 3
+        assert source.initial_calls == 1
+        assert source.change_calls == 0
+
+    def test_second_sync_within_max_age_is_skipped(self, mailbox, source):
+        """Verify a fresh mirror does not call the provider again."""
+        mailbox.sync()
+        assert mailbox.sync() == 0
+        assert source.change_calls == 0
+
+    def test_delta_applies_upserts_and_deletes(self, mailbox, source):
+        """Verify delta sync adds, updates and removes messages."""
+        mailbox.sync()
+        source.pending = ([_message("4", subject="New"), _message("1", subject="Quarterly report", labels=())], {"2"})
+        mailbox.sync(force=True)
+
+        ids = [e['id'] for e in mailbox.inbox(last=10)]
+        assert ids == ["4"]
+        assert source.change_calls == 1
+
+    def test_expired_cursor_triggers_resync(self, mailbox, source):
+        """Verify CursorExpired falls back to a full sync."""
+        mailbox.sync()
+        source.changes = Mock(side_effect=CursorExpired("cursor-1"))
+        mailbox.sync(force=True)
+        assert source.initial_calls == 2
+
+    def test_delta_keeps_fetched_bodies(self, mailbox, source):
+        """Verify metadata updates don't drop cached bodies."""
+        mailbox.sync()
+        mailbox.store_body("1", "full body")
+        source.pending = ([_message("1", subject="Renamed")], set())
+        mailbox.sync(force=True)
+        assert mailbox.body("1") == "full body"
+
+
+class TestReading:
+    """Tests for local inbox and search."""
+
+    def test_inbox_newest_first(self, mailbox):
+        """Verify inbox returns INBOX messages ordered by date."""
+        mailbox.sync()
+        assert [e['id'] for e in mailbox.inbox()] == ["1", "2"]
+
+    def test_inbox_unread_filter(self, mailbox):
+        """Verify unread filter uses the UNREAD label."""
+        mailbox.sync()
+        assert [e['id'] for e in mailbox.inbox(unread=True)] == ["2"]
+
+    def test_search_or_query(self, mailbox):
+        """Verify the prompt's "from:X OR to:X" pattern is answered locally."""
+        mailbox.sync()
+        results = mailbox.search("from:bob@acme.com OR to:bob@acme.com newer_than:30d")
+        assert [e['id'] for e in results] == ["2"]
+
+    def test_partial_result_past_window_returns_none(self, mailbox):
+        """Verify a short local result falls back when the query reaches past the synced window."""
+        mailbox.sync()
+        assert mailbox.search("from:bob@acme.com") is None
+        assert [e['id'] for e in mailbox.search("from:bob@acme.com", max_results=1)] == ["2"]
+
+    def test_query_outside_mirrored_folders_returns_none(self, mailbox, source):
+        """Verify an inbox-only mirror sends queries that can match sent mail to the API."""
+        source.folders = {"INBOX"}
+        mailbox.sync()
+        assert mailbox.search("to:me@example.com newer_than:30d") is None
+        assert [e['id'] for e in mailbox.search("in:inbox to:me@example.com newer_than:30d")] == ["1", "2"]
+
+    def test_search_unsupported_operator_returns_none(self, mailbox):
+        """Verify unknown operators fall back to the API."""
+        mailbox.sync()
+        assert mailbox.search("has:attachment") is None
+
+    def test_search_without_local_match_returns_none(self, mailbox):
+        """Verify an empty local result outside the synced window falls back."""
+        mailbox.sync()
+        assert mailbox.search("from:nobody@nowhere.com") is None
+
+    def test_labels_for(self, mailbox):
+        """Verify labels come back per id, and unknown ids are left out."""
+        mailbox.sync()
+        assert mailbox.labels_for(["2", "missing"]) == {"2": "INBOX,UNREAD"}
+        assert mailbox.labels_for([]) == {}
+
+
+class TestAttach:
+    """Tests for serving provider tool methods from the mirror."""
+
+    def test_search_served_locally(self, mailbox):
+        """Verify search_emails reads the mirror instead of the API."""
+        gmail = FakeGmail()
+        mailbox.attach(gmail)
+        mailbox.sync()
+        result = gmail.search_emails("subject:Quarterly newer_than:30d")
+        assert "Quarterly report" in result
+        assert gmail.calls == []
+
+    def test_body_fetched_once(self, mailbox):
+        """Verify bodies are fetched lazily and then cached."""
+        gmail = FakeGmail()
+        mailbox.attach(gmail)
+        mailbox.sync()
+        assert gmail.get_email_body("1") == "body of 1"
+        assert gmail.get_email_body(email_id="1") == "body of 1"
+        assert gmail.calls == [("get_email_body", "1")]
+
+    def test_failed_body_fetch_not_cached(self, mailbox):
+        """Verify an exception or error reply is retried on the next call instead of being stored."""
+        gmail = FlakyGmail([TimeoutError("read timed out"), "Error reading email: 503"])
+        mailbox.attach(gmail)
+        mailbox.sync()
+        with pytest.raises(TimeoutError):
+            gmail.get_email_body("1")
+        assert gmail.get_email_body("1") == "Error reading email: 503"
+        assert mailbox.body("1") is None
+        assert gmail.get_email_body("1") == "body of 1"
+        assert gmail.get_email_body("1") == "body of 1"
+        assert len(gmail.calls) == 3
+
+    def test_mutation_invalidates(self, mailbox, source):
+        """Verify a mutating tool call forces a delta sync on the next read."""
+        gmail = FakeGmail()
+        mailbox.attach(gmail)
+        mailbox.sync()
+        gmail.mark_read("2")
+        gmail.read_inbox(last=2)
+        assert source.change_calls == 1
+
+    def test_first_sync_runs_in_background(self, mailbox, source):
+        """Verify reads before the first full sync go to the API instead of waiting for it."""
+        gmail = FakeGmail()
+        mailbox.attach(gmail)
+        assert gmail.read_inbox(last=2) == "api inbox"
+        mailbox._full_sync.join(timeout=5)
+        assert mailbox.ready
+        assert "Quarterly report" in gmail.read_inbox(last=2)
+        assert source.initial_calls == 1
+
+    def test_wrapped_methods_keep_signature(self, mailbox):
+        """Verify the agent still sees the original tool schema."""
+        import inspect
+        gmail = FakeGmail()
+        mailbox.attach(gmail)
+        assert list(inspect.signature(gmail.search_emails).parameters) == ["query", "max_results"]
+        assert hasattr(gmail.search_emails, "__self__")
+
+
+
+class FakeBatchService:
+    """Gmail service stand-in: batch requests return metadata, except for ids in `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.batches = []
+        self.single = []
+
+    def new_batch_http_request(self, callback):
+        service = self
+
+        class Batch:
+            def __init__(self):
+                self.requests = []
+
+            def add(self, request, request_id):
+                self.requests.append(request_id)
+
+            def execute(self):
+                service.batches.append(list(self.requests))
+                for i in self.requests:
+                    error = Exception("rate limited") if i in service.failing else None
+                    callback(i, None if error else {"id": i, "internalDate": "0"}, error)
+
+        return Batch()
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def get(self, userId, id, **kwargs):
+        return Mock(execute=lambda: self.single.append(id) or {"id": id, "internalDate": "0"})
+
+
+class TestGmailSource:
+    """Tests for fetching Gmail metadata."""
+
+    def test_metadata_fetched_in_batches(self):
+        """Verify messages are fetched BATCH_SIZE per request, with failures retried one by one."""
+        from tools.mailbox import BATCH_SIZE, GmailSource
+
+        service = FakeBatchService(failing={"m3"})
+        source = GmailSource(Mock(_get_service=lambda: service))
+        ids = [f"m{i}" for i in range(BATCH_SIZE + 5)]
+        records = source._get_many(ids)
+        assert [r['id'] for r in records] == ids
+        assert [len(b) for b in service.batches] == [BATCH_SIZE, 5]
+        assert service.single == ["m3"]
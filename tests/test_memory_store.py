@@ -0,0 +1,102 @@
+"""Tests for the keyed Memory backend."""
+
+import pytest
+from connectonion import Memory
+
+from tools import memory_store
+from tools.memory_store import MemoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MemoryStore(path=str(tmp_path / "memory.log"), legacy_file=str(tmp_path / "memory.md"))
+
+
+@pytest.fixture
+def memory(store, tmp_path):
+    memory = Memory(memory_file=str(tmp_path / "memory.md"))
+    return store.attach(memory)
+
+
+class TestStore:
+    """Tests for the append-only log."""
+
+    def test_latest_write_wins(self, store):
+        """Verify get returns the newest value for a key."""
+        store.put("a", "one")
+        store.put("a", "two")
+        assert store.get("a") == "two"
+
+    def test_prefix_listing(self, store):
+        """Verify keys(prefix) returns the sorted matching range."""
+        for key in ["crminit", "contactbob", "contactalice", "crmall", "other"]:
+            store.put(key, "x")
+        assert store.keys("contact") == ["contactalice", "contactbob"]
+        assert store.keys("crm") == ["crmall", "crminit"]
+
+    def test_persists_and_sees_other_writers(self, store, tmp_path):
+        """Verify a second store on the same log reads existing and new records."""
+        store.put("a", "one")
+        other = MemoryStore(path=str(store.path), legacy_file=str(tmp_path / "memory.md"))
+        assert other.get("a") == "one"
+        store.put("b", "two")
+        assert other.get("b") == "two"
+
+    def test_compaction_drops_superseded_records(self, store, monkeypatch):
+        """Verify rewrites are compacted once dead records outweigh live ones."""
+        monkeypatch.setattr(memory_store, "COMPACT_MIN_BYTES", 100)
+        for i in range(50):
+            store.put("a", f"version {i}")
+        assert store.path.stat().st_size < 200
+        assert store.get("a") == "version 49"
+
+    def test_imports_memory_md(self, tmp_path):
+        """Verify an existing memory.md seeds a new log."""
+        legacy = tmp_path / "memory.md"
+        legacy.write_text("## crmall_contacts\n\nAlice, Bob\n\n## note\n\nhello\n")
+        store = MemoryStore(path=str(tmp_path / "memory.log"), legacy_file=str(legacy))
+        assert store.get("crmall_contacts") == "Alice, Bob"
+        assert store.keys() == ["crmall_contacts", "note"]
+
+
+class TestAttach:
+    """Tests for the Memory tool methods served from the store."""
+
+    def test_write_and_read_keep_format(self, memory):
+        """Verify replies match Memory's, including key sanitization."""
+        assert memory.write_memory("contact:alice@example.com", "Investor") == "Memory saved: contactaliceexamplecom"
+        assert memory.read_memory("contact:alice@example.com") == "Memory: contactaliceexamplecom\n\nInvestor"
+
+    def test_invalid_key(self, memory):
+        """Verify keys with no usable characters are rejected."""
+        assert memory.write_memory("@@@", "x").startswith("Invalid key name")
+
+    def test_missing_key_suggests_related(self, memory):
+        """Verify a miss lists keys sharing a prefix."""
+        assert memory.read_memory("nothing").endswith("No memories stored yet")
+        memory.write_memory("contact:bob@acme.com", "Vendor")
+        memory.write_memory("crm:init_report", "done")
+        result = memory.read_memory("contact:carol@acme.com")
+        assert result.startswith("Memory not found: contactcarolacmecom\nAvailable memories: contactbobacmecom")
+        assert "crminit_report" not in result
+
+    def test_read_prefix_wildcard(self, memory):
+        """Verify read_memory("contact:*") lists contact keys."""
+        memory.write_memory("contact:bob@acme.com", "Vendor")
+        memory.write_memory("crm:init_report", "done")
+        assert memory.read_memory("contact:*") == \
+            "Stored Memories matching contact:* (1):\n1. contactbobacmecom (6 bytes)"
+
+    def test_list_and_search(self, memory):
+        """Verify list_memories and search_memory keep Memory's output."""
+        memory.write_memory("note-1", "First note\nsecond line")
+        memory.write_memory("note-2", "Other")
+        assert memory.list_memories() == "Stored Memories (2):\n1. note-1 (22 bytes)\n2. note-2 (5 bytes)"
+        assert memory.search_memory("(?i)second") == "Search Results (1 matches):\n\nnote-1:\n  Line 2: second line"
+        assert memory.search_memory("zzz") == "No matches found for pattern: zzz"
+
+    def test_tool_schema_unchanged(self, memory):
+        """Verify the agent still sees Memory's signatures."""
+        import inspect
+        assert list(inspect.signature(memory.write_memory).parameters) == ["key", "content"]
+        assert memory.read_memory.__doc__ == Memory.read_memory.__doc__
@@ -0,0 +1,202 @@
+"""Tests for concurrent execution of a turn's tool calls."""
+
+import threading
+import time
+
+import pytest
+
+from tools.parallel_calls import ParallelCalls
+
+
+class SlowProvider:
+    """Provider stand-in whose reads take `delay` seconds and record overlap."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _call(self, name, *args):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.calls.append((name,) + args)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        return f"{name}{args}"
+
+    def search_emails(self, query: str, max_results: int = 10) -> str:
+        """Search emails."""
+        return self._call("search_emails", query, max_results)
+
+    def find_free_slots(self, date: str, duration_minutes: int = 30) -> str:
+        """Find free slots."""
+        return self._call("find_free_slots", date, duration_minutes)
+
+    def get_today_events(self) -> str:
+        """Get today's events."""
+        return self._call("get_today_events")
+
+    def get_email_bodies(self, email_ids: list) -> str:
+        """Several bodies, read through get_email_body."""
+        return "\n".join(self.get_email_body(i) for i in email_ids)
+
+    def get_email_body(self, email_id: str) -> str:
+        """Get full email body."""
+        return self._call("get_email_body", email_id)
+
+    def send(self, to: str, subject: str, body: str) -> str:
+        """Send an email."""
+        return self._call("send", to)
+
+
+@pytest.fixture
+def parallel():
+    return ParallelCalls(provider_limit=4, timeout=5)
+
+
+@pytest.fixture
+def tool(parallel):
+    return parallel.attach(SlowProvider())
+
+
+class TestTurn:
+    """Tests for starting a turn's calls together."""
+
+    def test_independent_calls_overlap(self, parallel, tool):
+        """Verify three reads of one turn take about as long as one."""
+        calls = [("find_free_slots", {"date": "2026-01-02", "duration_minutes": 30, "summary": "slots"}),
+                 ("search_emails", {"query": "from:ann", "max_results": 5}),
+                 ("get_today_events", {})]
+        started = time.monotonic()
+        assert parallel.start(calls) == 3
+        # The agent loop then runs them in order
+        results = [tool.find_free_slots("2026-01-02", 30), tool.search_emails("from:ann", max_results=5),
+                   tool.get_today_events()]
+        elapsed = time.monotonic() - started
+        assert results == ["find_free_slots('2026-01-02', 30)", "search_emails('from:ann', 5)",
+                           "get_today_events()"]
+        assert tool.peak == 3
+        assert elapsed < 0.45
+        assert len(tool.calls) == 3
+
+    def test_mutations_not_started_early(self, parallel, tool):
+        """Verify only parallel-safe methods run before their turn."""
+        assert parallel.start([("send", {"to": "a@b.c", "subject": "s", "body": "b"}),
+                               ("get_today_events", {})]) == 0
+        assert tool.calls == []
+
+    def test_provider_limit(self):
+        """Verify no more than provider_limit provider calls run at once."""
+        parallel = ParallelCalls(provider_limit=2, timeout=5)
+        tool = parallel.attach(SlowProvider(delay=0.1))
+        calls = [("search_emails", {"query": f"q{i}"}) for i in range(5)]
+        parallel.start(calls)
+        for i in range(5):
+            tool.search_emails(f"q{i}")
+        assert tool.peak == 2
+
+    def test_unclaimed_results_discarded(self, parallel, tool):
+        """Verify a later identical call runs again instead of reusing a stale prefetch."""
+        parallel.start([("search_emails", {"query": "x"}), ("get_today_events", {})])
+        tool.get_today_events()
+        parallel.discard()
+        tool.search_emails("x")
+        assert [c[0] for c in tool.calls].count("search_emails") == 2
+
+    def test_turns_on_other_threads_kept_apart(self, parallel, tool):
+        """Verify another agent's turn neither claims nor discards this turn's started calls."""
+        parallel.start([("search_emails", {"query": "x"}), ("get_today_events", {})])
+        other = threading.Thread(target=lambda: (parallel.discard(), tool.search_emails("x")))
+        other.start()
+        other.join()
+        tool.search_emails("x")
+        tool.get_today_events()
+        assert [c[0] for c in tool.calls].count("search_emails") == 2
+
+
+class TestTimeouts:
+    """Tests for per-tool timeouts and nesting."""
+
+    def test_slow_call_times_out(self):
+        """Verify a started call past its timeout raises instead of blocking the turn."""
+        parallel = ParallelCalls(timeout=0.05)
+        tool = parallel.attach(SlowProvider(delay=0.3))
+        parallel.start([("get_today_events", {}), ("search_emails", {"query": "x"})])
+        with pytest.raises(TimeoutError, match="get_today_events did not finish within 0.05s"):
+            tool.get_today_events()
+
+    def test_per_tool_timeout(self):
+        """Verify a method's own timeout overrides the default."""
+        parallel = ParallelCalls(timeout=0.05, timeouts={"get_today_events": 2})
+        tool = parallel.attach(SlowProvider(delay=0.1))
+        parallel.start([("get_today_events", {}), ("search_emails", {"query": "x"})])
+        assert tool.get_today_events() == "get_today_events()"
+
+    def test_timed_out_call_gives_up_its_provider_slot(self):
+        """Verify a call still running after its timeout doesn't hold back the next turn's calls."""
+        parallel = ParallelCalls(provider_limit=1, timeout=0.05, timeouts={"search_emails": 2})
+        tool = parallel.attach(SlowProvider(delay=0.5))
+        parallel.start([("get_today_events", {}), ("find_free_slots", {"date": "d"})])
+        with pytest.raises(TimeoutError):
+            tool.get_today_events()
+        parallel.discard()
+        tool.delay = 0.01
+        parallel.start([("search_emails", {"query": "a"}), ("search_emails", {"query": "b"})])
+        started = time.monotonic()
+        tool.search_emails("a")
+        assert time.monotonic() - started < 0.3
+
+    def test_calls_outside_a_turn_run_inline(self):
+        """Verify direct calls (the CLI) run on the caller's thread with no timeout."""
+        parallel = ParallelCalls(timeout=0.01)
+        tool = parallel.attach(SlowProvider(delay=0.1))
+        assert tool.get_today_events() == "get_today_events()"
+        assert parallel.started == 0
+
+    def test_single_call_runs_inline(self, parallel, tool):
+        """Verify a turn with one parallel-safe call starts nothing early."""
+        assert parallel.start([("get_today_events", {})]) == 0
+        assert tool.get_today_events() == "get_today_events()"
+
+    def test_nested_calls_run_inline(self):
+        """Verify a tool calling another tool doesn't wait on the pool it is running in."""
+        parallel = ParallelCalls(workers=1, provider_limit=1, timeout=2)
+        tool = parallel.attach(SlowProvider(delay=0.01))
+        parallel.start([("get_email_bodies", {"email_ids": ["a", "b"]}), ("get_today_events", {})])
+        assert tool.get_email_bodies(["a", "b"]) == "get_email_body('a',)\nget_email_body('b',)"
+
+
+class TestSharedNames:
+    """Tests for tools that have a method of the same name."""
+
+    def test_started_call_claimed_only_by_its_own_tool(self):
+        """Verify a call started for one tool isn't returned to another tool's method of the same name."""
+        parallel = ParallelCalls(timeout=2)
+        first = parallel.attach(SlowProvider(delay=0.01))
+        second = parallel.attach(SlowProvider(delay=0.01))
+        parallel.start([("get_today_events", {}), ("search_emails", {"query": "x"})])
+        first.get_today_events()
+        assert len(second.calls) == 2
+        assert first.calls == [("get_today_events",)]
+
+
+class TestEvents:
+    """Tests for the agent event handlers."""
+
+    def test_start_turn_reads_tool_calls(self, parallel, tool):
+        """Verify before_tools starts the calls of the last assistant message."""
+        class Agent:
+            current_session = {"messages": [{"role": "assistant", "tool_calls": [
+                {"id": "1", "function": {"name": "get_today_events", "arguments": "{}"}},
+                {"id": "2", "function": {"name": "search_emails", "arguments": '{"query": "q"}'}},
+            ]}]}
+
+        start_turn, finish_turn = parallel.events()
+        start_turn(Agent())
+        assert parallel.started == 2
+        finish_turn(Agent())
+        assert parallel._pending == {}
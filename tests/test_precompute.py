@@ -0,0 +1,77 @@
+"""Tests for the background precompute worker and its result store."""
+
+import time
+
+import pytest
+
+from tools.precompute import Precomputed, PrecomputeWorker, freshness
+
+
+@pytest.fixture
+def store(tmp_path):
+    return Precomputed(path=str(tmp_path / "precomputed.json"))
+
+
+class TestPrecomputed:
+    """Tests for the shared result store."""
+
+    def test_round_trip_across_instances(self, store):
+        """Verify a result written by one process's store is read by another's."""
+        store.put("today", "briefing")
+        entry = Precomputed(path=str(store.path)).get("today", max_age=60)
+        assert entry["result"] == "briefing"
+
+    def test_stale_result_ignored(self, store):
+        """Verify results older than max_age are not served."""
+        store.put("today", "old briefing", computed_at=time.time() - 3600)
+        assert store.get("today", max_age=900) is None
+        assert store.get("missing", max_age=900) is None
+
+
+class TestWorker:
+    """Tests for the scheduled jobs."""
+
+    def test_jobs_run_in_order_and_results_stored(self, store):
+        """Verify the sync job runs first and only jobs with a result are stored."""
+        order = []
+        worker = PrecomputeWorker(store, [
+            ("mailbox", lambda: order.append("mailbox")),
+            ("today", lambda: order.append("today") or "briefing"),
+        ])
+        worker.run_once()
+        assert order == ["mailbox", "today"]
+        assert store.get("today", max_age=60)["result"] == "briefing"
+        assert store.get("mailbox", max_age=60) is None
+
+    def test_failed_job_keeps_last_result(self, store):
+        """Verify a failing job is recorded and its previous result is still served."""
+        store.put("today", "yesterday's run")
+        runs = []
+
+        def broken():
+            raise ConnectionError("offline")
+
+        worker = PrecomputeWorker(store, [("today", broken), ("unanswered", lambda: "list")],
+                                  on_run=lambda name, seconds, error: runs.append((name, error)))
+        worker.run_once()
+        assert store.get("today", max_age=60)["result"] == "yesterday's run"
+        assert worker.errors == {"today": "ConnectionError: offline"}
+        assert runs == [("today", "ConnectionError: offline"), ("unanswered", None)]
+
+    def test_background_thread_repeats_until_stopped(self, store):
+        """Verify start() refreshes on the interval and stop() ends the loop."""
+        calls = []
+        worker = PrecomputeWorker(store, [("today", lambda: calls.append(1) or "b")], interval=0.05)
+        thread = worker.start()
+        time.sleep(0.2)
+        worker.stop(timeout=1)
+        assert len(calls) >= 2
+        assert not thread.is_alive()
+
+
+def test_freshness():
+    """Verify the age reads in minutes, then hours."""
+    now = time.time()
+    assert freshness(now - 10, now).endswith("(just now)")
+    assert freshness(now - 180, now).endswith("(3 min ago)")
+    assert freshness(now - 7200, now).endswith("(2 h ago)")
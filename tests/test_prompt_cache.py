@@ -0,0 +1,131 @@
+"""Tests for prompt-prefix caching and the compact prompt variant."""
+
+import os
+import time
+from types import SimpleNamespace
+
+from tools.compact_prompt import compact, compact_prompt_file
+from tools.prompt_cache import PromptCache, with_breakpoints
+
+
+class FakeLLM:
+    """OpenAI-compatible LLM stand-in that records what it was sent."""
+
+    def __init__(self):
+        self.client = SimpleNamespace(chat=object())
+        self.sent = []
+
+    def complete(self, messages, tools=None, **kwargs):
+        self.sent.append(messages)
+        return SimpleNamespace(usage=SimpleNamespace(input_tokens=4000, cached_tokens=3500))
+
+
+MESSAGES = [
+    {"role": "system", "content": "You are an email agent."},
+    {"role": "user", "content": "Any replies from Ann?"},
+]
+
+
+class TestBreakpoints:
+    """Tests for cache breakpoint placement."""
+
+    def test_system_and_newest_message_marked(self):
+        """Verify the system prompt and the newest message get cache_control."""
+        marked = with_breakpoints(MESSAGES)
+        for message in marked:
+            assert message["content"][0]["cache_control"] == {"type": "ephemeral"}
+        assert marked[0]["content"][0]["text"] == "You are an email agent."
+
+    def test_input_not_modified(self):
+        """Verify the session's messages keep their plain string content."""
+        with_breakpoints(MESSAGES)
+        assert MESSAGES[0]["content"] == "You are an email agent."
+
+    def test_assistant_tail_not_marked(self):
+        """Verify an assistant message with tool calls (no text) is left alone."""
+        messages = MESSAGES + [{"role": "assistant", "content": None, "tool_calls": []}]
+        assert with_breakpoints(messages)[-1]["content"] is None
+
+
+class TestPromptCache:
+    """Tests for the LLM wrapper."""
+
+    def test_records_usage_per_call(self):
+        """Verify each call's tokens are recorded and requests carry breakpoints."""
+        llm = PromptCache().attach(FakeLLM())
+        llm.complete(MESSAGES, tools=[])
+        assert isinstance(llm.sent[0][0]["content"], list)
+        assert llm.prompt_cache.calls[0]["cached_tokens"] == 3500
+        assert "3,500 cached (88%)" in llm.prompt_cache.summary()
+
+    def test_report_turn_only_new_calls(self):
+        """Verify each report covers the calls since the previous one."""
+        llm = PromptCache().attach(FakeLLM())
+        llm.complete(MESSAGES)
+        llm.complete(MESSAGES)
+        assert "2 LLM call(s)" in llm.prompt_cache.report_turn()
+        assert llm.prompt_cache.report_turn() is None
+        llm.complete(MESSAGES)
+        assert "1 LLM call(s)" in llm.prompt_cache.report_turn()
+
+    def test_other_llms_untouched(self):
+        """Verify an LLM without an OpenAI-style client keeps its complete method."""
+        llm = SimpleNamespace(complete=lambda messages, tools=None: "ok")
+        original = llm.complete
+        PromptCache().attach(llm)
+        assert llm.complete is original
+
+
+PROMPT = """# Agent
+
+Use the tools.
+
+---
+
+## Tools
+- read_inbox()
+
+```python
+short()
+```
+
+## Examples
+
+Lots of worked examples.
+
+## Rules
+```
+1
+2
+3
+4
+5
+6
+7
+8
+9
+```
+Be brief.
+"""
+
+
+class TestCompact:
+    """Tests for the compact prompt variant."""
+
+    def test_drops_examples_and_long_blocks(self):
+        """Verify example sections, long code blocks and rules go; instructions stay."""
+        text = compact(PROMPT)
+        assert "worked examples" not in text and "9\n" not in text and "---" not in text
+        assert "read_inbox()" in text and "short()" in text and "Be brief." in text
+        assert "## Rules" in text
+
+    def test_regenerated_when_source_changes(self, tmp_path):
+        """Verify the generated file follows edits to the full prompt."""
+        source = tmp_path / "agent.md"
+        source.write_text(PROMPT)
+        target = compact_prompt_file(str(source), out_dir=str(tmp_path / "out"))
+        assert target.endswith("agent.compact.md")
+        source.write_text("# Agent\n\nNew rule.\n")
+        later = time.time() + 5
+        os.utime(source, (later, later))
+        assert "New rule." in open(compact_prompt_file(str(source), out_dir=str(tmp_path / "out"))).read()
@@ -0,0 +1,150 @@
+"""Tests for the quota-aware provider rate limiter."""
+
+import copy
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+from googleapiclient.http import HttpMockSequence, HttpRequest
+from googleapiclient.model import JsonModel
+
+from tools.rate_limit import RateLimiter, TokenBucket, rate_limited, retry_after
+
+
+class Throttled(Exception):
+    """An HTTP status error as raised by httpx/requests, with the response's headers."""
+
+    def __init__(self, status=429, headers=None):
+        self.status = status
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+        super().__init__(f"HTTP {status}")
+
+
+class FakeService:
+    """Google API service stand-in: builds real HttpRequests over a scripted transport."""
+
+    def __init__(self, responses):
+        self._http = HttpMockSequence(responses)
+        self._requestBuilder = HttpRequest
+
+    def get(self, method_id="gmail.users.messages.get"):
+        return self._requestBuilder(self._http, JsonModel().response, "https://gmail.googleapis.com/x",
+                                    method="GET", methodId=method_id)
+
+
+class GoogleTool:
+    def __init__(self, service):
+        self.service = service
+
+    def _get_service(self):
+        return self.service
+
+
+class GraphTool:
+    def __init__(self):
+        self.requests = []
+
+    def _request(self, method: str, endpoint: str, **kwargs) -> dict:
+        self.requests.append((method, endpoint))
+        return {}
+
+
+class TestTokenBucket:
+    """Tests for spending, waiting and adapting."""
+
+    def test_burst_then_rate(self):
+        """Verify a full bucket spends at once and then refills at its rate."""
+        bucket = TokenBucket(rate=100, burst=10)
+        assert bucket.take(10) < 0.01
+        assert bucket.take(5) >= 0.04
+
+    def test_costly_request_leaves_debt(self):
+        """Verify a request costlier than the burst makes the next one wait for the difference."""
+        bucket = TokenBucket(rate=100, burst=10)
+        bucket.take(20)
+        assert bucket.take(1) >= 0.09
+
+    def test_throttle_pauses_and_halves(self):
+        """Verify a throttle waits out Retry-After, halves the rate, and successes restore it."""
+        bucket = TokenBucket(rate=100, burst=100)
+        bucket.throttled(retry_after=0.1)
+        assert bucket.rate == 50
+        assert bucket.take(1) >= 0.09
+        for _ in range(20):
+            bucket.succeeded()
+        assert bucket.rate == 100
+
+
+class TestRateLimited:
+    """Tests for recognising throttling errors."""
+
+    def test_http_status(self):
+        """Verify an error with status 429 is throttling, with its Retry-After if any."""
+        assert rate_limited(Throttled()) == (True, None)
+        assert rate_limited(Throttled(headers={"Retry-After": "2"})) == (True, 2.0)
+        assert rate_limited(Throttled(500)) == (False, None)
+        assert rate_limited(ValueError("bad")) == (False, None)
+
+    def test_retry_after_formats(self):
+        """Verify Retry-After is read as seconds or as an HTTP date."""
+        assert retry_after("3") == 3.0
+        assert 8 <= retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+        assert retry_after(None) is None
+
+
+class TestRateLimiter:
+    """Tests for charging requests and retrying throttled ones."""
+
+    def test_retries_after_throttle(self):
+        """Verify a throttled call is retried after backing off."""
+        limiter = RateLimiter()
+        calls = []
+
+        def run():
+            calls.append(1)
+            if len(calls) == 1:
+                raise Throttled(headers={"Retry-After": "0"})
+            return "ok"
+
+        assert limiter.call("graph", 1, run) == "ok"
+        assert len(calls) == 2
+
+    def test_gives_up_after_max_retries(self):
+        """Verify persistent throttling is raised instead of retried forever."""
+        limiter = RateLimiter(max_retries=1)
+        with pytest.raises(Throttled):
+            limiter.call("graph", 1, lambda: (_ for _ in ()).throw(Throttled(headers={"Retry-After": "0"})))
+        assert limiter.stats()["graph"]["throttles"] == 2
+
+    def test_other_errors_not_retried(self):
+        """Verify an ordinary failure is raised at once."""
+        limiter = RateLimiter()
+        calls = []
+        with pytest.raises(ValueError):
+            limiter.call("graph", 1, lambda: calls.append(1) or int("x"))
+        assert len(calls) == 1
+
+    def test_google_requests_charged_by_method(self):
+        """Verify each Google request is charged its method's quota cost and a 429 is retried."""
+        limiter = RateLimiter()
+        service = FakeService([({"status": "429", "retry-after": "0"}, b"{}"),
+                               ({"status": "200"}, b'{"id": "m1"}'),
+                               ({"status": "200"}, b'{"id": "m2"}')])
+        tool = limiter.attach(GoogleTool(service))
+        request = tool._get_service().get()
+        assert request.execute() == {"id": "m1"}
+        # list_next() copies the previous request; the copy is still limited
+        assert copy.copy(request).execute() == {"id": "m2"}
+        stats = limiter.stats()["gmail"]
+        assert stats["units"] == 15
+        assert stats["throttles"] == 1
+
+    def test_graph_batch_charged_per_request(self):
+        """Verify a Graph $batch is charged for every request inside it."""
+        limiter = RateLimiter()
+        tool = limiter.attach(GraphTool())
+        tool._request("GET", "/me/messages")
+        tool._request("POST", "/$batch", json={"requests": [{}, {}, {}]})
+        assert limiter.stats()["graph"]["units"] == 4
+        assert len(tool.requests) == 2
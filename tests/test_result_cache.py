@@ -0,0 +1,155 @@
+"""Tests for the provider tool result cache."""
+
+import pytest
+
+from tools.result_cache import ResultCache
+
+
+class FakeProvider:
+    """Email + calendar stand-in that counts API calls."""
+
+    def __init__(self):
+        self.calls = []
+        self.during_read = None
+
+    def read_inbox(self, last: int = 10, unread: bool = False) -> str:
+        """Read emails from inbox."""
+        self.calls.append(("read_inbox", last, unread))
+        if self.during_read:
+            self.during_read()
+        return f"inbox {last} {unread} #{len(self.calls)}"
+
+    def get_email_body(self, email_id: str) -> str:
+        """Get full email body."""
+        self.calls.append(("get_email_body", email_id))
+        return f"body of {email_id}"
+
+    def count_unread(self) -> str:
+        """Count unread emails."""
+        self.calls.append(("count_unread",))
+        return "You have 3 unread email(s)."
+
+    def get_today_events(self) -> str:
+        """Get today's events."""
+        self.calls.append(("get_today_events",))
+        return "standup 9:00"
+
+    def mark_read(self, email_id: str) -> str:
+        """Mark an email as read."""
+        return f"marked {email_id}"
+
+    def archive_email(self, email_id: str) -> str:
+        """Archive an email."""
+        raise ConnectionError("timed out")
+
+    def create_event(self, title: str, start_time: str, end_time: str) -> str:
+        """Create a calendar event."""
+        return f"created {title}"
+
+
+@pytest.fixture
+def cache():
+    return ResultCache()
+
+
+@pytest.fixture
+def tool(cache):
+    return cache.attach(FakeProvider())
+
+
+class TestReads:
+    """Tests for hits, keys and expiry."""
+
+    def test_repeat_read_served_from_cache(self, tool, cache):
+        """Verify identical calls reach the provider once, however the arguments are passed."""
+        first = tool.read_inbox(5)
+        assert tool.read_inbox(last=5) == first
+        assert tool.read_inbox(5, False) == first
+        assert len(tool.calls) == 1
+        assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+    def test_different_arguments_are_separate_entries(self, tool):
+        """Verify the key includes the arguments."""
+        tool.read_inbox(5)
+        tool.read_inbox(5, unread=True)
+        tool.get_email_body("a")
+        tool.get_email_body("b")
+        assert len(tool.calls) == 4
+
+    def test_expired_entry_refetched(self, tool):
+        """Verify a read older than its TTL goes back to the provider."""
+        tool.result_cache.ttls["read_inbox"] = 0
+        tool.read_inbox()
+        tool.read_inbox()
+        assert len(tool.calls) == 2
+
+    def test_schema_unchanged(self, tool):
+        """Verify the wrapped method keeps its name and docstring."""
+        assert tool.read_inbox.__name__ == "read_inbox"
+        assert tool.read_inbox.__doc__ == "Read emails from inbox."
+
+    def test_lru_eviction(self):
+        """Verify at most max_entries results are kept."""
+        tool = ResultCache(max_entries=2).attach(FakeProvider())
+        for email_id in ("a", "b", "c"):
+            tool.get_email_body(email_id)
+        tool.get_email_body("a")
+        assert tool.calls.count(("get_email_body", "a")) == 2
+
+
+class TestInvalidation:
+    """Tests for mutation-aware invalidation."""
+
+    def test_mutation_drops_affected_reads_only(self, tool):
+        """Verify mark_read clears listings and counts but keeps bodies and events."""
+        tool.read_inbox()
+        tool.count_unread()
+        tool.get_email_body("a")
+        tool.get_today_events()
+        tool.mark_read("a")
+        tool.read_inbox()
+        tool.count_unread()
+        tool.get_email_body("a")
+        tool.get_today_events()
+        assert [c[0] for c in tool.calls].count("read_inbox") == 2
+        assert [c[0] for c in tool.calls].count("count_unread") == 2
+        assert [c[0] for c in tool.calls].count("get_email_body") == 1
+        assert [c[0] for c in tool.calls].count("get_today_events") == 1
+
+    def test_calendar_mutation(self, tool):
+        """Verify creating an event refetches events but not mail."""
+        tool.read_inbox()
+        tool.get_today_events()
+        tool.create_event("Review", "2026-01-01 10:00", "2026-01-01 11:00")
+        tool.read_inbox()
+        tool.get_today_events()
+        assert [c[0] for c in tool.calls] == ["read_inbox", "get_today_events", "get_today_events"]
+
+    def test_failed_mutation_still_invalidates(self, tool):
+        """Verify a mutation that raised still clears the reads it may have changed."""
+        tool.read_inbox()
+        with pytest.raises(ConnectionError):
+            tool.archive_email("a")
+        tool.read_inbox()
+        assert len(tool.calls) == 2
+
+    def test_read_in_flight_during_mutation_not_stored(self, tool):
+        """Verify a result fetched before a concurrent mutation is not cached."""
+        tool.during_read = lambda: tool.result_cache.invalidate(["read_inbox"])
+        tool.read_inbox()
+        tool.during_read = None
+        tool.read_inbox()
+        assert len(tool.calls) == 2
+
+
+class TestStats:
+    """Tests for the hit rate and saved latency report."""
+
+    def test_saved_time_counts_original_latency(self, cache):
+        """Verify each hit adds the time the provider call took."""
+        tool = cache.attach(FakeProvider())
+        cache.put("read_inbox", {"last": 10, "unread": False}, "inbox", 0.5)
+        tool.read_inbox()
+        tool.read_inbox()
+        assert cache.stats()["saved_seconds"] == 1.0
+        assert cache.summary().startswith("Result cache: 2/2 hits (100%), saved 1.0s")
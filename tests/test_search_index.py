@@ -0,0 +1,114 @@
+"""Tests for the mailbox full-text index and Gmail query translator."""
+
+import sqlite3
+import time
+import pytest
+
+from tools import search_index
+from tools.mailbox import SCHEMA
+
+
+DAY = 86400
+
+
+@pytest.fixture
+def conn():
+    """In-memory mirror with a handful of messages and the FTS index."""
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    assert search_index.ensure_index(conn)
+    now = time.time()
+    rows = [
+        ("1", now - 1 * DAY, "Alice <alice@example.com>", "me@example.com", "Quarterly report", "numbers inside", ",INBOX,UNREAD,"),
+        ("2", now - 2 * DAY, "Bob <bob@acme.com>", "me@example.com", "Lunch", "quarterly lunch plans", ",INBOX,Label_7,"),
+        ("3", now - 40 * DAY, "me@example.com", "alice@example.com", "Re: contract", "signed", ",SENT,"),
+        ("4", now - 3 * DAY, "Alice <alice@example.com>", "me@example.com", "Old draft", "quarterly", ",TRASH,"),
+        ("5", now - 4 * DAY, "Prize <win@spam.biz>", "me@example.com", "You won", "claim now", ",SPAM,UNREAD,"),
+    ]
+    conn.executemany(
+        "INSERT INTO messages (id, date, sender, recipients, subject, snippet, labels, unread, thread_id, date_header)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, '', '')",
+        [(*r, int(",UNREAD," in r[6])) for r in rows],
+    )
+    return conn
+
+
+def _ids(rows):
+    return [row['id'] for row in rows]
+
+
+class TestTranslate:
+    """Tests for Gmail query translation."""
+
+    def test_address_operators_use_fts_columns(self):
+        """Verify from:/to: become column-scoped phrase matches."""
+        query = search_index.translate("from:alice@example.com OR to:alice@example.com")
+        assert query.match == '(sender : "alice@example.com" OR recipients : "alice@example.com")'
+        assert not query.ranked
+
+    def test_free_text_is_ranked(self):
+        """Verify bare words produce a ranked query."""
+        assert search_index.translate("quarterly").ranked
+
+    @pytest.mark.parametrize("query", ["has:attachment", "larger:5M", "(a OR b)", "in:anywhere", "is:snoozed"])
+    def test_unsupported_syntax_returns_none(self, query):
+        """Verify operators the index can't handle fall back to the API."""
+        assert search_index.translate(query) is None
+
+    def test_after_bound_is_reported(self):
+        """Verify the lower date bound is exposed for coverage checks."""
+        query = search_index.translate("after:2024/01/02 from:bob")
+        assert query.after == pytest.approx(time.mktime((2024, 1, 2, 0, 0, 0, 0, 0, -1)))
+
+    def test_after_inside_or_is_not_a_bound(self):
+        """Verify an after: that only one OR branch must satisfy doesn't narrow the query."""
+        assert search_index.translate("from:bob OR after:2024/01/02").after is None
+        assert search_index.translate("-after:2024/01/02").after is None
+
+
+class TestSearch:
+    """Tests for searching the index."""
+
+    def test_from_or_to(self, conn):
+        """Verify the prompt's contact-history query."""
+        rows = search_index.search(conn, "from:alice@example.com OR to:alice@example.com")
+        assert _ids(rows) == ["1", "3"]
+
+    def test_ranking_prefers_subject(self, conn):
+        """Verify a subject hit outranks a snippet hit."""
+        assert _ids(search_index.search(conn, "quarterly")) == ["1", "2"]
+
+    def test_date_and_flags(self, conn):
+        """Verify date and is: filters combine with text."""
+        assert _ids(search_index.search(conn, "newer_than:7d is:unread")) == ["1"]
+        assert _ids(search_index.search(conn, "older_than:30d")) == ["3"]
+
+    def test_negation(self, conn):
+        """Verify -term excludes matches."""
+        assert _ids(search_index.search(conn, "in:inbox -from:bob")) == ["1"]
+
+    def test_trash_and_spam_left_out(self, conn):
+        """Verify trashed and spam messages only match when the query asks for them."""
+        assert _ids(search_index.search(conn, "from:alice")) == ["1"]
+        assert _ids(search_index.search(conn, "is:unread")) == ["1"]
+        assert _ids(search_index.search(conn, "in:trash")) == ["4"]
+        assert _ids(search_index.search(conn, "label:spam is:unread")) == ["5"]
+        assert _ids(search_index.search(conn, "in:trash OR in:spam")) == ["4", "5"]
+
+    def test_user_label_resolved_by_name(self, conn):
+        """Verify label: looks user labels up by name."""
+        rows = search_index.search(conn, "label:food", resolve_label=lambda name: "Label_7")
+        assert _ids(rows) == ["2"]
+
+    def test_like_fallback_without_fts(self, conn):
+        """Verify the same queries work when FTS5 is unavailable."""
+        rows = search_index.search(conn, "quarterly -from:alice", fts=False)
+        assert _ids(rows) == ["2"]
+
+    def test_index_follows_updates(self, conn):
+        """Verify triggers keep the index in sync with the messages table."""
+        conn.execute("UPDATE messages SET body = 'kickoff agenda' WHERE id = '3'")
+        conn.execute("DELETE FROM messages WHERE id = '1'")
+        assert _ids(search_index.search(conn, "kickoff")) == ["3"]
+        assert _ids(search_index.search(conn, "from:alice")) == []
@@ -0,0 +1,119 @@
+"""Tests for single-flight coalescing of provider reads."""
+
+import threading
+import time
+
+import pytest
+
+from tools.single_flight import SingleFlight
+
+
+class SlowProvider:
+    """Provider stand-in whose calls take `delay` seconds and are counted."""
+
+    def __init__(self, delay=0.1, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self.inbox = "old"
+
+    def read_inbox(self, last: int = 10) -> str:
+        """Read inbox."""
+        self.calls.append(("read_inbox", last))
+        inbox = self.inbox
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("quota exceeded")
+        return f"{inbox}:{last}"
+
+    def get_today_events(self) -> str:
+        """Get today's events."""
+        self.calls.append(("get_today_events",))
+        time.sleep(self.delay)
+        return "events"
+
+    def send(self, to: str, subject: str, body: str) -> str:
+        """Send an email."""
+        self.calls.append(("send", to))
+        self.inbox = "new"
+        return "sent"
+
+
+def together(*fns):
+    """Run the functions on threads started at the same moment; returns results in order."""
+    results = [None] * len(fns)
+
+    def run(i, fn):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i, fn)) for i, fn in enumerate(fns)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+@pytest.fixture
+def flights():
+    return SingleFlight()
+
+
+class TestSingleFlight:
+    """Tests for sharing, separating and reporting calls."""
+
+    def test_identical_calls_share_one_request(self, flights):
+        """Verify four concurrent identical reads make one provider call and all get its result."""
+        tool = flights.attach(SlowProvider())
+        results = together(*[lambda: tool.read_inbox(last=10)] * 4)
+        assert results == ["old:10"] * 4
+        assert tool.calls == [("read_inbox", 10)]
+        assert flights.stats()["coalesced"] == 3
+        assert flights.stats()["by_method"] == {"read_inbox": 3}
+
+    def test_defaults_filled_in(self, flights):
+        """Verify read_inbox() and read_inbox(last=10) count as the same call."""
+        tool = flights.attach(SlowProvider())
+        together(lambda: tool.read_inbox(), lambda: tool.read_inbox(last=10), lambda: tool.read_inbox(10))
+        assert len(tool.calls) == 1
+
+    def test_different_calls_not_shared(self, flights):
+        """Verify other arguments or methods get their own request."""
+        tool = flights.attach(SlowProvider())
+        results = together(lambda: tool.read_inbox(last=10), lambda: tool.read_inbox(last=5),
+                           lambda: tool.get_today_events())
+        assert results == ["old:10", "old:5", "events"]
+        assert len(tool.calls) == 3
+        assert flights.stats()["coalesced"] == 0
+
+    def test_sequential_calls_not_shared(self, flights):
+        """Verify a call after the flight finished goes to the provider again (that's the result cache's job)."""
+        tool = flights.attach(SlowProvider(delay=0))
+        tool.read_inbox()
+        tool.read_inbox()
+        assert len(tool.calls) == 2
+
+    def test_error_shared_and_cleared(self, flights):
+        """Verify followers get the leader's exception and the next call tries again."""
+        tool = flights.attach(SlowProvider(fail=True))
+        results = together(lambda: tool.read_inbox(), lambda: tool.read_inbox())
+        assert all(isinstance(r, ConnectionError) for r in results)
+        assert len(tool.calls) == 1
+        tool.fail = False
+        assert tool.read_inbox() == "old:10"
+
+    def test_read_after_mutation_starts_new_flight(self, flights):
+        """Verify a read issued after a send doesn't join a listing fetched before it."""
+        tool = flights.attach(SlowProvider(delay=0.2))
+
+        def send_then_read():
+            time.sleep(0.05)
+            tool.send("a@b.c", "s", "b")
+            return tool.read_inbox()
+
+        results = together(lambda: tool.read_inbox(), send_then_read)
+        assert results == ["old:10", "new:10"]
+        assert [c[0] for c in tool.calls].count("read_inbox") == 2
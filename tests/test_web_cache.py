@@ -0,0 +1,134 @@
+"""Tests for the WebFetch domain-analysis cache."""
+
+import socket
+
+import pytest
+
+from tools.web_cache import DomainCache, registrable_domain
+
+
+class StatusError(Exception):
+    """HTTP error carrying a response status, like httpx.HTTPStatusError."""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type("Response", (), {"status_code": status_code, "headers": {}})()
+
+
+def _dns_failure():
+    """A ConnectError raised from socket.gaierror, the way httpx reports an unknown host."""
+    try:
+        try:
+            raise socket.gaierror(-2, "Name or service not known")
+        except socket.gaierror as e:
+            raise ConnectionError("[Errno -2] Name or service not known") from e
+    except ConnectionError as e:
+        return e
+
+
+class FakeWeb:
+    """WebFetch stand-in that counts fetches."""
+
+    def __init__(self):
+        self.fetched = []
+        self.fail = {}  # url -> exception to raise
+
+    def analyze_page(self, url: str) -> str:
+        """Analyze what a webpage/company does."""
+        self.fetched.append(url)
+        if url in self.fail:
+            raise self.fail[url]
+        return f"{url} makes widgets"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DomainCache(db_path=str(tmp_path / "web_cache.db"))
+
+
+@pytest.fixture
+def web(cache):
+    return cache.attach(FakeWeb())
+
+
+class TestRegistrableDomain:
+    """Tests for the cache key."""
+
+    @pytest.mark.parametrize("url, domain", [
+        ("acme.com", "acme.com"),
+        ("https://www.Acme.com/", "acme.com"),
+        ("mail.acme.com", "acme.com"),
+        ("https://shop.acme.co.uk", "acme.co.uk"),
+        ("acme.io:8080", "acme.io"),
+    ])
+    def test_site_roots(self, url, domain):
+        """Verify hosts reduce to their registrable domain."""
+        assert registrable_domain(url) == domain
+
+    @pytest.mark.parametrize("url", ["https://acme.com/pricing", "acme.com/?q=1", "localhost", ""])
+    def test_not_cacheable(self, url):
+        """Verify pages and bare hostnames are not keyed by domain."""
+        assert registrable_domain(url) is None
+
+
+class TestCache:
+    """Tests for hits, expiry, failures and eviction."""
+
+    def test_repeat_lookup_not_fetched(self, web, cache, tmp_path):
+        """Verify a domain analyzed once is served from disk, across instances."""
+        assert web.analyze_page("acme.com") == "acme.com makes widgets"
+        assert web.analyze_page("https://www.acme.com") == "acme.com makes widgets"
+        again = DomainCache(db_path=str(tmp_path / "web_cache.db")).attach(FakeWeb())
+        assert again.analyze_page("acme.com") == "acme.com makes widgets"
+        assert web.fetched == ["acme.com"] and again.fetched == []
+
+    def test_pages_bypass_cache(self, web):
+        """Verify URLs with a path are always fetched."""
+        web.analyze_page("https://acme.com/pricing")
+        web.analyze_page("https://acme.com/pricing")
+        assert len(web.fetched) == 2
+
+    def test_expired_entry_refetched(self, web, cache):
+        """Verify entries older than the TTL are fetched again."""
+        web.analyze_page("acme.com")
+        cache.ttl = -1
+        web.analyze_page("acme.com")
+        assert len(web.fetched) == 2
+
+    @pytest.mark.parametrize("error", [_dns_failure(), StatusError(404)])
+    def test_failures_cached(self, web, cache, error):
+        """Verify a definitively failed domain is not retried until the negative TTL passes."""
+        web.fail["dead.com"] = error
+        for _ in range(2):
+            with pytest.raises(Exception):
+                web.analyze_page("dead.com")
+        assert web.fetched == ["dead.com"]
+        cache.negative_ttl = -1
+        with pytest.raises(type(error)):
+            web.analyze_page("dead.com")
+        assert len(web.fetched) == 2
+
+    @pytest.mark.parametrize("error", [TimeoutError("timed out"), StatusError(429), StatusError(503),
+                                       RuntimeError("LLM request failed")])
+    def test_transient_failures_not_cached(self, web, cache, error):
+        """Verify timeouts, throttling, server and LLM errors are raised and retried next time."""
+        web.fail["flaky.com"] = error
+        with pytest.raises(type(error)):
+            web.analyze_page("flaky.com")
+        del web.fail["flaky.com"]
+        assert web.analyze_page("flaky.com") == "flaky.com makes widgets"
+        assert cache.get("flaky.com") == (True, "flaky.com makes widgets")
+
+    def test_lru_eviction(self, web, cache):
+        """Verify the least recently used domain is evicted at the size bound."""
+        cache.max_entries = 2
+        web.analyze_page("a.com")
+        web.analyze_page("b.com")
+        web.analyze_page("a.com")  # a is now more recent than b
+        web.analyze_page("c.com")
+        assert cache.count() == 2
+        assert cache.get("a.com") and cache.get("b.com") is None
+
+    def test_schema_unchanged(self, web):
+        """Verify the wrapped method keeps its docstring for the tool schema."""
+        assert web.analyze_page.__doc__ == "Analyze what a webpage/company does."
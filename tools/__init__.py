@@ -0,0 +1,28 @@
+"""
+Email Agent tool infrastructure.
+
+Structure:
+- lazy.py      - Stand-in that builds agents/SDK objects on first use
+- wrapping.py  - Swap methods on provider tool instances without changing their tool schema
+- mailbox.py   - Local SQLite mirror of the linked mailbox with delta sync
+- search_index.py - FTS5 index and Gmail query translator behind mailbox search
+- contacts.py  - Indexed SQLite contact store behind the CRM tools, exported to contacts.csv
+- memory_store.py - Append-only keyed log behind the Memory tool methods
+- crm_init.py  - Parallel CRM init: extract once, analyze shards on a worker pool, merge once
+- contact_rules.py - Rule-based first pass that categorizes obvious contacts without the LLM
+- web_cache.py - Persistent per-domain cache behind WebFetch.analyze_page
+- contact_scan.py - Resumable, page-at-a-time contact extraction behind get_all_contacts/sync_contacts
+- contact_stats.py - Incremental per-contact counters and decayed relationship strength
+- result_cache.py - TTL cache of provider read results, invalidated by the mutations that affect them
+- email_bodies.py - get_email_bodies: many bodies per call via Gmail batch HTTP or Graph $batch
+- parallel_calls.py - Runs the independent read-only tool calls of a model turn concurrently
+- contact_context.py - One-call context pack for a contact (CRM row, notes, meetings, recent mail) within a token budget
+- prompt_cache.py - Cache breakpoints on LLM requests so tool-loop iterations reuse the prompt prefix
+- compact_prompt.py - Compact system prompt variant (no worked examples) generated from the full one
+- briefing_cache.py - Last /today briefing, reused for unchanged mail and extended with only the new messages
+- precompute.py - Background worker that precomputes /today and /unanswered, with a shared result store
+- agent_pool.py - Bounded pool of main agents for host mode, one turn per agent at a time
+- admission.py - Concurrency limit and per-client fair, bounded queue for host turns, with wait metrics
+- single_flight.py - Identical provider reads in flight at the same moment share one request
+- rate_limit.py - Process-wide, quota-weighted token buckets for provider API requests with Retry-After backoff
+"""
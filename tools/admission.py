@@ -0,0 +1,192 @@
+"""
+Admission control for the hosted agent.
+
+Without a limit, a burst of requests becomes a burst of simultaneous LLM and
+Gmail calls, the providers start rate limiting, and every request slows
+down. AdmissionControl runs at most `limit` turns at once and queues the
+rest:
+
+- the queue is bounded (`max_queue` in total, `max_per_client` per client);
+  a request that doesn't fit is rejected at once
+- clients take turns: when a slot frees up, the next request comes from the
+  client after the last one served, so one busy client can't starve others
+- a request that waits longer than `max_wait` is rejected
+- a rejection says when to retry, estimated from recent turn times and the
+  queue ahead
+
+Rejections raise Busy, a ValueError, because host() returns a ValueError's
+message to the client (HTTP 400) instead of failing with a server error.
+metrics() reports running and queued turns, rejections and recent wait
+times; the host serves them at GET /admin/queue.
+
+In host mode the agent pool calls acquire() and release() around each
+turn, before the request takes an agent, so a queued request holds no
+agent. host() only hands the requester to agent.input(), after an agent is
+taken, so those requests queue first come, first served and without the
+per-client cap; the cap and round-robin apply where the requester is
+known, through attach().
+
+Usage:
+    from tools.admission import AdmissionControl
+
+    admission = AdmissionControl(limit=8, max_queue=32, max_wait=30)
+    AgentPool(factory, max_size=8, admission=admission)   # host turns wait their turn
+    admission.attach(agent)   # or: agent.input() waits its turn, per requester
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+
+from .wrapping import wrap_method
+
+
+class Busy(ValueError):
+    """The request was not admitted; retry after `retry_after` seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"Server busy ({reason}). Retry after {retry_after}s.")
+
+
+class _Ticket:
+    __slots__ = ("granted",)
+
+    def __init__(self):
+        self.granted = False
+
+
+class AdmissionControl:
+    """Bounded, per-client fair queue in front of agent turns."""
+
+    def __init__(self, limit: int = 8, max_queue: int = 32, max_wait: float = 30,
+                 max_per_client: int = None, window: int = 500):
+        self.limit = max(1, limit)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.max_per_client = max_per_client or max(1, max_queue // 4)
+        self.running = 0
+        self.admitted = self.rejected_full = self.rejected_deadline = 0
+        self._queues = OrderedDict()  # client -> deque of tickets, next client to serve first
+        self._waits = deque(maxlen=window)  # seconds queued, recent admissions
+        self._turn_seconds = None  # moving average of turn length
+        self._cond = threading.Condition()
+
+    # === Admission ===
+
+    def acquire(self, client: str = None):
+        """Wait for a slot. Raises Busy if the queue is full or the wait runs past max_wait.
+
+        client None (not known) queues without the per-client cap.
+        """
+        started = time.monotonic()
+        with self._cond:
+            if self.running < self.limit and not self._queues:
+                self._admit(0.0)
+                return
+            queued = self.queued
+            if queued >= self.max_queue:
+                self.rejected_full += 1
+                raise Busy(f"{queued} requests queued", self.retry_after())
+            if client is not None and len(self._queues.get(client, ())) >= self.max_per_client:
+                self.rejected_full += 1
+                raise Busy(f"{self.max_per_client} of your requests already queued", self.retry_after())
+
+            ticket = _Ticket()
+            self._queues.setdefault(client, deque()).append(ticket)
+            deadline = started + self.max_wait
+            while not ticket.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._withdraw(client, ticket)
+                    self.rejected_deadline += 1
+                    raise Busy(f"waited {self.max_wait:.0f}s", self.retry_after())
+                self._cond.wait(remaining)
+            self._admit(time.monotonic() - started, counted=True)
+
+    def release(self, seconds: float = None):
+        """Free a slot (seconds: how long the turn ran, for retry estimates)."""
+        with self._cond:
+            self.running -= 1
+            if seconds is not None:
+                self._turn_seconds = seconds if self._turn_seconds is None else 0.8 * self._turn_seconds + 0.2 * seconds
+            self._grant()
+            self._cond.notify_all()
+
+    def retry_after(self) -> int:
+        """Seconds until a new request would likely get a slot."""
+        turn = self._turn_seconds or 5.0
+        return max(1, math.ceil(turn * (self.queued + 1) / self.limit))
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _admit(self, waited: float, counted: bool = False):
+        if not counted:
+            self.running += 1  # granted tickets were counted by _grant
+        self.admitted += 1
+        self._waits.append(waited)
+
+    def _grant(self):
+        """Hand free slots to queued requests, one client after another."""
+        while self.running < self.limit and self._queues:
+            client, queue = next(iter(self._queues.items()))
+            queue.popleft().granted = True
+            self.running += 1
+            if queue:
+                self._queues.move_to_end(client)
+            else:
+                del self._queues[client]
+
+    def _withdraw(self, client: str, ticket: _Ticket):
+        queue = self._queues.get(client)
+        if queue and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[client]
+
+    # === Integration ===
+
+    def attach(self, agent):
+        """Make agent.input() wait for admission; the client is the session's requester."""
+        def around(original, prompt, *args, **kwargs):
+            session = kwargs.get("session") or {}
+            client = (session.get("requester") or {}).get("address") or "anonymous"
+            self.acquire(client)
+            started = time.monotonic()
+            try:
+                return original(prompt, *args, **kwargs)
+            finally:
+                self.release(time.monotonic() - started)
+
+        wrap_method(agent, "input", around)
+        agent.admission = self
+        return agent
+
+    def metrics(self) -> dict:
+        with self._cond:
+            waits = sorted(self._waits)
+            by_client = {client: len(q) for client, q in self._queues.items()}
+            return {
+                "running": self.running,
+                "limit": self.limit,
+                "queued": sum(by_client.values()),
+                "max_queue": self.max_queue,
+                "queued_by_client": by_client,
+                "admitted": self.admitted,
+                "rejected_full": self.rejected_full,
+                "rejected_deadline": self.rejected_deadline,
+                "wait_p50": round(_percentile(waits, 0.5), 3),
+                "wait_p95": round(_percentile(waits, 0.95), 3),
+                "wait_max": round(waits[-1], 3) if waits else 0.0,
+                "turn_avg": round(self._turn_seconds or 0.0, 3),
+                "retry_after": self.retry_after(),
+            }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * q))]
@@ -0,0 +1,194 @@
+"""
+Pool of agent instances for host mode.
+
+host(agent) shares one Agent, so it runs one turn at a time and concurrent
+sessions queue behind each other. host(factory) builds a new Agent for every
+request. AgentPool sits in between: it is the factory host() calls, and it
+hands each request an idle agent from a bounded pool, building one only
+when every pooled agent is busy and the pool is below `max_size`.
+
+host() holds an agent's `_host_turn_lock` for the whole turn. Each pooled
+agent gets a lease object in that slot, so acquiring it marks the agent busy
+and releasing it puts the agent back. Conversation state comes from the
+request's session on every turn, so sessions stay isolated as long as one
+agent runs one turn at a time, which the lease guarantees.
+
+- at most `max_size` agents; past that, requests wait for the least
+  loaded agent
+- agents idle for more than `idle_timeout` seconds are dropped (down to
+  `min_size`)
+- host() also calls the factory outside turns (startup metadata, admin
+  views); such claims lapse after CLAIM_TTL seconds
+- with an AdmissionControl, a turn waits in its queue before it takes its
+  agent's lease, so waiting requests don't occupy agents and the pool
+  stays at `max_size` (the admission limit)
+
+The pool depends on host() taking `_host_turn_lock` around every turn, a
+private detail of connectonion; check_host_support() fails loudly if the
+installed version no longer does.
+
+Usage:
+    from tools.agent_pool import AgentPool
+
+    host(AgentPool(build_agent, max_size=8, admission=AdmissionControl(limit=8)), trust="strict")
+"""
+
+import threading
+import time
+
+
+CLAIM_TTL = 10  # seconds a handed-out agent is reserved for the turn that asked for it
+
+
+class _Lease:
+    """Stands in for an agent's _host_turn_lock: held while the agent runs a turn."""
+
+    def __init__(self, pool, slot):
+        self._pool = pool
+        self._slot = slot
+        self._owner = None  # thread holding the lease
+        self._since = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        """Wait for admission (may raise Busy), then for the agent."""
+        admission = self._pool.admission
+        if admission is not None:
+            admission.acquire()
+        started = time.monotonic()
+        if not self._slot.turn.acquire(blocking, timeout):
+            if admission is not None:
+                admission.release()
+            return False
+        self._owner, self._since = threading.get_ident(), time.monotonic()
+        self._pool._started(self._slot, self._since - started)
+        return True
+
+    def release(self):
+        # host() releases in a finally, also after an acquire that raised Busy
+        if self._owner != threading.get_ident():
+            return
+        seconds = time.monotonic() - self._since
+        self._owner = None
+        self._pool._finished(self._slot)
+        self._slot.turn.release()
+        if self._pool.admission is not None:
+            self._pool.admission.release(seconds)
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class _Slot:
+    def __init__(self, agent):
+        self.agent = agent
+        self.turn = threading.Lock()
+        self.claims = []  # times handed out and not yet started
+        self.busy = False
+        self.last_used = time.monotonic()
+
+    @property
+    def load(self) -> int:
+        return len(self.claims) + self.busy
+
+
+class AgentPool:
+    """Bounded, self-trimming pool of agents; call it to get one for a request."""
+
+    def __init__(self, factory, max_size: int = 8, min_size: int = 1, idle_timeout: float = 600,
+                 admission=None):
+        self.factory = factory
+        self.admission = admission
+        self.max_size = max(1, max_size)
+        self.min_size = min(max(0, min_size), self.max_size)
+        self.idle_timeout = idle_timeout
+        self.created = self.evicted = self.waits = 0
+        self.wait_seconds = 0.0
+        self._slots = []
+        self._building = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        """An agent for one request: an idle one, a new one, or the least loaded one."""
+        with self._lock:
+            self._expire_claims()
+            self._evict_idle()
+            slot = next((s for s in self._slots if s.load == 0), None)
+            if slot is None and len(self._slots) + self._building < self.max_size:
+                self._building += 1
+            elif slot is None:
+                slot = min(self._slots, key=lambda s: (s.load, s.last_used))
+            if slot is not None:
+                slot.claims.append(time.monotonic())
+                return slot.agent
+
+        try:
+            agent = self.factory()  # outside the lock: building an agent takes a while
+        except BaseException:
+            with self._lock:
+                self._building -= 1
+            raise
+        slot = _Slot(agent)
+        agent._host_turn_lock = _Lease(self, slot)
+        with self._lock:
+            self._building -= 1
+            slot.claims.append(time.monotonic())
+            self._slots.append(slot)
+            self.created += 1
+        return agent
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._slots),
+                "busy": sum(s.busy for s in self._slots),
+                "created": self.created,
+                "evicted": self.evicted,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+    # === Lease callbacks ===
+
+    def _started(self, slot, waited: float):
+        with self._lock:
+            if slot.claims:
+                slot.claims.pop(0)
+            slot.busy = True
+            if waited > 0.001:
+                self.waits += 1
+                self.wait_seconds += waited
+
+    def _finished(self, slot):
+        with self._lock:
+            slot.busy = False
+            slot.last_used = time.monotonic()
+
+    # === Housekeeping (called with the lock held) ===
+
+    def _expire_claims(self):
+        cutoff = time.monotonic() - CLAIM_TTL
+        for slot in self._slots:
+            slot.claims = [t for t in slot.claims if t > cutoff]
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        idle = [s for s in self._slots if s.load == 0 and s.last_used < cutoff]
+        for slot in idle[:max(0, len(self._slots) - self.min_size)]:
+            self._slots.remove(slot)
+            self.evicted += 1
+
+
+def check_host_support():
+    """Raise RuntimeError unless connectonion's host() takes an agent's _host_turn_lock around each turn."""
+    try:
+        from connectonion.network.host.session import turn
+    except ImportError:
+        turn = None
+    code = getattr(getattr(turn, "input_handler", None), "__code__", None)
+    if code is None or "_host_turn_lock" not in code.co_consts:
+        raise RuntimeError(
+            "The installed connectonion host() no longer holds an agent's _host_turn_lock during a turn, "
+            "which AgentPool and admission control rely on. Set HOST_POOL_SIZE=1 and ADMISSION=false "
+            "to serve a single agent.")
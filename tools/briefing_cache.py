@@ -0,0 +1,158 @@
+"""
+Memoized /today briefing, keyed on the exact set of messages it covers.
+
+/today lists the last day's mail and has the LLM sort it into priority
+sections. Run again a minute later, nothing has changed but the whole
+briefing is regenerated. BriefingCache keeps the last briefing in
+data/today_briefing.json with a fingerprint of its input (message id plus
+read/label state per message):
+
+- same messages, same state: the stored briefing is returned as is
+- only new messages (at most MAX_NEW): just those are classified and their
+  lines merged into the stored briefing's priority sections
+- anything else (a message read, relabelled or gone, a new day, a burst of
+  new mail): the briefing is rebuilt from scratch
+
+Usage:
+    from tools.briefing_cache import BriefingCache
+
+    briefings = BriefingCache()
+    briefings.brief(listing, day="2026/10/17", run=lambda emails: llm_briefing(emails))
+"""
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+
+MAX_NEW = 10  # more new messages than this and a full rebuild is cheaper to trust
+
+ENTRY = re.compile(r"^\s*\d+\.\s*(\[UNREAD\])?\s*From:", re.MULTILINE)
+ID = re.compile(r"^\s*ID:\s*(\S+)", re.MULTILINE)
+FROM = re.compile(r"From:\s*(.*)")
+ITEM = re.compile(r"^\s*\d+\.\s+(.*)$")
+
+# Priority sections of commands/today.md, in order, keyed by their marker
+SECTIONS = {
+    "🔴": "## 🔴 High Priority (Urgent - needs immediate action)",
+    "🟡": "## 🟡 Medium Priority (Action needed soon)",
+    "🟢": "## 🟢 Low Priority (Can wait)",
+    "⚪": "## ⚪ Automated/FYI (No action needed)",
+}
+
+
+def parse_entries(listing: str) -> dict[str, dict]:
+    """Entries of a search_emails listing by message id: {"text", "unread", "sender"}, in listed order."""
+    starts = [m.start() for m in ENTRY.finditer(listing)]
+    entries = {}
+    for start, end in zip(starts, starts[1:] + [len(listing)]):
+        text = listing[start:end].strip()
+        match = ID.search(text)
+        if match:
+            entries[match.group(1)] = {
+                "text": text,
+                "unread": "[UNREAD]" in text.splitlines()[0],
+                "sender": FROM.search(text).group(1).strip(),
+            }
+    return entries
+
+
+def split_sections(briefing: str) -> tuple[list[str], dict[str, list[str]]]:
+    """(lines before the first priority section, numbered item texts per section marker)."""
+    head, items, current = [], {}, None
+    for line in briefing.splitlines():
+        if line.startswith("## "):
+            current = next((marker for marker in SECTIONS if marker in line), None)
+            if current is not None:
+                items.setdefault(current, [])
+                continue
+        if current is None:
+            head.append(line)
+        else:
+            match = ITEM.match(line)
+            if match:
+                items[current].append(match.group(1))
+    return head, items
+
+
+def merge(previous: str, update: str, entries: dict[str, dict]) -> str:
+    """`previous` with the priority items of `update` appended, renumbered, and the summary recounted."""
+    head, items = split_sections(previous)
+    for marker, lines in split_sections(update)[1].items():
+        items.setdefault(marker, []).extend(lines)
+
+    senders = {e["sender"].lower() for e in entries.values()}
+    summary = f"{len(entries)} emails from {len(senders)} senders"
+    out, in_summary = [], False
+    for line in head:
+        if line.startswith("## "):
+            in_summary = "summary" in line.lower()
+        elif in_summary and line.strip():
+            line, in_summary = summary, False
+        out.append(line)
+    while out and not out[-1].strip():
+        out.pop()
+    for marker, heading in SECTIONS.items():
+        if items.get(marker):
+            out += ["", heading] + [f"{i}. {text}" for i, text in enumerate(items[marker], 1)]
+    return "\n".join(out).strip() + "\n"
+
+
+class BriefingCache:
+    """Last /today briefing and the message states it was built from."""
+
+    def __init__(self, path: str = "data/today_briefing.json", max_new: int = MAX_NEW):
+        self.path = Path(path)
+        self.max_new = max_new
+        self.hits = self.merges = self.rebuilds = 0
+        self._lock = threading.Lock()
+
+    def brief(self, listing: str, day: str, run, labels_for=None) -> str:
+        """Briefing for `listing` (search_emails output for `day`).
+
+        `run(listing)` produces a briefing for a listing with the LLM; it is
+        called with the whole listing or only the new messages.
+        `labels_for(ids)` returns each message's labels (the mailbox mirror's
+        Mailbox.labels_for), when available.
+        """
+        entries = parse_entries(listing)
+        labels = labels_for(list(entries)) if labels_for and entries else {}
+        states = {i: f"{'unread' if e['unread'] else 'read'}|{labels.get(i, '')}" for i, e in entries.items()}
+
+        with self._lock:
+            stored = self.load()
+            if stored and stored["day"] == day and stored["states"] == states:
+                self.hits += 1
+                return stored["briefing"]
+
+            new = [i for i in states if i not in (stored or {}).get("states", {})]
+            unchanged = stored and stored["day"] == day and all(
+                states.get(i) == state for i, state in stored["states"].items()
+            )
+            if unchanged and entries and len(new) <= self.max_new:
+                update = run(f"Found {len(new)} email(s):\n\n" + "\n\n".join(entries[i]["text"] for i in new))
+                briefing = merge(stored["briefing"], update, entries)
+                self.merges += 1
+            else:
+                briefing = run(listing)
+                self.rebuilds += 1
+            self.save({"day": day, "states": states, "briefing": briefing})
+        return briefing
+
+    def load(self) -> dict | None:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save(self, data: dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        """Forget the stored briefing (the next /today rebuilds it)."""
+        self.path.unlink(missing_ok=True)
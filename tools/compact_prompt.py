@@ -0,0 +1,65 @@
+"""
+Compact variant of a system prompt, generated from the full one.
+
+The main prompt is over 500 lines, and most of it is worked examples. Those
+help an open-ended conversation but cost every request the same input
+tokens and time to first token. compact() keeps the instructions and tool
+reference, and drops:
+
+- `##` sections whose title mentions examples
+- fenced code blocks longer than MAX_BLOCK_LINES
+- `---` rules and repeated blank lines
+
+The variant is written next to the generated-data files and rebuilt
+whenever the source prompt changes, so it never drifts from the full
+prompt.
+
+Usage:
+    from tools.compact_prompt import compact_prompt_file
+
+    Agent(system_prompt=compact_prompt_file("prompts/gmail_agent.md"), ...)
+"""
+
+import re
+from pathlib import Path
+
+
+MAX_BLOCK_LINES = 8
+DROP_SECTIONS = re.compile(r"example", re.IGNORECASE)
+
+
+def compact(text: str) -> str:
+    """The prompt without examples, long code blocks and decoration."""
+    out, skipping, block = [], False, None
+    for line in text.splitlines():
+        if block is not None:
+            block.append(line)
+            if line.strip().startswith("```"):
+                if len(block) - 2 <= MAX_BLOCK_LINES:
+                    out.extend(block)
+                block = None
+            continue
+        if line.startswith("## ") or line.startswith("# "):
+            skipping = bool(DROP_SECTIONS.search(line))
+        if skipping:
+            continue
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            block = [line]
+            continue
+        if stripped in ("---", "***"):
+            continue
+        if not stripped and (not out or not out[-1].strip()):
+            continue
+        out.append(line.rstrip())
+    return "\n".join(out).strip() + "\n"
+
+
+def compact_prompt_file(source: str, out_dir: str = "data/prompts") -> str:
+    """Path of the compact variant of `source`, regenerated when the source is newer."""
+    source_path = Path(source)
+    target = Path(out_dir) / f"{source_path.stem}.compact.md"
+    if not target.exists() or target.stat().st_mtime < source_path.stat().st_mtime:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(compact(source_path.read_text(encoding="utf-8")), encoding="utf-8")
+    return str(target)
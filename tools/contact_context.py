@@ -0,0 +1,166 @@
+"""
+One-call context pack for a contact.
+
+Before scheduling or drafting, the prompts have the agent search recent mail
+with the person, read their memory notes, often open the latest email and
+check the calendar: three to five iterations before it writes anything.
+ContactContext gathers all of it concurrently and returns one compact block:
+
+- the CRM row (contact store, or contacts.csv) and relationship counters
+- memory notes (contact:<email>)
+- upcoming meetings they are invited to
+- recent emails with them, one line each, and the latest one's body
+
+Sections are filled in that order until the token budget is used up; the
+latest body gets whatever is left. A source that fails or times out is
+reported as unavailable instead of failing the pack.
+
+Usage:
+    from tools.contact_context import ContactContext
+
+    pack = ContactContext(gmail, calendar=calendar, memory=memory)
+    pack.build("ann@acme.com", max_tokens=1500)
+"""
+
+import csv
+import re
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+from .contacts import FIELDS
+
+
+CHARS_PER_TOKEN = 4  # rough size of a token in English text
+RECENT_EMAILS = 8
+MIN_BODY_CHARS = 200
+
+FIELD = re.compile(r"^\s*(?:\d+\.\s*)?(?:\[UNREAD\]\s*)?(From|Subject|Date|Preview|ID):\s*(.*)$")
+
+
+class ContactContext:
+    """Gathers what is known about one contact, concurrently, within a budget."""
+
+    def __init__(self, email_tool, calendar=None, memory=None, timeout: float = 20):
+        self.email_tool = email_tool
+        self.calendar = calendar
+        self.memory = memory
+        self.timeout = timeout
+
+    def build(self, email: str, max_tokens: int = 1500) -> str:
+        email = email.strip().strip("<>")
+        if "@" not in email:
+            return f"Not an email address: {email}"
+
+        sources = {
+            "crm": lambda: self._crm(email),
+            "notes": lambda: self._notes(email),
+            "meetings": lambda: self._meetings(email),
+            "emails": lambda: self._emails(email),
+        }
+        pool = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="context")
+        futures = {name: pool.submit(fn) for name, fn in sources.items()}
+        # One deadline for all sources, and don't wait for a hung one on the way out
+        done, _ = wait(futures.values(), timeout=self.timeout)
+        pool.shutdown(wait=False, cancel_futures=True)
+        results = {}
+        for name, future in futures.items():
+            if future not in done:
+                results[name] = "(unavailable: timed out)"
+            elif future.exception() is not None:
+                results[name] = f"(unavailable: {type(future.exception()).__name__})"
+            else:
+                results[name] = future.result()
+
+        recent, latest = results["emails"] if isinstance(results["emails"], tuple) else (results["emails"], "")
+        parts = [f"# Context for {email}"]
+        budget = max_tokens * CHARS_PER_TOKEN - len(parts[0])
+        for title, text in (("CRM", results["crm"]), ("Notes", results["notes"]),
+                            ("Upcoming meetings together", results["meetings"]),
+                            ("Recent emails", recent)):
+            # Keep room for the latest body (and the newline before each section)
+            part = _section(title, text, budget - 1 - (MIN_BODY_CHARS if latest else 0))
+            if part:
+                parts.append(part)
+                budget -= len(part) + 1
+        part = _section("Latest email", latest, budget - 1)
+        if part:
+            parts.append(part)
+        return "\n".join(parts)
+
+    # === Sources ===
+
+    def _crm(self, email: str) -> str:
+        row = None
+        store = getattr(self.email_tool, "contacts", None)
+        if store is not None:
+            row = store.get(email)
+        else:
+            path = getattr(self.email_tool, "contacts_csv", None)
+            if path and Path(path).exists():
+                with open(path, newline="", encoding="utf-8") as f:
+                    row = next((r for r in csv.DictReader(f) if (r.get("email") or "").lower() == email.lower()), None)
+        lines = []
+        if row:
+            lines.append(" | ".join(f"{field}: {row[field]}" for field in FIELDS[1:] if row.get(field)))
+        stats = getattr(self.email_tool, "contact_stats", None)
+        if stats is not None:
+            counts = stats.get(email)
+            if counts:
+                lines.append(f"{counts['frequency']} threads, {counts['messages']} messages ({counts['sent']} sent), "
+                             f"strength {counts['strength']}")
+        return "\n".join(lines) or "Not in contacts."
+
+    def _notes(self, email: str) -> str:
+        if self.memory is None:
+            return ""
+        notes = str(self.memory.read_memory(f"contact:{email}"))
+        return "" if notes.startswith("Memory not found") else notes
+
+    def _meetings(self, email: str) -> str:
+        if self.calendar is None or not hasattr(self.calendar, "get_upcoming_meetings"):
+            return ""
+        listing = str(self.calendar.get_upcoming_meetings(days_ahead=14))
+        blocks = [b.strip() for b in re.split(r"\n\s*\n", listing) if email.lower() in b.lower()]
+        return "\n".join(blocks) or "None in the next 14 days."
+
+    def _emails(self, email: str) -> tuple[str, str]:
+        """(one line per recent email, body of the latest one)."""
+        listing = str(self.email_tool.search_emails(query=f"from:{email} OR to:{email}", max_results=RECENT_EMAILS))
+        emails = _parse_listing(listing)
+        if not emails:
+            return listing.strip(), ""
+        lines = [f"- {e.get('Date', '')} | {e.get('From', '')} | {e.get('Subject', '')}"
+                 + (f" | {e['Preview'][:100].rstrip('. ')}" if e.get('Preview') else "")
+                 for e in emails]
+        latest = ""
+        if emails[0].get("ID"):
+            latest = str(self.email_tool.get_email_body(emails[0]["ID"]))
+        return "\n".join(lines), latest
+
+
+def _parse_listing(listing: str) -> list[dict]:
+    """Fields of each email in a read_inbox/search_emails listing, in listed order."""
+    emails, current = [], None
+    for line in listing.splitlines():
+        match = FIELD.match(line)
+        if not match:
+            continue
+        name, value = match.groups()
+        if name == "From":
+            current = {}
+            emails.append(current)
+        if current is not None:
+            current[name] = value.strip()
+    return emails
+
+
+def _section(title: str, text: str, chars: int) -> str:
+    """A titled section of at most `chars` characters ('' when empty or out of budget)."""
+    text = (text or "").strip()
+    heading = f"## {title}\n"
+    if not text or chars - len(heading) < 40:
+        return ""
+    room = chars - len(heading)
+    if len(text) > room:
+        text = text[:room - 2].rstrip() + " …"
+    return heading + text
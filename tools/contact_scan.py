@@ -0,0 +1,342 @@
+"""
+Resumable, streaming contact extraction for Gmail.
+
+Gmail's get_all_contacts and sync_contacts list every message id first,
+then fetch headers one message at a time, and only write anything when the
+whole scan is done: an interrupted `email sync --max 20000` loses all of it.
+
+ContactScan pages through the mailbox instead. For each page of ids it
+fetches headers with one batch request, folds senders/recipients into the
+running contact counts, appends the page's rows to emails.csv.partial and
+saves a checkpoint (data/contact_scan.json). A scan that is interrupted
+resumes from the last saved page the next time it runs with the same
+exclusions. Progress is reported per page to an optional callback.
+
+Once attached, get_all_contacts and sync_contacts run on top of the scan
+and keep their CSV formats and replies.
+
+Usage:
+    from tools.contact_scan import ContactScan
+
+    scan = ContactScan.for_tool(gmail)          # None for providers without the Gmail API
+    scan.attach(gmail)
+    with scan.reporting(lambda text: status.update(text)):
+        gmail.sync_contacts(max_emails=20000)
+"""
+
+import csv
+import json
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+
+from .mailbox import BATCH_SIZE, gmail_record
+from .wrapping import wrap_method, call_arguments
+
+
+CONTACT_FIELDS = ['email', 'name', 'frequency', 'last_contact', 'type', 'company', 'relationship',
+                  'priority', 'deal', 'next_contact_date', 'tags', 'notes']
+EMAIL_FIELDS = ['id', 'thread_id', 'from_email', 'to_email', 'subject', 'date', 'snippet']
+
+# Same filter as Gmail._scan_contacts
+AUTOMATED_PATTERNS = [
+    'mailer-daemon', 'postmaster@', 'bounce@', 'bounces@',
+    'unsubscribe', 'unsub-', 'optout@', 'opt-out@',
+    'noreply@', 'no-reply@', 'donotreply@', 'do-not-reply@',
+    'mailchimp.com', 'sendgrid.net', 'amazonses.com', 'mailjet.com',
+    'customer.io', 'responsys', 'oraclecloud.com',
+]
+FREEMAIL = ['gmail.com', 'hotmail.com', 'outlook.com', 'yahoo.com']
+ADDRESS = re.compile(r'<([^>]+)>|([^\s<>,]+@[^\s<>,]+)')
+
+PAGE_SIZE = 100
+
+
+class ContactScan:
+    """Page-at-a-time contact aggregation with a checkpoint after every page."""
+
+    def __init__(self, gmail, checkpoint_path: str = "data/contact_scan.json"):
+        self.gmail = gmail
+        self.checkpoint_path = Path(checkpoint_path)
+        self._progress = None
+        self._subscribers = []
+
+    @classmethod
+    def for_tool(cls, email_tool, **kwargs):
+        """A scan for a Gmail tool instance (None for other providers)."""
+        if hasattr(email_tool, "_get_service") and hasattr(email_tool, "get_all_contacts"):
+            return cls(email_tool, **kwargs)
+        return None
+
+    def subscribe(self, callback):
+        """Call callback(records) with each scanned page, as mailbox mirror records."""
+        self._subscribers.append(callback)
+
+    @contextmanager
+    def reporting(self, progress):
+        """Send progress text to progress(text) while the block runs."""
+        previous, self._progress = self._progress, progress
+        try:
+            yield self
+        finally:
+            self._progress = previous
+
+    # === Scan ===
+
+    def scan(self, max_emails: int = 500, exclude_automated: bool = True, exclude_domains: str = "") -> dict:
+        """Contacts from the newest max_emails messages: email -> {name, frequency, last_contact}.
+
+        Message rows are appended to `<emails_csv>.partial` as the scan goes.
+        """
+        service = self.gmail._get_service()
+        params = {"exclude_automated": exclude_automated,
+                  "exclude_domains": ",".join(sorted(d.strip().lower() for d in exclude_domains.split(",") if d.strip()))}
+        state = self._load_checkpoint(params)
+        if state is not None and state["scanned"] > max_emails:
+            state = None  # Interrupted run was larger than this one; start over
+        if state is None:
+            state = {"params": params, "page_token": None, "scanned": 0, "done": False, "emails_bytes": 0,
+                     "contacts": {}, **self._identity(service, params["exclude_domains"])}
+        user_addresses, user_domains = set(state["user_addresses"]), set(state["user_domains"])
+        contacts = state["contacts"]
+        for info in contacts.values():
+            info["threads"] = set(info["threads"])
+
+        emails_partial = self._emails_partial()
+        if emails_partial:
+            emails_partial.parent.mkdir(parents=True, exist_ok=True)
+            with open(emails_partial, "a+b") as f:
+                f.truncate(state["emails_bytes"])  # Drop rows written after the last checkpoint
+
+        self._report(state["scanned"], max_emails, len(contacts))
+        while not state["done"] and state["scanned"] < max_emails:
+            page = service.users().messages().list(
+                userId='me', maxResults=min(PAGE_SIZE, max_emails - state["scanned"]),
+                pageToken=state["page_token"],
+            ).execute()
+            ids = [m['id'] for m in page.get('messages', [])]
+            messages = self._fetch_headers(service, ids)
+
+            records = []
+            for message_id in ids:
+                message = messages.get(message_id)
+                if message is None:
+                    continue
+                records.append(self._fold(message, contacts, user_addresses, user_domains, exclude_automated))
+            for callback in self._subscribers:
+                callback([gmail_record(messages[i]) for i in ids if i in messages])
+
+            if emails_partial:
+                with open(emails_partial, "a", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=EMAIL_FIELDS)
+                    if f.tell() == 0:
+                        writer.writeheader()
+                    writer.writerows(records)
+                state["emails_bytes"] = emails_partial.stat().st_size
+
+            state["scanned"] += len(ids)
+            state["page_token"] = page.get('nextPageToken')
+            state["done"] = not state["page_token"] or not ids
+            self._save_checkpoint(state)
+            self._report(state["scanned"], max_emails, len(contacts))
+
+        return {
+            email: {'email': email, 'name': info['name'], 'frequency': len(info['threads']),
+                    'last_contact': info['last_contact'] or '',
+                    **{field: '' for field in CONTACT_FIELDS[4:]}}
+            for email, info in contacts.items()
+        }
+
+    def finish(self, publish_emails: bool = True):
+        """Drop the checkpoint once results are written, and publish (or discard) emails.csv."""
+        emails_partial = self._emails_partial()
+        if emails_partial and emails_partial.exists():
+            if publish_emails:
+                os.replace(emails_partial, self.gmail.emails_csv)
+            else:
+                emails_partial.unlink()
+        self.checkpoint_path.unlink(missing_ok=True)
+
+    def _identity(self, service, exclude_domains: str) -> dict:
+        """The user's own addresses and domains, skipped when counting contacts."""
+        user_addresses = own_addresses(service)
+        user_domains = {d for d in exclude_domains.split(",") if d}
+        user_domains.update(a.split('@')[1] for a in user_addresses if '@' in a and a.split('@')[1] not in FREEMAIL)
+        return {"user_addresses": sorted(user_addresses), "user_domains": sorted(user_domains)}
+
+    def _fetch_headers(self, service, ids: list[str]) -> dict:
+        """Header metadata for a page of messages, BATCH_SIZE per HTTP request."""
+        messages, failed = {}, []
+
+        def collect(request_id, response, exception):
+            if exception is None:
+                messages[request_id] = response
+            else:
+                failed.append(request_id)
+
+        def get(message_id):
+            return service.users().messages().get(
+                userId='me', id=message_id, format='metadata',
+                metadataHeaders=['From', 'To', 'Cc', 'Subject', 'Date'],
+            )
+
+        for start in range(0, len(ids), BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=collect)
+            for message_id in ids[start:start + BATCH_SIZE]:
+                batch.add(get(message_id), request_id=message_id)
+            batch.execute()
+
+        # Rate-limited items come back as errors inside the batch; retry them one by one
+        for message_id in failed:
+            try:
+                messages[message_id] = get(message_id).execute()
+            except Exception:
+                pass
+        return messages
+
+    @staticmethod
+    def _fold(message: dict, contacts: dict, user_addresses: set, user_domains: set,
+              exclude_automated: bool) -> dict:
+        """Add one message's participants to contacts. Returns its emails.csv row."""
+        headers = message['payload']['headers']
+        headers_dict = {h['name']: h['value'] for h in headers}
+        seen_in_msg = set()
+        for header in headers:
+            if header['name'] not in ('From', 'To', 'Cc'):
+                continue
+            value = header['value']
+            for match in ADDRESS.findall(value):
+                email = (match[0] or match[1]).strip('"\'<> ')
+                if not email or '@' not in email or email in seen_in_msg:
+                    continue
+                email_lower = email.lower()
+                if email_lower in user_addresses or email_lower.split('@')[1] in user_domains:
+                    continue
+                if exclude_automated and any(p in email_lower for p in AUTOMATED_PATTERNS):
+                    continue
+                seen_in_msg.add(email)
+
+                info = contacts.setdefault(email, {'name': '', 'threads': set(), 'last_contact': None})
+                if not info['name']:
+                    name_match = re.search(rf'([^<>]+)<{re.escape(email)}>', value)
+                    info['name'] = name_match.group(1).strip() if name_match else email.split('@')[0]
+                info['threads'].add(message.get('threadId', message['id']))
+                if not info['last_contact'] and headers_dict.get('Date'):
+                    info['last_contact'] = _date(headers_dict['Date'])
+
+        return {
+            'id': message['id'],
+            'thread_id': message.get('threadId', ''),
+            'from_email': headers_dict.get('From', ''),
+            'to_email': headers_dict.get('To', ''),
+            'subject': headers_dict.get('Subject', ''),
+            'date': headers_dict.get('Date', ''),
+            'snippet': message.get('snippet', '')[:200],
+        }
+
+    # === Checkpoint ===
+
+    def _emails_partial(self) -> Path | None:
+        emails_csv = getattr(self.gmail, "emails_csv", None)
+        return Path(f"{emails_csv}.partial") if emails_csv else None
+
+    def _load_checkpoint(self, params: dict) -> dict | None:
+        try:
+            state = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        return state if state.get("params") == params else None
+
+    def _save_checkpoint(self, state: dict):
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {**state, "contacts": {
+            email: {**info, "threads": sorted(info["threads"])} for email, info in state["contacts"].items()
+        }}
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, self.checkpoint_path)
+
+    def _report(self, scanned: int, total: int, contacts: int):
+        if self._progress:
+            self._progress(f"Scanning emails ({min(scanned, total):,}/{total:,}), {contacts:,} contacts")
+
+    # === Tool integration ===
+
+    def attach(self, gmail):
+        """Run get_all_contacts and sync_contacts on the resumable scan."""
+
+        def get_all_contacts(original, *args, **kwargs):
+            params = call_arguments(original, args, kwargs)
+            contacts = self.scan(params['max_emails'], params['exclude_automated'], params['exclude_domains'])
+            sorted_contacts = sorted(contacts.values(), key=lambda c: int(c['frequency']), reverse=True)
+            if gmail.contacts_csv:
+                _write_contacts(gmail.contacts_csv, sorted_contacts)
+            self.finish()
+
+            output = [f"Found {len(contacts)} unique contacts (sorted by thread count):\n"]
+            for c in sorted_contacts:
+                output.append(f"- {c['name']} <{c['email']}> ({c['frequency']} threads)")
+            return "\n".join(output)
+
+        def sync_contacts(original, *args, **kwargs):
+            if not gmail.contacts_csv:
+                return original(*args, **kwargs)
+            params = call_arguments(original, args, kwargs)
+            fresh = self.scan(params['max_emails'], True, params['exclude_domains'])
+
+            existing = {}
+            if os.path.exists(gmail.contacts_csv):
+                with open(gmail.contacts_csv, 'r', encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        existing[row['email'].lower()] = dict(row)
+            old_count = len(existing)
+
+            new_count = updated_count = 0
+            for email, data in fresh.items():
+                current = existing.get(email.lower())
+                if current is not None:
+                    current['frequency'] = str(data['frequency'])
+                    current['last_contact'] = data['last_contact']
+                    if not current.get('name'):
+                        current['name'] = data['name']
+                    updated_count += 1
+                else:
+                    existing[email.lower()] = data
+                    new_count += 1
+
+            _write_contacts(gmail.contacts_csv, sorted(
+                existing.values(), key=lambda c: int(c.get('frequency') or 0), reverse=True))
+            self.finish(publish_emails=False)  # sync_contacts never wrote emails.csv
+            return (f"Synced {len(existing)} contacts ({new_count} new, {updated_count} updated, "
+                    f"{old_count - updated_count} unchanged)")
+
+        wrap_method(gmail, "get_all_contacts", get_all_contacts)
+        wrap_method(gmail, "sync_contacts", sync_contacts)
+        gmail.contact_scan = self
+        return gmail
+
+
+def own_addresses(service) -> set:
+    """The Gmail account's primary and send-as addresses, lowercased."""
+    profile = service.users().getProfile(userId='me').execute()
+    addresses = {profile.get('emailAddress', '').lower()}
+    send_as = service.users().settings().sendAs().list(userId='me').execute()
+    addresses.update(alias.get('sendAsEmail', '').lower() for alias in send_as.get('sendAs', []))
+    return {a for a in addresses if a}
+
+
+def _date(value: str) -> str:
+    """YYYY-MM-DD for a Date header (first 10 characters if it doesn't parse)."""
+    from email.utils import parsedate_to_datetime
+    try:
+        return parsedate_to_datetime(value).strftime('%Y-%m-%d')
+    except (TypeError, ValueError):
+        return value[:10]
+
+
+def _write_contacts(path: str, rows: list[dict]):
+    with open(path, 'w', newline='', encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CONTACT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
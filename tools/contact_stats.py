@@ -0,0 +1,278 @@
+"""
+Incremental per-contact counters.
+
+sync_contacts used to recompute frequency and last_contact by rescanning the
+newest N messages, so counts stopped at N and every sync paid for the whole
+window again. ContactStats keeps running counters in data/contact_stats.db
+instead, fed with each message once:
+
+- from the mailbox mirror after every delta sync (new mail only)
+- from contact scans (get_all_contacts / sync_contacts), as a backfill
+
+The user's own addresses (Gmail profile and send-as, plus the sender of
+any SENT message) are never counted. Per contact it keeps the number of
+distinct threads, messages, messages the user sent them, the last contact
+time and a relationship strength: every message adds a weight that halves
+every HALF_LIFE_DAYS. The strength is stored scaled to a fixed epoch, so
+it never needs recomputing and the ranking is a plain index scan.
+
+Once a contact scan has finished (the backfill), sync_contacts merges
+these counters into the contact store (after a forced mirror sync)
+instead of rescanning. The mirror alone only covers its sync window, so
+counts it fed before then don't count as a backfill.
+
+Usage:
+    from tools.contact_stats import ContactStats
+
+    stats = ContactStats()
+    mailbox.subscribe(stats.add_messages)
+    stats.top(10)   # strongest relationships over all mail seen
+"""
+
+import math
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .contact_scan import AUTOMATED_PATTERNS, own_addresses
+from .wrapping import wrap_method, call_arguments
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_messages (
+    id TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS contact_threads (
+    email TEXT COLLATE NOCASE,
+    thread_id TEXT,
+    PRIMARY KEY (email, thread_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS stats (
+    email TEXT PRIMARY KEY COLLATE NOCASE,
+    name TEXT,
+    threads INTEGER,
+    messages INTEGER,
+    sent INTEGER,
+    last_contact REAL,
+    score REAL
+);
+CREATE INDEX IF NOT EXISTS stats_score ON stats(score DESC);
+CREATE INDEX IF NOT EXISTS stats_threads ON stats(threads DESC);
+CREATE TABLE IF NOT EXISTS own_addresses (
+    email TEXT PRIMARY KEY COLLATE NOCASE
+);
+CREATE TABLE IF NOT EXISTS stats_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+HALF_LIFE_DAYS = 90
+EPOCH = 1577836800.0  # 2020-01-01; scores are stored as weight * 2^((date - EPOCH) / half-life)
+
+# Writing to someone says more about the relationship than receiving from them
+SENT_WEIGHT = 2.0
+
+ADDRESS = re.compile(r'\s*(?:"?([^"<]*?)"?\s*<([^>]+)>|([^\s<>,]+@[^\s<>,]+))\s*')
+
+
+def parse_addresses(value: str) -> list[tuple[str, str]]:
+    """(name, address) pairs from a From/To header value."""
+    pairs = []
+    for part in _split_header(value or ""):
+        match = ADDRESS.fullmatch(part)
+        if match:
+            name, address = (match.group(1) or "").strip(), (match.group(2) or match.group(3)).strip()
+            if "@" in address:
+                pairs.append((name, address))
+    return pairs
+
+
+def _split_header(value: str) -> list[str]:
+    """Split on commas outside quotes and angle brackets."""
+    parts, current, quoted, angled = [], [], False, False
+    for char in value:
+        if char == '"':
+            quoted = not quoted
+        elif char == '<':
+            angled = True
+        elif char == '>':
+            angled = False
+        elif char == ',' and not quoted and not angled:
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current))
+    return [p for p in parts if p.strip()]
+
+
+class ContactStats:
+    """SQLite-backed running counters per contact."""
+
+    def __init__(self, db_path: str = "data/contact_stats.db", half_life_days: float = HALF_LIFE_DAYS,
+                 identify=None):
+        self.db_path = Path(db_path)
+        self.half_life = half_life_days * 86400
+        self.identify = identify  # () -> the user's own addresses, asked once before the first count
+        self._lock = threading.RLock()
+        self._conn = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """Open the database on first use (so constructing the counters is free)."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    # === Counting ===
+
+    def add_messages(self, records: list[dict]) -> int:
+        """Count mirror-format message records not seen before. Returns how many were new."""
+        added = 0
+        with self._lock, self.db as db:
+            own = {row['email'].lower() for row in db.execute("SELECT email FROM own_addresses")}
+            if not own and records and self.identify:
+                own = {address.lower() for address in self.identify()}
+                db.executemany("INSERT OR IGNORE INTO own_addresses (email) VALUES (?)", [(a,) for a in own])
+            for record in records:
+                if db.execute("INSERT OR IGNORE INTO seen_messages (id) VALUES (?)", (record['id'],)).rowcount == 0:
+                    continue
+                added += 1
+                labels = record.get('labels') or []
+                if isinstance(labels, str):
+                    labels = labels.strip(",").split(",")
+                sender = parse_addresses(record.get('sender', ''))
+                sent = "SENT" in labels
+
+                if sent and sender:
+                    # Mail in SENT comes from one of the user's own addresses
+                    address = sender[0][1].lower()
+                    if address not in own:
+                        own.add(address)
+                        db.execute("INSERT OR IGNORE INTO own_addresses (email) VALUES (?)", (address,))
+                        db.execute("DELETE FROM stats WHERE email = ?", (address,))
+                        db.execute("DELETE FROM contact_threads WHERE email = ?", (address,))
+
+                date = float(record.get('date') or 0)
+                weight = (SENT_WEIGHT if sent else 1.0) * math.pow(2, (date - EPOCH) / self.half_life)
+                thread_id = record.get('thread_id') or record['id']
+                participants = {}
+                for name, address in sender + parse_addresses(record.get('recipients', '')):
+                    key = address.lower()
+                    if key in own or any(p in key for p in AUTOMATED_PATTERNS):
+                        continue
+                    participants.setdefault(key, (name, address))
+
+                for name, address in participants.values():
+                    new_thread = db.execute(
+                        "INSERT OR IGNORE INTO contact_threads (email, thread_id) VALUES (?, ?)",
+                        (address, thread_id),
+                    ).rowcount
+                    db.execute(
+                        """INSERT INTO stats (email, name, threads, messages, sent, last_contact, score)
+                           VALUES (?, ?, ?, 1, ?, ?, ?)
+                           ON CONFLICT(email) DO UPDATE SET
+                               name = CASE WHEN name = '' THEN excluded.name ELSE name END,
+                               threads = threads + excluded.threads,
+                               messages = messages + 1,
+                               sent = sent + excluded.sent,
+                               last_contact = max(last_contact, excluded.last_contact),
+                               score = score + excluded.score""",
+                        (address, name, new_thread, int(sent), date, weight),
+                    )
+        return added
+
+    # === Queries ===
+
+    def strength(self, score: float, now: float = None) -> float:
+        """A stored score as of now: recent-message equivalents."""
+        return score * math.pow(2, -((now or time.time()) - EPOCH) / self.half_life)
+
+    def top(self, limit: int = 10, by: str = "strength") -> list[dict]:
+        """Contacts ranked by decayed strength, or by thread count (by="threads")."""
+        column = "threads" if by == "threads" else "score"
+        with self._lock:
+            rows = self.db.execute(f"SELECT * FROM stats ORDER BY {column} DESC LIMIT ?", (limit,)).fetchall()
+        return [self._contact(row) for row in rows]
+
+    def get(self, email: str) -> dict | None:
+        with self._lock:
+            row = self.db.execute("SELECT * FROM stats WHERE email = ?", (email,)).fetchone()
+        return self._contact(row) if row else None
+
+    def all(self) -> list[dict]:
+        with self._lock:
+            return [self._contact(row) for row in self.db.execute("SELECT * FROM stats")]
+
+    def count(self) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM stats").fetchone()[0]
+
+    @property
+    def backfilled(self) -> bool:
+        """Whether a contact scan has fed its messages through to the end."""
+        with self._lock:
+            return self.db.execute("SELECT 1 FROM stats_state WHERE key = 'backfilled'").fetchone() is not None
+
+    def mark_backfilled(self):
+        with self._lock, self.db as db:
+            db.execute("INSERT OR REPLACE INTO stats_state (key, value) VALUES ('backfilled', ?)", (str(time.time()),))
+
+    def _contact(self, row) -> dict:
+        return {
+            'email': row['email'],
+            'name': row['name'],
+            'frequency': row['threads'],
+            'messages': row['messages'],
+            'sent': row['sent'],
+            'last_contact': datetime.fromtimestamp(row['last_contact']).strftime('%Y-%m-%d') if row['last_contact'] else '',
+            'strength': round(self.strength(row['score']), 2),
+        }
+
+    # === Tool integration ===
+
+    def attach(self, email_tool):
+        """Feed from the tool's mirror and scans; serve sync_contacts from the counters."""
+        if self.identify is None and hasattr(email_tool, "_get_service"):
+            self.identify = lambda: own_addresses(email_tool._get_service())
+        mailbox = getattr(email_tool, "mailbox", None)
+        if mailbox is not None:
+            mailbox.subscribe(self.add_messages)
+        scan = getattr(email_tool, "contact_scan", None)
+        if scan is not None:
+            scan.subscribe(self.add_messages)
+
+            def finish(original, *args, **kwargs):
+                result = original(*args, **kwargs)
+                self.mark_backfilled()
+                return result
+
+            wrap_method(scan, "finish", finish)
+
+        def sync_contacts(original, *args, **kwargs):
+            store = getattr(email_tool, "contacts", None)
+            # Until a scan has backfilled history, only a scan gives full counts
+            if mailbox is None or store is None or not self.backfilled:
+                return original(*args, **kwargs)
+            params = call_arguments(original, args, kwargs)
+            excluded = {d.strip().lower() for d in params['exclude_domains'].split(",") if d.strip()}
+            mailbox.sync(force=True)
+            counts = [c for c in self.all() if c['email'].rsplit("@", 1)[-1].lower() not in excluded]
+            before = store.count()
+            new, updated = store.merge_counts(counts)
+            store.flush()  # /sync, /contacts and `email contacts` read contacts.csv
+            total = store.count()
+            return f"Synced {total} contacts ({new} new, {updated} updated, {before - updated} unchanged)"
+
+        wrap_method(email_tool, "sync_contacts", sync_contacts)
+        email_tool.contact_stats = self
+        return email_tool
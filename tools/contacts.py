@@ -0,0 +1,377 @@
+"""
+Indexed contact store behind the CRM tools.
+
+The CRM lives in data/contacts.db (SQLite) with email as the primary key and
+indexes on priority, type, company and next_contact_date. Updates are
+transactions on single rows, so update_contact is an indexed UPDATE rather
+than a rewrite of the whole CSV, and concurrent writers (main agent,
+crm-init, CLI) queue on SQLite's write lock instead of clobbering a file.
+
+data/contacts.csv is kept as an export for compatibility (ContactProvider,
+`email contacts`, the setup check). Writes mark the store dirty and flush()
+rewrites the CSV atomically, once per agent turn rather than once per
+update. If something else rewrites the CSV, the store re-imports it, keeping
+the contacts it changed since its last export.
+
+Usage:
+    from tools.contacts import ContactStore
+
+    store = ContactStore()
+    store.attach(gmail)   # update_contact / bulk_update_contacts now use the store
+    store.flush()         # write data/contacts.csv
+"""
+
+import csv
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from .wrapping import wrap_method, call_arguments
+
+
+FIELDS = ["email", "name", "frequency", "last_contact", "type", "company",
+          "relationship", "priority", "deal", "next_contact_date", "tags", "notes"]
+
+# Fields update_contact / bulk_update_contacts may change
+CRM_FIELDS = ("type", "company", "relationship", "priority", "deal",
+              "next_contact_date", "tags", "notes", "last_contact")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    email TEXT PRIMARY KEY COLLATE NOCASE,
+    name TEXT NOT NULL DEFAULT '',
+    frequency INTEGER NOT NULL DEFAULT 0,
+    last_contact TEXT NOT NULL DEFAULT '',
+    type TEXT NOT NULL DEFAULT '',
+    company TEXT NOT NULL DEFAULT '',
+    relationship TEXT NOT NULL DEFAULT '',
+    priority TEXT NOT NULL DEFAULT '',
+    deal TEXT NOT NULL DEFAULT '',
+    next_contact_date TEXT NOT NULL DEFAULT '',
+    tags TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS contacts_frequency ON contacts(frequency DESC);
+CREATE INDEX IF NOT EXISTS contacts_priority ON contacts(priority);
+CREATE INDEX IF NOT EXISTS contacts_type ON contacts(type);
+CREATE INDEX IF NOT EXISTS contacts_company ON contacts(company COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS contacts_next_contact ON contacts(next_contact_date);
+CREATE TABLE IF NOT EXISTS store_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS unexported (
+    email TEXT PRIMARY KEY COLLATE NOCASE
+);
+"""
+
+
+class ContactStore:
+    """SQLite contact table with a CSV export.
+
+    Every public method first re-imports contacts.csv if it changed since the
+    store last wrote or read it (e.g. get_all_contacts overwrote it). Contacts
+    written since the last export (listed in the unexported table) keep the
+    store's version; every other row is taken from the file.
+    """
+
+    def __init__(self, db_path: str = "data/contacts.db", csv_path: str = "data/contacts.csv"):
+        self.db_path = Path(db_path)
+        self.csv_path = Path(csv_path)
+        self._lock = threading.RLock()
+        self._conn = None
+        self._dirty = False
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """Open the database on first use (so constructing a store is free)."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit mode: writes use explicit BEGIN IMMEDIATE transactions
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        """Take the write lock up front so concurrent writers queue instead of failing."""
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.db
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+
+    # === CSV import / export ===
+
+    def _csv_stamp(self) -> str | None:
+        try:
+            st = self.csv_path.stat()
+        except FileNotFoundError:
+            return None
+        return f"{st.st_mtime_ns}:{st.st_size}"
+
+    def _get_state(self, key: str) -> str | None:
+        row = self.db.execute("SELECT value FROM store_state WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+
+    def _set_state(self, key: str, value: str):
+        self.db.execute("INSERT OR REPLACE INTO store_state (key, value) VALUES (?, ?)", (key, value))
+
+    def _check_csv(self):
+        """Re-import contacts.csv if it was written by someone other than this store."""
+        stamp = self._csv_stamp()
+        if stamp is not None and stamp != self._get_state('csv_stamp'):
+            self.import_csv(keep_unexported=True)
+
+    def import_csv(self, path: str = None, keep_unexported: bool = False) -> int:
+        """Replace the store's contacts with a CSV file's. Returns number imported.
+
+        A later row with the same email (case-insensitive) wins. With
+        keep_unexported, contacts changed since the last export keep their
+        current values instead.
+        """
+        path = Path(path) if path else self.csv_path
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            rows = {}
+            for record in csv.DictReader(f):
+                if (record.get('email') or '').strip():
+                    row = _row(record)
+                    rows[row[0].lower()] = row
+
+        with self._transaction() as db:
+            if keep_unexported:
+                kept = {row['email'].lower() for row in db.execute("SELECT email FROM unexported")}
+                rows = {email: row for email, row in rows.items() if email not in kept}
+                db.execute("DELETE FROM contacts WHERE email NOT IN (SELECT email FROM unexported)")
+            else:
+                db.execute("DELETE FROM contacts")
+                db.execute("DELETE FROM unexported")
+            db.executemany(
+                f"INSERT OR REPLACE INTO contacts ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})",
+                rows.values(),
+            )
+            if path == self.csv_path:
+                self._set_state('csv_stamp', self._csv_stamp())
+        return len(rows)
+
+    def _mark_unexported(self, db, emails):
+        """Record stored contacts changed since the last export, so a re-import keeps them."""
+        db.executemany("INSERT OR IGNORE INTO unexported (email) SELECT email FROM contacts WHERE email = ?",
+                       ((email,) for email in emails))
+
+    def export_csv(self, path: str = None):
+        """Write all contacts, most frequent first, atomically replacing the file."""
+        path = Path(path) if path else self.csv_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # One transaction, so a write from another process lands before or after the export
+        with self._transaction() as db:
+            rows = db.execute(
+                f"SELECT {', '.join(FIELDS)} FROM contacts ORDER BY frequency DESC, rowid"
+            ).fetchall()
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".contacts-", suffix=".csv")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(FIELDS)
+                    writer.writerows(rows)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            if path == self.csv_path:
+                self._set_state('csv_stamp', self._csv_stamp())
+                db.execute("DELETE FROM unexported")
+                self._dirty = False
+
+    def flush(self):
+        """Export contacts.csv if the store changed since the last export."""
+        with self._lock:
+            if self._dirty:
+                self.export_csv()
+
+    # === Reading ===
+
+    def count(self) -> int:
+        with self._lock:
+            self._check_csv()
+            return self.db.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+
+    def get(self, email: str) -> dict | None:
+        """One contact by email (case-insensitive), or None."""
+        with self._lock:
+            self._check_csv()
+            row = self.db.execute("SELECT * FROM contacts WHERE email = ?", (email,)).fetchone()
+        return dict(row) if row else None
+
+    def find(self, priority: str = None, type: str = None, company: str = None,
+             due_by: str = None, limit: int = None) -> list[dict]:
+        """Contacts matching all given filters, most frequent first.
+
+        due_by selects contacts with a next_contact_date on or before that
+        date (YYYY-MM-DD). Each filter is served by its own index.
+        """
+        clauses, params = [], []
+        if priority is not None:
+            clauses.append("priority = ?")
+            params.append(priority)
+        if type is not None:
+            clauses.append("type = ?")
+            params.append(type)
+        if company is not None:
+            clauses.append("company = ? COLLATE NOCASE")
+            params.append(company)
+        if due_by is not None:
+            clauses.append("next_contact_date != '' AND next_contact_date <= ?")
+            params.append(due_by)
+
+        sql = "SELECT * FROM contacts"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY frequency DESC, rowid"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            self._check_csv()
+            return [dict(row) for row in self.db.execute(sql, params)]
+
+    # === Writing ===
+
+    def update(self, email: str, **fields) -> bool:
+        """Set CRM fields on one contact (None values are skipped). Returns False if not found."""
+        return self.bulk_update([{"email": email, **fields}]) == 1
+
+    def bulk_update(self, updates: list[dict]) -> int:
+        """Apply many CRM field updates in one transaction. Returns number of contacts changed."""
+        by_columns = {}
+        for update in updates:
+            email = (update.get('email') or '').strip()
+            if not email:
+                continue
+            columns = tuple(f for f in CRM_FIELDS if update.get(f) is not None)
+            by_columns.setdefault(columns, []).append(tuple(str(update[f]) for f in columns) + (email,))
+
+        changed = 0
+        with self._lock:
+            self._check_csv()
+        with self._transaction() as db:
+            for columns, rows in by_columns.items():
+                # No fields to set still counts the contact as found (email = email is a no-op)
+                sets = ", ".join(f"{c} = ?" for c in columns) or "email = email"
+                changed += db.executemany(f"UPDATE contacts SET {sets} WHERE email = ?", rows).rowcount
+                if columns:
+                    self._mark_unexported(db, (row[-1] for row in rows))
+            self._dirty = self._dirty or changed > 0
+        return changed
+
+    def upsert(self, contacts: list[dict]) -> int:
+        """Insert or fully replace contacts in one transaction. Returns number written."""
+        rows = [_row(c) for c in contacts if (c.get('email') or '').strip()]
+        updates = ", ".join(f"{f} = excluded.{f}" for f in FIELDS[1:])
+        with self._lock:
+            self._check_csv()
+        with self._transaction() as db:
+            db.executemany(
+                f"INSERT INTO contacts ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})"
+                f" ON CONFLICT(email) DO UPDATE SET {updates}",
+                rows,
+            )
+            self._mark_unexported(db, (row[0] for row in rows))
+            self._dirty = self._dirty or bool(rows)
+        return len(rows)
+
+    def merge_counts(self, contacts: list[dict]) -> tuple[int, int]:
+        """Set frequency and last_contact from running counters, adding unknown contacts.
+
+        CRM fields are kept; a name is only filled in where it is empty.
+        Returns (new, updated).
+        """
+        rows = [_row(c) for c in contacts if (c.get('email') or '').strip()]
+        with self._lock:
+            self._check_csv()
+        with self._transaction() as db:
+            known = {row['email'].lower() for row in db.execute("SELECT email FROM contacts")}
+            db.executemany(
+                f"INSERT INTO contacts ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})"
+                " ON CONFLICT(email) DO UPDATE SET frequency = excluded.frequency,"
+                " last_contact = excluded.last_contact,"
+                " name = CASE WHEN name = '' THEN excluded.name ELSE name END",
+                rows,
+            )
+            self._mark_unexported(db, (row[0] for row in rows))
+            self._dirty = self._dirty or bool(rows)
+        new = sum(1 for row in rows if row[0].lower() not in known)
+        return new, len(rows) - new
+
+    # === Tool integration ===
+
+    def attach(self, email_tool):
+        """Serve the provider tool's CRM methods from this store."""
+
+        def update_contact(original, *args, **kwargs):
+            params = call_arguments(original, args, kwargs)
+            email = params.pop('email')
+            if not self.csv_path.exists() and self.count() == 0:
+                return f"Contact {email} not found. Run sync_contacts() first."
+            if not self.update(email, **params):
+                return f"Contact {email} not found in contacts.csv"
+            shown = ("type", "priority", "deal", "next_contact_date", "relationship", "company", "last_contact")
+            changes = [f"{f}={params[f]}" for f in shown if params.get(f)]
+            return f"Updated {email}: {', '.join(changes) if changes else 'no changes'}"
+
+        def bulk_update_contacts(original, *args, **kwargs):
+            updates = call_arguments(original, args, kwargs)['updates']
+            if not self.csv_path.exists() and self.count() == 0:
+                return "No contacts.csv found. Run sync_contacts() first."
+            self.bulk_update(updates)
+            requested = {u['email'].lower() for u in updates if isinstance(u, dict) and u.get('email')}
+            return f"Bulk updated {len(requested)} contacts"
+
+        def get_cached_contacts(original, *args, **kwargs):
+            contacts = self.find(limit=50)
+            if not contacts:
+                return original(*args, **kwargs)
+            result = [f"Cached contacts ({self.count()}):\n"]
+            for c in contacts:
+                result.append(f"- {c['name']} <{c['email']}> ({c['frequency']} emails)")
+            return "\n".join(result)
+
+        def rewrites_csv(original, *args, **kwargs):
+            # These scan mail and rewrite contacts.csv themselves: export pending
+            # updates first so they're merged, then take the result back in
+            self.flush()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._check_csv()
+
+        wrap_method(email_tool, "update_contact", update_contact)
+        wrap_method(email_tool, "bulk_update_contacts", bulk_update_contacts)
+        wrap_method(email_tool, "get_cached_contacts", get_cached_contacts)
+        wrap_method(email_tool, "sync_contacts", rewrites_csv)
+        wrap_method(email_tool, "get_all_contacts", rewrites_csv)
+        email_tool.contacts = self
+        return email_tool
+
+
+def _row(contact: dict) -> tuple:
+    """Column values for a contact dict, in FIELDS order."""
+    values = []
+    for field in FIELDS:
+        value = contact.get(field)
+        value = "" if value is None else str(value).strip()
+        if field == "frequency":
+            value = int(value) if value.lstrip("-").isdigit() else 0
+        values.append(value)
+    return tuple(values)
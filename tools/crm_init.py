@@ -0,0 +1,236 @@
+"""
+Parallel CRM initialization.
+
+The crm-init agent analyzes contacts one tool call at a time, so init time
+grows with the number of contacts. CrmInit runs the same steps as a pipeline:
+
+1. Extract contacts once (get_all_contacts, which also writes contacts.csv)
+2. Settle the obvious ones with rules (tools.contact_rules) and split the
+   rest into shards of SHARD_SIZE contacts
+3. Analyze shards concurrently on a bounded worker pool: each shard gathers
+   recent subjects for its top contacts and a description of each business
+   domain, then one LLM call categorizes the whole shard
+4. Merge every shard's updates into a single bulk_update_contacts call
+5. Save crm:all_contacts, crm:needs_reply, crm:init_report and contact:* keys
+
+Provider, web and LLM calls all run on the workers. Provider requests are
+charged to the process-wide rate limiter (tools.rate_limit) through the
+provider tool itself; web lookups and LLM calls draw from its "crm_init"
+bucket (CRM_INIT_RATE per second). A shard whose LLM call fails, or a
+domain lookup that fails, is listed with its error in the init report.
+
+Usage:
+    from tools.crm_init import CrmInit
+
+    pipeline = CrmInit(gmail, web=WebFetch(), memory=memory, workers=4, limiter=RateLimiter())
+    report = pipeline.run(max_emails=500, top_n=10)
+"""
+
+import csv
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .contact_rules import classify_one, GENERIC_DOMAINS, SOCIAL_DOMAINS, NOTIFY_PREFIXES
+
+
+# Contacts per LLM call
+SHARD_SIZE = 25
+
+MODEL = "co/claude-sonnet-4-5"
+SHARD_PROMPT = Path(__file__).resolve().parent.parent / "prompts" / "crm_shard.md"
+
+
+class ContactUpdate(BaseModel):
+    """CRM fields for one contact, as bulk_update_contacts takes them."""
+    email: str
+    type: str
+    priority: str
+    company: Optional[str] = None
+    relationship: Optional[str] = None
+    deal: Optional[str] = None
+    tags: Optional[str] = None
+    notes: Optional[str] = None
+
+
+class ShardUpdates(BaseModel):
+    updates: list[ContactUpdate]
+
+
+def categorize_shard(text: str) -> list[dict]:
+    """One LLM call that returns CRM updates for every contact in a shard."""
+    from connectonion import llm_do
+
+    result = llm_do(text, output=ShardUpdates, system_prompt=SHARD_PROMPT, model=MODEL)
+    return [update.model_dump(exclude_none=True) for update in result.updates]
+
+
+class CrmInit:
+    """Extract, shard, analyze concurrently, merge once."""
+
+    def __init__(self, email_tool, web=None, memory=None, workers: int = 4, limiter=None,
+                 shard_size: int = None, categorize=categorize_shard):
+        self.email_tool = email_tool
+        self.web = web
+        self.memory = memory
+        self.workers = max(1, workers)
+        self.shard_size = shard_size or SHARD_SIZE
+        self.categorize = categorize
+        self._limiter = limiter  # tools.rate_limit.RateLimiter, or None for no limit
+        self._domains = {}
+        self._domains_lock = threading.Lock()
+        self._errors = []  # what failed, for the report
+
+    @staticmethod
+    def supports(email_tool) -> bool:
+        """Whether the provider tool has the contact methods the pipeline needs."""
+        return all(hasattr(email_tool, name) for name in ("get_all_contacts", "bulk_update_contacts"))
+
+    # === Steps ===
+
+    def run(self, max_emails: int = 500, top_n: int = 10, exclude_domains: str = "") -> str:
+        started = time.monotonic()
+        self._errors = []
+        extracted = self.email_tool.get_all_contacts(max_emails=max_emails, exclude_domains=exclude_domains)
+        self._remember("crm:all_contacts", extracted)
+        contacts = self._load_contacts()
+
+        # Recent subjects only for the most frequent contacts (sorted by frequency already)
+        deep = {c["email"].lower() for c in contacts[:top_n]}
+        merged, pending = {}, []
+        for contact in contacts:
+            update = classify_one(contact)
+            if update:
+                merged[contact["email"].lower()] = update
+            # Top people still go to the LLM for relationship and deal context
+            if update is None or (update["type"] == "PERSON" and contact["email"].lower() in deep):
+                pending.append(contact)
+        ruled = len(contacts) - len(pending)
+
+        shards = [pending[i:i + self.shard_size] for i in range(0, len(pending), self.shard_size)]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="crm-init") as pool:
+            results = list(pool.map(lambda shard: self._analyze_shard(shard, deep), shards))
+
+        for update in (update for shard_updates in results if shard_updates for update in shard_updates):
+            merged[update["email"].lower()] = update
+        updates = list(merged.values())
+        failed = sum(1 for shard_updates in results if shard_updates is None)
+        if updates:
+            self.email_tool.bulk_update_contacts(updates=updates)
+
+        needs_reply = ""
+        if hasattr(self.email_tool, "get_unanswered_emails"):
+            needs_reply = self.email_tool.get_unanswered_emails(within_days=120, max_results=20)
+            self._remember("crm:needs_reply", needs_reply)
+
+        by_email = {u["email"].lower(): u for u in updates}
+        for contact in contacts[:top_n]:
+            update = by_email.get(contact["email"].lower())
+            if update:
+                self._remember(f"contact:{contact['email']}", _describe(contact, update))
+
+        report = self._report(contacts, updates, ruled, len(shards), failed, time.monotonic() - started)
+        self._remember("crm:init_report", report)
+        return report
+
+    def _analyze_shard(self, shard: list[dict], deep: set) -> list[dict] | None:
+        """Categorize one shard. Returns its updates, or None if the shard failed."""
+        lines = []
+        for contact in shard:
+            email = contact["email"]
+            line = (f"- {contact.get('name') or ''} <{email}> ({contact.get('frequency') or 0} threads, "
+                    f"last {contact.get('last_contact') or 'unknown'})")
+            about = self._about_domain(email.rsplit("@", 1)[-1].lower())
+            if about:
+                line += f"\n  Domain: {about}"
+            if email.lower() in deep and hasattr(self.email_tool, "search_emails"):
+                recent = self.email_tool.search_emails(query=f"from:{email} OR to:{email}", max_results=5)
+                line += "\n  Recent emails:\n    " + "\n    ".join(str(recent).splitlines()[:15])
+            lines.append(line)
+
+        emails = {c["email"].lower() for c in shard}
+        try:
+            updates = self._limited(lambda: self.categorize("Contacts:\n" + "\n".join(lines)))
+        except Exception as e:
+            self._errors.append(f"Shard of {len(shard)} ({shard[0]['email']}, ...): {type(e).__name__}: {e}")
+            return None
+        return [u for u in updates if u.get("email", "").lower() in emails]
+
+    def _about_domain(self, domain: str) -> str:
+        """What the company behind a business domain does (looked up once per run)."""
+        if (not self.web or domain in GENERIC_DOMAINS or domain in SOCIAL_DOMAINS
+                or domain.startswith(NOTIFY_PREFIXES)):
+            return ""
+        with self._domains_lock:
+            entry = self._domains.get(domain)
+            owner = entry is None
+            if owner:
+                entry = self._domains[domain] = {"done": threading.Event(), "text": ""}
+        if not owner:
+            entry["done"].wait()
+            return entry["text"]
+        try:
+            entry["text"] = " ".join(str(self._limited(lambda: self.web.analyze_page(f"https://{domain}"))).split())
+        except Exception as e:
+            self._errors.append(f"Lookup of {domain}: {type(e).__name__}: {e}")
+        finally:
+            entry["done"].set()
+        return entry["text"]
+
+    # === Helpers ===
+
+    def _limited(self, run):
+        """run() once the crm_init bucket allows, retried if the service throttles it."""
+        if self._limiter is None:
+            return run()
+        return self._limiter.call("crm_init", 1, run)
+
+    def _load_contacts(self) -> list[dict]:
+        """Contacts written by get_all_contacts, most frequent first."""
+        store = getattr(self.email_tool, "contacts", None)
+        if store is not None:
+            return store.find()
+        path = getattr(self.email_tool, "contacts_csv", None)
+        if not path or not Path(path).exists():
+            return []
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = [row for row in csv.DictReader(f) if row.get("email")]
+        return sorted(rows, key=lambda row: int(row.get("frequency") or 0), reverse=True)
+
+    def _remember(self, key: str, content: str):
+        if self.memory is not None and content:
+            self.memory.write_memory(key, content)
+
+    def _report(self, contacts: list[dict], updates: list[dict], ruled: int, shards: int, failed: int,
+                elapsed: float) -> str:
+        by_type = {}
+        for update in updates:
+            by_type.setdefault(update.get("type", "UNKNOWN"), []).append(update)
+        names = {c["email"].lower(): c.get("name") or c["email"] for c in contacts}
+
+        lines = [f"Analyzed {len(contacts)} contacts: {ruled} by rules, {len(contacts) - ruled} by the LLM "
+                 f"in {shards} shards ({self.workers} workers, {elapsed:.0f}s); {len(updates)} categorized."]
+        if failed:
+            lines.append(f"{failed} shard(s) failed; their contacts are uncategorized. Run /init again to retry.")
+        if self._errors:
+            lines.append("\n## Errors")
+            lines.extend(f"- {error}" for error in self._errors)
+        for type_name in ("PERSON", "SERVICE", "NOTIFICATION"):
+            group = by_type.get(type_name, [])
+            if not group:
+                continue
+            lines.append(f"\n## {type_name} ({len(group)})")
+            for update in sorted(group, key=lambda u: ("high", "medium", "low").index(u["priority"])
+                                 if u.get("priority") in ("high", "medium", "low") else 3)[:10]:
+                detail = ", ".join(filter(None, [update.get("priority"), update.get("relationship"), update.get("deal")]))
+                lines.append(f"- {names.get(update['email'].lower(), update['email'])} <{update['email']}> {detail}")
+        return "\n".join(lines)
+
+
+def _describe(contact: dict, update: dict) -> str:
+    fields = {**{k: v for k, v in contact.items() if v}, **update}
+    return "\n".join(f"{key}: {value}" for key, value in fields.items())
@@ -0,0 +1,219 @@
+"""
+Batched email body retrieval.
+
+Reading the bodies behind a search result meant one get_email_body call per
+message: one HTTP round trip and one agent iteration each, out of a budget
+of 15. EmailBodies adds get_email_bodies(email_ids) to the provider tool,
+which reads them all in one tool call:
+
+- bodies already in the mailbox mirror are read locally
+- Gmail: the rest go out as batch HTTP requests of BATCH_SIZE messages
+  (one round trip each, sent one after another: Gmail limits concurrent
+  requests per user, and a batch already carries 50 of them)
+- Outlook: Graph $batch requests of GRAPH_BATCH_SIZE, up to `workers` at
+  once, asking Graph for text bodies
+- HTML bodies become plain text; each body is capped at max_chars
+
+Messages the batch could not return are fetched with get_email_body.
+
+Usage:
+    from tools.email_bodies import EmailBodies
+
+    EmailBodies.for_tool(gmail).attach(gmail)
+    gmail.get_email_bodies(["18c1...", "18c2..."])
+"""
+
+import html
+import re
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from .mailbox import BATCH_SIZE
+
+
+GRAPH_BATCH_SIZE = 20  # Graph's maximum requests per $batch
+MAX_IDS = 50
+MAX_CHARS = 3000
+
+
+def html_to_text(markup: str) -> str:
+    """Readable text from an HTML body: blocks on their own lines, links kept."""
+    text = re.sub(r"<(script|style)\b[^>]*>.*?</\1>", "", markup, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'<a\b[^>]*\bhref=["\']([^"\']+)["\'][^>]*>(.*?)</a>',
+                  lambda m: _link(m.group(1), m.group(2)), text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r"<br\b[^>]*>|</?(?:p|div|li|tr|td|th|h[1-6]|blockquote|table)\b[^>]*>", "\n", text,
+                  flags=re.IGNORECASE)
+    text = html.unescape(re.sub(r"<(?![a-zA-Z][a-zA-Z0-9+.-]*://)[^>]+>", "", text))
+    text = re.sub(r"[^\S\n]+", " ", text)
+    return re.sub(r"\n\s*", "\n", text).strip()
+
+
+def _link(url: str, label: str) -> str:
+    label = re.sub(r"<[^>]+>", "", label).strip()
+    return url if not label or html.unescape(label) == html.unescape(url) else f"{label} <{url}>"
+
+
+def _formatted(sender: str, to: str, subject: str, date: str, body: str) -> str:
+    """The layout get_email_body returns (the mirror stores bodies in it)."""
+    return "\n".join([f"From: {sender}", f"To: {to}", f"Subject: {subject}", f"Date: {date}",
+                      "\n--- Email Body ---\n", body])
+
+
+class GmailBodies:
+    """Full messages through Gmail batch HTTP requests."""
+
+    def __init__(self, gmail):
+        self.gmail = gmail
+
+    def fetch(self, ids: list[str]) -> dict:
+        """Formatted bodies by id; ids missing from the result failed."""
+        service = self.gmail._get_service()
+        bodies = {}
+
+        def collect(request_id, response, exception):
+            if exception is None:
+                bodies[request_id] = self._format(response)
+
+        for start in range(0, len(ids), BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=collect)
+            for message_id in ids[start:start + BATCH_SIZE]:
+                batch.add(service.users().messages().get(userId='me', id=message_id, format='full'),
+                          request_id=message_id)
+            batch.execute()
+        return bodies
+
+    def _format(self, message: dict) -> str:
+        headers = {h['name']: h['value'] for h in message['payload'].get('headers', [])}
+        body = self.gmail._extract_body(message['payload']) or message.get('snippet', 'No body content')
+        return _formatted(headers.get('From', 'Unknown'), headers.get('To', 'Unknown'),
+                          headers.get('Subject', 'No Subject'), headers.get('Date', 'Unknown'), body)
+
+
+class OutlookBodies:
+    """Messages through Graph $batch, several batches in flight at once."""
+
+    SELECT = "from,toRecipients,subject,receivedDateTime,body"
+
+    def __init__(self, outlook, workers: int = 4):
+        self.outlook = outlook
+        self.workers = workers
+
+    def fetch(self, ids: list[str]) -> dict:
+        chunks = [ids[i:i + GRAPH_BATCH_SIZE] for i in range(0, len(ids), GRAPH_BATCH_SIZE)]
+        bodies = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(chunks)))) as pool:
+            for result in pool.map(self._batch, chunks):
+                bodies.update(result)
+        return bodies
+
+    def _batch(self, ids: list[str]) -> dict:
+        requests = [
+            {
+                "id": str(i),
+                "method": "GET",
+                "url": f"/me/messages/{message_id}?$select={self.SELECT}",
+                # Graph converts HTML bodies to text server-side
+                "headers": {"Prefer": 'outlook.body-content-type="text"'},
+            }
+            for i, message_id in enumerate(ids)
+        ]
+        try:
+            page = self.outlook._request("POST", "/$batch", json={"requests": requests})
+        except Exception:
+            return {}
+        bodies = {}
+        for response in page.get('responses', []):
+            if response.get('status') == 200:
+                bodies[ids[int(response['id'])]] = self._format(response.get('body', {}))
+        return bodies
+
+    def _format(self, message: dict) -> str:
+        sender = message.get('from', {}).get('emailAddress', {})
+        to = ', '.join(r.get('emailAddress', {}).get('address', '') for r in message.get('toRecipients', []))
+        body = message.get('body', {})
+        content = body.get('content') or 'No body'
+        if body.get('contentType') == 'html':
+            content = html_to_text(content)
+        return _formatted(f"{sender.get('name', '')} <{sender.get('address', '')}>", to,
+                          message.get('subject') or 'No Subject', message.get('receivedDateTime', 'Unknown'),
+                          content)
+
+
+class EmailBodies:
+    """Adds get_email_bodies to a provider tool."""
+
+    def __init__(self, source, max_ids: int = MAX_IDS):
+        self.source = source
+        self.max_ids = max_ids
+
+    @classmethod
+    def for_tool(cls, email_tool, **kwargs):
+        """An EmailBodies for a Gmail or Outlook tool, or None for other tools."""
+        if hasattr(email_tool, "_get_service") and hasattr(email_tool, "_extract_body"):
+            return cls(GmailBodies(email_tool), **kwargs)
+        if hasattr(email_tool, "_request") and hasattr(email_tool, "GRAPH_API_URL"):
+            return cls(OutlookBodies(email_tool), **kwargs)
+        return None
+
+    def fetch(self, email_tool, ids: list[str]) -> dict:
+        """Formatted, uncapped bodies by id: mirror first, then batches, then one by one."""
+        mailbox = getattr(email_tool, "mailbox", None)
+        bodies = {}
+        if mailbox is not None:
+            for message_id in ids:
+                body = mailbox.body(message_id)
+                if body is not None:
+                    bodies[message_id] = body
+
+        missing = [message_id for message_id in ids if message_id not in bodies]
+        if missing:
+            try:
+                fetched = self.source.fetch(missing)
+            except Exception:
+                fetched = {}
+            for message_id in missing:
+                if message_id not in fetched:
+                    try:
+                        fetched[message_id] = email_tool.get_email_body(message_id)
+                    except Exception as e:
+                        bodies[message_id] = f"Error: could not read this email ({type(e).__name__}: {e})"
+                        continue
+                bodies[message_id] = fetched[message_id]
+                if mailbox is not None:
+                    mailbox.store_body(message_id, fetched[message_id])
+        return bodies
+
+    def attach(self, email_tool):
+        bodies_layer = self
+
+        def get_email_bodies(self, email_ids: list[str], max_chars: int = MAX_CHARS) -> str:
+            """Get the full content of several emails in one call (use instead of repeated get_email_body).
+
+            Args:
+                email_ids: Message IDs from read_inbox/search_emails (up to 50)
+                max_chars: Maximum characters of body text per email (default: 3000)
+
+            Returns:
+                Each email's headers and body, in the order given
+            """
+            ids = list(dict.fromkeys(i.strip() for i in email_ids if i and i.strip()))
+            if not ids:
+                return "No email IDs given."
+            skipped = ids[bodies_layer.max_ids:]
+            ids = ids[:bodies_layer.max_ids]
+            bodies = bodies_layer.fetch(self, ids)
+
+            output = []
+            for n, message_id in enumerate(ids, 1):
+                body = bodies[message_id]
+                if max_chars and len(body) > max_chars:
+                    body = (body[:max_chars].rstrip() + f"\n[... {len(body) - max_chars} more characters; "
+                            f"get_email_body(\"{message_id}\") for the full text]")
+                output.append(f"=== Email {n}/{len(ids)} (ID: {message_id}) ===\n{body}\n")
+            if skipped:
+                output.append(f"{len(skipped)} more ID(s) not read (limit {bodies_layer.max_ids} per call).")
+            return "\n".join(output)
+
+        email_tool.get_email_bodies = types.MethodType(get_email_bodies, email_tool)
+        email_tool.email_bodies = self
+        return email_tool
@@ -0,0 +1,33 @@
+"""
+Deferred construction for expensive objects.
+
+`from agent import agent` must stay cheap so `email --help` doesn't build two
+agents and import every provider SDK. Lazy is a stand-in that calls its
+builder on first use and forwards attribute access to the result.
+
+Usage:
+    agent = Lazy(get_agent)   # nothing built yet
+    agent.input("hi")         # get_agent() runs here
+"""
+
+
+class Lazy:
+    """Forward attribute access to build(), called on demand.
+
+    build is expected to cache its own result (e.g. functools.cache).
+    """
+
+    def __init__(self, build):
+        object.__setattr__(self, "_build", build)
+
+    def __getattr__(self, name):
+        # Introspection (mock.patch, asyncio, copy) probes private names; don't build for those
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._build(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._build(), name, value)
+
+    def __repr__(self):
+        return f"<Lazy {getattr(self._build, '__name__', 'object')}>"
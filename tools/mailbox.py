@@ -0,0 +1,583 @@
+"""
+Local SQLite mirror of the linked mailbox.
+
+Headers, labels, thread ids and snippets live in data/mailbox_<provider>.db and
+are kept current with the provider's delta API (Gmail history id, Outlook
+delta link). Bodies are fetched lazily the first time they are read. Gmail
+metadata is fetched BATCH_SIZE messages per batch request.
+
+The first full sync (up to `max_messages`) runs in the background; reads
+made before it finishes go to the API.
+
+Once attached, read_inbox, search_emails and get_email_body on the provider
+tool are served from the mirror, so the agent, the sub-agents and the CLI all
+read locally. Anything the mirror can't answer falls back to the API.
+
+Usage:
+    from tools.mailbox import Mailbox
+
+    mailbox = Mailbox.for_tool(gmail)   # None if the provider has no delta API
+    mailbox.attach(gmail)               # gmail.read_inbox() now reads locally
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from . import search_index
+from .wrapping import wrap_method, call_arguments
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT,
+    date REAL,
+    date_header TEXT,
+    sender TEXT,
+    recipients TEXT,
+    subject TEXT,
+    snippet TEXT,
+    labels TEXT,
+    unread INTEGER,
+    body TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_date ON messages(date DESC);
+CREATE INDEX IF NOT EXISTS messages_thread ON messages(thread_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS label_names (
+    id TEXT PRIMARY KEY,
+    name TEXT
+);
+"""
+
+BATCH_SIZE = 50  # Gmail's recommended maximum per batch request
+
+# Tool methods that change mailbox state; the next read syncs the delta first
+MUTATIONS = ("send", "reply", "mark_read", "mark_unread", "archive_email", "star_email", "add_label")
+
+
+class CursorExpired(Exception):
+    """The stored delta cursor is no longer valid; a full resync is needed."""
+
+
+class NotReady(Exception):
+    """The mirror is being filled by a full sync; read from the API meanwhile."""
+
+
+class GmailSource:
+    """Delta source backed by the Gmail history API."""
+
+    name = "gmail"
+    folders = None  # all mail except spam and trash
+    HEADERS = ["From", "To", "Cc", "Subject", "Date"]
+
+    def __init__(self, gmail):
+        self.gmail = gmail
+
+    def initial(self, days: int, limit: int) -> tuple[list[dict], str]:
+        """Fetch up to `limit` messages from the last `days` days. Returns (messages, cursor)."""
+        service = self.gmail._get_service()
+        # Take the cursor before listing so mail arriving meanwhile is not missed
+        cursor = service.users().getProfile(userId='me').execute()['historyId']
+
+        stubs, page_token = [], None
+        while len(stubs) < limit:
+            page = service.users().messages().list(
+                userId='me',
+                q=f"newer_than:{days}d",
+                maxResults=min(500, limit - len(stubs)),
+                pageToken=page_token,
+            ).execute()
+            stubs.extend(page.get('messages', []))
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                break
+
+        return self._get_many([stub['id'] for stub in stubs]), str(cursor)
+
+    def changes(self, cursor: str) -> tuple[list[dict], set, str]:
+        """Fetch everything that changed since `cursor`. Returns (upserts, deleted_ids, cursor)."""
+        from googleapiclient.errors import HttpError
+
+        service = self.gmail._get_service()
+        changed, deleted, page_token = [], set(), None
+        new_cursor = cursor
+        while True:
+            try:
+                page = service.users().history().list(
+                    userId='me', startHistoryId=cursor, pageToken=page_token
+                ).execute()
+            except HttpError as e:
+                if e.resp.status == 404:
+                    raise CursorExpired(cursor) from e
+                raise
+            for record in page.get('history', []):
+                for entry in record.get('messagesDeleted', []):
+                    deleted.add(entry['message']['id'])
+                for kind in ('messagesAdded', 'labelsAdded', 'labelsRemoved'):
+                    for entry in record.get(kind, []):
+                        changed.append(entry['message']['id'])
+            new_cursor = page.get('historyId', new_cursor)
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                break
+
+        wanted = [i for i in dict.fromkeys(changed) if i not in deleted]
+        upserts = self._get_many(wanted)
+        deleted |= set(wanted) - {m['id'] for m in upserts}
+        return upserts, deleted, str(new_cursor)
+
+    def labels(self) -> dict:
+        """Map of user label id to display name (for label: queries)."""
+        result = self.gmail._get_service().users().labels().list(userId='me').execute()
+        return {label['id']: label['name'] for label in result.get('labels', [])}
+
+    def _get_many(self, message_ids: list[str]) -> list[dict]:
+        """Metadata records for many messages through batch requests (gone messages are left out)."""
+        service = self.gmail._get_service()
+        records = {}
+
+        def collect(request_id, response, exception):
+            if exception is None:
+                records[request_id] = gmail_record(response)
+
+        for start in range(0, len(message_ids), BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=collect)
+            for message_id in message_ids[start:start + BATCH_SIZE]:
+                batch.add(service.users().messages().get(
+                    userId='me', id=message_id, format='metadata', metadataHeaders=self.HEADERS
+                ), request_id=message_id)
+            batch.execute()
+        # Whatever a batch could not return (throttled, transient errors) is fetched one by one
+        for message_id in message_ids:
+            if message_id not in records:
+                record = self._get(message_id)
+                if record is not None:
+                    records[message_id] = record
+        return [records[i] for i in message_ids if i in records]
+
+    def _get(self, message_id: str) -> dict | None:
+        """Fetch one message's metadata as a mirror record (None if it is gone)."""
+        from googleapiclient.errors import HttpError
+
+        try:
+            message = self.gmail._get_service().users().messages().get(
+                userId='me', id=message_id, format='metadata', metadataHeaders=self.HEADERS
+            ).execute()
+        except HttpError as e:
+            if e.resp.status == 404:
+                return None
+            raise
+        return gmail_record(message)
+
+
+def gmail_record(message: dict) -> dict:
+    """Mirror record for a Gmail API message fetched with format='metadata'."""
+    headers = {h['name']: h['value'] for h in message.get('payload', {}).get('headers', [])}
+    return {
+        'id': message['id'],
+        'thread_id': message.get('threadId', ''),
+        'date': int(message.get('internalDate', 0)) / 1000,
+        'date_header': headers.get('Date', 'Unknown'),
+        'sender': headers.get('From', 'Unknown'),
+        'recipients': ", ".join(v for v in (headers.get('To'), headers.get('Cc')) if v),
+        'subject': headers.get('Subject', 'No Subject'),
+        'snippet': message.get('snippet', ''),
+        'labels': message.get('labelIds', []),
+    }
+
+
+class OutlookSource:
+    """Delta source backed by the Graph messages delta query (inbox folder)."""
+
+    name = "outlook"
+    folders = {"INBOX"}
+    SELECT = "id,conversationId,from,toRecipients,ccRecipients,subject,bodyPreview,receivedDateTime,isRead,categories,flag"
+
+    def __init__(self, outlook):
+        self.outlook = outlook
+
+    def initial(self, days: int, limit: int) -> tuple[list[dict], str]:
+        """Fetch inbox messages from the last `days` days. Returns (messages, cursor)."""
+        since = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        messages, _, cursor = self._delta(
+            "/me/mailFolders/inbox/messages/delta",
+            {"$select": self.SELECT, "$filter": f"receivedDateTime ge {since}"},
+        )
+        messages.sort(key=lambda m: -m['date'])
+        return messages[:limit], cursor
+
+    def changes(self, cursor: str) -> tuple[list[dict], set, str]:
+        """Follow the stored delta link. Returns (upserts, deleted_ids, cursor)."""
+        return self._delta(cursor, None)
+
+    def labels(self) -> dict:
+        """Outlook categories are stored by name, so there is nothing to map."""
+        return {}
+
+    def _delta(self, endpoint: str, params: dict | None) -> tuple[list[dict], set, str]:
+        upserts, deleted = [], set()
+        while True:
+            try:
+                page = self.outlook._request(
+                    "GET", endpoint.replace(self.outlook.GRAPH_API_URL, ""), params=params
+                )
+            except Exception as e:
+                # Graph answers an expired delta token with 410 Gone / syncStateNotFound
+                if '410' in str(e) or 'syncState' in str(e):
+                    raise CursorExpired(endpoint) from e
+                raise
+            for item in page.get('value', []):
+                if '@removed' in item:
+                    deleted.add(item['id'])
+                else:
+                    upserts.append(self._record(item))
+            if '@odata.nextLink' in page:
+                endpoint, params = page['@odata.nextLink'], None
+            else:
+                return upserts, deleted, page['@odata.deltaLink']
+
+    def _record(self, item: dict) -> dict:
+        sender = item.get('from', {}).get('emailAddress', {})
+        recipients = [
+            r.get('emailAddress', {}).get('address', '')
+            for r in item.get('toRecipients', []) + item.get('ccRecipients', [])
+        ]
+        labels = ["INBOX"] + item.get('categories', [])
+        if not item.get('isRead', True):
+            labels.append("UNREAD")
+        if item.get('flag', {}).get('flagStatus') == "flagged":
+            labels.append("STARRED")
+        received = item.get('receivedDateTime', '')
+        return {
+            'id': item['id'],
+            'thread_id': item.get('conversationId', ''),
+            'date': _parse_iso(received),
+            'date_header': received or 'Unknown',
+            'sender': f"{sender['name']} <{sender.get('address', '')}>" if sender.get('name') else sender.get('address', 'Unknown'),
+            'recipients': ", ".join(r for r in recipients if r),
+            'subject': item.get('subject') or 'No Subject',
+            'snippet': item.get('bodyPreview', ''),
+            'labels': labels,
+        }
+
+
+class Mailbox:
+    """SQLite mirror of one mailbox, refreshed by a delta source.
+
+    Reads call sync() first, which costs one delta request at most every
+    `max_age` seconds (or right after a mutating tool call).
+    """
+
+    def __init__(self, source, db_path: str = None, max_age: float = 60,
+                 window_days: int = 90, max_messages: int = 2000):
+        self.source = source
+        self.db_path = Path(db_path or f"data/mailbox_{source.name}.db")
+        self.max_age = max_age
+        self.window_days = window_days
+        self.max_messages = max_messages
+        self._lock = threading.RLock()  # database access
+        self._sync_lock = threading.Lock()  # one sync at a time; provider calls happen outside _lock
+        self._full_sync = None
+        self._synced_at = 0.0
+        self._conn = None
+        self._fts = False
+        self._subscribers = []
+
+    @classmethod
+    def for_tool(cls, email_tool, **kwargs):
+        """Build a mirror for a Gmail or Outlook tool instance (None if unsupported)."""
+        if hasattr(email_tool, "_get_service"):
+            return cls(GmailSource(email_tool), **kwargs)
+        if hasattr(email_tool, "_request") and hasattr(email_tool, "GRAPH_API_URL"):
+            return cls(OutlookSource(email_tool), **kwargs)
+        return None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """Open the database on first use (so constructing a Mailbox is free)."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.executescript(SCHEMA)
+            self._fts = search_index.ensure_index(conn)
+            self._conn = conn
+        return self._conn
+
+    # === Sync ===
+
+    def sync(self, force: bool = False, wait: bool = True) -> int:
+        """Apply the provider delta if the mirror is stale. Returns number of changed messages.
+
+        wait=False is for reads that can go to the API instead: a full sync
+        (first run, expired cursor) is started in the background and NotReady
+        is raised, and a sync already running elsewhere is not waited for.
+        """
+        if not force and time.time() - self._synced_at < self.max_age:
+            return 0
+        if not self._sync_lock.acquire(blocking=wait):
+            if self.ready:
+                return 0  # another thread is syncing; serve what the mirror has
+            raise NotReady("mailbox sync in progress")
+        try:
+            if not force and time.time() - self._synced_at < self.max_age:
+                return 0  # synced while we waited
+            return self._sync(background=not wait)
+        finally:
+            self._sync_lock.release()
+
+    @property
+    def ready(self) -> bool:
+        """Whether a full sync has completed, so the mirror can answer reads."""
+        with self._lock:
+            return self._get_state('cursor') is not None
+
+    def _sync(self, background: bool) -> int:
+        with self._lock:
+            cursor = self._get_state('cursor')
+        full = cursor is None
+        if not full:
+            try:
+                upserts, deleted, cursor = self.source.changes(cursor)
+            except CursorExpired:
+                full = True
+        if full:
+            if background:
+                self._start_full_sync()
+                raise NotReady("full mailbox sync started")
+            upserts, cursor = self.source.initial(self.window_days, self.max_messages)
+            labels = getattr(self.source, "labels", dict)()
+
+        with self._lock, self.db:
+            if full:
+                deleted = self._resync_deletions(upserts)
+                self._store_labels(labels)
+            self._upsert(upserts)
+            self.db.executemany("DELETE FROM messages WHERE id = ?", [(i,) for i in deleted])
+            self._set_state('cursor', cursor)
+            self._synced_at = time.time()
+        for callback in self._subscribers:
+            callback(upserts)
+        return len(upserts) + len(deleted)
+
+    def _start_full_sync(self):
+        """Run a full sync on a background thread (at most one at a time)."""
+        with self._lock:
+            if self._full_sync is not None and self._full_sync.is_alive():
+                return
+
+            def run():
+                try:
+                    self.sync(force=True)
+                except Exception:
+                    pass  # the next read starts another attempt
+
+            self._full_sync = threading.Thread(target=run, name="mailbox-sync", daemon=True)
+            self._full_sync.start()
+
+    def subscribe(self, callback):
+        """Call callback(records) with the new and changed messages after each sync."""
+        self._subscribers.append(callback)
+
+    def invalidate(self):
+        """Force a delta sync before the next read."""
+        self._synced_at = 0.0
+
+    def _resync_deletions(self, upserts: list[dict]) -> set:
+        """After a full resync, drop local messages in the covered window that no longer exist."""
+        if len(upserts) >= self.max_messages and upserts:
+            since = min(m['date'] for m in upserts)
+        else:
+            since = time.time() - self.window_days * 86400
+        self._set_state('covered_since', str(since))
+        fresh = {m['id'] for m in upserts}
+        rows = self.db.execute("SELECT id FROM messages WHERE date >= ?", (since,)).fetchall()
+        return {row['id'] for row in rows} - fresh
+
+    def _store_labels(self, labels: dict):
+        self.db.execute("DELETE FROM label_names")
+        self.db.executemany("INSERT INTO label_names (id, name) VALUES (?, ?)", labels.items())
+
+    def _resolve_label(self, name: str) -> str | None:
+        """Stored id for a user label name (Gmail writes spaces and slashes as dashes)."""
+        wanted = name.lower().replace(" ", "-").replace("/", "-")
+        for row in self.db.execute("SELECT id, name FROM label_names"):
+            if row['name'].lower().replace(" ", "-").replace("/", "-") == wanted:
+                return row['id']
+        return None
+
+    def _upsert(self, messages: list[dict]):
+        # Keep previously fetched bodies: only metadata columns are replaced
+        self.db.executemany(
+            """INSERT INTO messages (id, thread_id, date, date_header, sender, recipients,
+                                     subject, snippet, labels, unread)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET
+                   thread_id = excluded.thread_id, date = excluded.date,
+                   date_header = excluded.date_header, sender = excluded.sender,
+                   recipients = excluded.recipients, subject = excluded.subject,
+                   snippet = excluded.snippet, labels = excluded.labels,
+                   unread = excluded.unread""",
+            [(
+                m['id'], m['thread_id'], m['date'], m['date_header'], m['sender'],
+                m['recipients'], m['subject'], m['snippet'],
+                "," + ",".join(m['labels']) + ",", int("UNREAD" in m['labels']),
+            ) for m in messages],
+        )
+
+    def _get_state(self, key: str) -> str | None:
+        row = self.db.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+
+    def _set_state(self, key: str, value: str):
+        self.db.execute(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    # === Reading ===
+
+    def inbox(self, last: int = 10, unread: bool = False) -> list[dict]:
+        """Newest inbox messages, like the provider's read_inbox."""
+        sql = "SELECT * FROM messages WHERE labels LIKE '%,INBOX,%'"
+        if unread:
+            sql += " AND unread = 1"
+        with self._lock:
+            rows = self.db.execute(sql + " ORDER BY date DESC LIMIT ?", (last,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def search(self, query: str, max_results: int = 10) -> list[dict] | None:
+        """Search the mirror with Gmail query syntax (see tools.search_index).
+
+        Returns None when the query uses operators the index can't evaluate, or
+        when fewer than max_results matched locally and the query can match
+        mail the mirror doesn't hold (see covers()).
+        """
+        with self._lock:
+            rows = search_index.search(
+                self.db, query, max_results, resolve_label=self._resolve_label, fts=self._fts
+            )
+        if rows is None:
+            return None
+        if len(rows) < max_results and not self.covers(search_index.translate(query, fts=self._fts)):
+            return None
+        return rows
+
+    def covers(self, parsed) -> bool:
+        """Whether every message a translated query can match is in the mirror.
+
+        The mirror holds the synced window (covered_since onwards) of the
+        source's folders (Outlook: inbox only), never spam or trash.
+        """
+        with self._lock:
+            covered_since = float(self._get_state('covered_since') or time.time())
+        if parsed.after is None or parsed.after < covered_since:
+            return False
+        if parsed.labels & {"SPAM", "TRASH"}:
+            return False
+        folders = getattr(self.source, "folders", None)
+        return folders is None or bool(parsed.labels & folders)
+
+    def body(self, email_id: str) -> str | None:
+        """Cached body for a message, or None if it hasn't been fetched yet."""
+        with self._lock:
+            row = self.db.execute("SELECT body FROM messages WHERE id = ?", (email_id,)).fetchone()
+        return row['body'] if row else None
+
+    def labels_for(self, email_ids: list[str]) -> dict:
+        """Labels (including UNREAD) of each message in the mirror, by id."""
+        if not email_ids:
+            return {}
+        with self._lock:
+            rows = self.db.execute(
+                f"SELECT id, labels FROM messages WHERE id IN ({','.join('?' * len(email_ids))})", list(email_ids)
+            ).fetchall()
+        return {row['id']: row['labels'].strip(",") for row in rows}
+
+    def store_body(self, email_id: str, body: str):
+        """Cache a fetched body (ignored for messages outside the mirror, and for errors)."""
+        if not isinstance(body, str) or body.startswith("Error"):
+            return  # A failed fetch is retried next time rather than served from here
+        with self._lock, self.db:
+            self.db.execute("UPDATE messages SET body = ? WHERE id = ?", (body, email_id))
+
+    def format(self, emails: list[dict]) -> str:
+        """Format mirror rows the way the provider tools format email lists."""
+        if not emails:
+            return "No emails found."
+
+        output = [f"Found {len(emails)} email(s):\n"]
+        for i, email in enumerate(emails, 1):
+            status = "[UNREAD]" if email['unread'] else ""
+            output.append(f"{i}. {status} From: {email['sender']}")
+            output.append(f"   Subject: {email['subject']}")
+            output.append(f"   Date: {email['date_header']}")
+            output.append(f"   Preview: {email['snippet'][:80]}...")
+            output.append(f"   ID: {email['id']}\n")
+
+        return "\n".join(output)
+
+    # === Tool integration ===
+
+    def attach(self, email_tool):
+        """Serve the provider tool's read methods from this mirror."""
+
+        def read_inbox(original, *args, **kwargs):
+            params = call_arguments(original, args, kwargs)
+            try:
+                self.sync(wait=False)
+                emails = self.inbox(params['last'], params['unread'])
+            except Exception:
+                return original(*args, **kwargs)
+            # Short of a full page of (any) inbox mail, older mail exists only upstream
+            if len(emails) < params['last'] and not params['unread']:
+                return original(*args, **kwargs)
+            return self.format(emails)
+
+        def search_emails(original, *args, **kwargs):
+            params = call_arguments(original, args, kwargs)
+            try:
+                self.sync(wait=False)
+                emails = self.search(params['query'], params['max_results'])
+            except Exception:
+                emails = None
+            if emails is None:
+                return original(*args, **kwargs)
+            if not emails:
+                return f"No emails found matching query: {params['query']}"
+            return self.format(emails)
+
+        def get_email_body(original, *args, **kwargs):
+            email_id = call_arguments(original, args, kwargs)['email_id']
+            body = self.body(email_id)
+            if body is None:
+                body = original(*args, **kwargs)
+                self.store_body(email_id, body)
+            return body
+
+        def mutation(original, *args, **kwargs):
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.invalidate()
+
+        wrap_method(email_tool, "read_inbox", read_inbox)
+        wrap_method(email_tool, "search_emails", search_emails)
+        wrap_method(email_tool, "get_email_body", get_email_body)
+        for name in MUTATIONS:
+            wrap_method(email_tool, name, mutation)
+        email_tool.mailbox = self
+        return email_tool
+
+
+def _parse_iso(value: str) -> float:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
@@ -0,0 +1,266 @@
+"""
+Keyed, append-only backend for the agent's Memory tool.
+
+connectonion's Memory keeps every key as a section of one markdown file and
+re-parses the whole file on each read_memory/write_memory call. CRM init
+writes one contact:* key per contact, so reads slow down as memory grows.
+
+MemoryStore keeps the same data in data/memory.log, one JSON record per
+line, and holds the latest value of every key in a dict:
+- read_memory is a dict lookup (after a stat to pick up other processes' writes)
+- write_memory appends one line; the log is compacted (rewritten with live
+  keys only) once superseded records outweigh live ones
+- keys are also kept sorted, so prefix listing (read_memory("contact:*"))
+  is a bisect plus the matching range
+
+An existing memory.md (or the memory/ directory it splits into) is imported
+the first time the log is created.
+
+Usage:
+    from tools.memory_store import MemoryStore
+
+    memory = Memory(memory_file="data/memory.md")
+    MemoryStore().attach(memory)   # same tool methods, keyed storage
+"""
+
+import json
+import os
+import re
+import threading
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from pathlib import Path
+
+from .wrapping import wrap_method, call_arguments
+
+try:
+    import fcntl
+except ImportError:  # Windows: single process only
+    fcntl = None
+
+
+# Compact when superseded records take more than this many bytes and outweigh live data
+COMPACT_MIN_BYTES = 256 * 1024
+
+# Keys shown in "Memory not found" replies
+MAX_SUGGESTIONS = 50
+
+
+def safe_key(key: str) -> str:
+    """Key as Memory stores it: alphanumerics, '-' and '_' only, lowercased."""
+    return "".join(c for c in key if c.isalnum() or c in ('-', '_')).lower()
+
+
+class MemoryStore:
+    """Append-only key/value log with an in-memory index."""
+
+    def __init__(self, path: str = "data/memory.log", legacy_file: str = "data/memory.md"):
+        self.path = Path(path)
+        self.legacy_file = Path(legacy_file)
+        self._lock = threading.RLock()
+        self._values = {}
+        self._keys = []        # sorted, for prefix ranges
+        self._inode = None
+        self._offset = 0       # bytes of the log applied so far
+        self._live_bytes = 0   # bytes of the newest record of each key
+        self._sizes = {}       # key -> size of its newest record
+
+    # === Log ===
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialize appends and compaction across processes."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _refresh(self):
+        """Apply records appended since the last call; reload if the log was compacted."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            if self._inode is None:
+                self._import_legacy()
+            return
+        if st.st_ino != self._inode:
+            self._values, self._keys, self._sizes = {}, [], {}
+            self._inode, self._offset, self._live_bytes = st.st_ino, 0, 0
+        if st.st_size <= self._offset:
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(st.st_size - self._offset)
+        end = data.rfind(b"\n") + 1  # Only complete lines; a concurrent append may be mid-write
+        for line in data[:end].splitlines():
+            self._apply(line, len(line) + 1)
+        self._offset += end
+
+    def _apply(self, line: bytes, size: int):
+        try:
+            record = json.loads(line)
+            key, content = record["key"], record["content"]
+        except (ValueError, KeyError, TypeError):
+            return
+        if key not in self._values:
+            insort(self._keys, key)
+        self._values[key] = content
+        self._live_bytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+
+    def _append(self, records: list[tuple[str, str]]):
+        with self._file_lock():
+            with open(self.path, "ab") as f:
+                _write_records(f, records)
+            self._refresh()
+            if self._offset - self._live_bytes > max(COMPACT_MIN_BYTES, self._live_bytes):
+                self._compact()
+
+    def _compact(self):
+        """Rewrite the log with only the newest record of each key (caller holds the file lock)."""
+        tmp = self.path.with_suffix(".log.tmp")
+        with open(tmp, "wb") as f:
+            _write_records(f, ((key, self._values[key]) for key in self._keys))
+        os.replace(tmp, self.path)
+        self._inode = None  # Re-read the compacted file so offsets match it
+        self._refresh()
+
+    def _import_legacy(self):
+        """Seed a new log from memory.md or the memory/ directory it splits into."""
+        records = []
+        legacy_dir = Path(str(self.legacy_file).replace(".md", ""))
+        if legacy_dir.is_dir():
+            for file in sorted(legacy_dir.glob("*.md")):
+                records.append((file.stem, file.read_text(encoding="utf-8")))
+        elif self.legacy_file.exists():
+            records = list(_parse_sections(self.legacy_file.read_text(encoding="utf-8")).items())
+        with self._file_lock():
+            if not self.path.exists():
+                with open(self.path, "wb") as f:
+                    _write_records(f, records)
+        self._refresh()
+
+    # === Key/value API ===
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            self._refresh()
+            return self._values.get(key)
+
+    def put(self, key: str, content: str):
+        with self._lock:
+            self._append([(key, content)])
+
+    def keys(self, prefix: str = "") -> list[str]:
+        """Stored keys starting with prefix, sorted."""
+        with self._lock:
+            self._refresh()
+            start = bisect_left(self._keys, prefix)
+            end = bisect_left(self._keys, prefix + "\uffff") if prefix else len(self._keys)
+            return self._keys[start:end]
+
+    def items(self) -> list[tuple[str, str]]:
+        with self._lock:
+            self._refresh()
+            return [(key, self._values[key]) for key in self._keys]
+
+    # === Tool integration ===
+
+    def attach(self, memory):
+        """Serve a Memory tool's methods from this store (replies keep Memory's format)."""
+
+        def write_memory(original, *args, **kwargs):
+            params = call_arguments(original, args, kwargs)
+            key = safe_key(params['key'])
+            if not key:
+                return "Invalid key name. Use alphanumeric characters, hyphens, or underscores."
+            self.put(key, params['content'].strip())
+            return f"Memory saved: {key}"
+
+        def read_memory(original, *args, **kwargs):
+            raw = call_arguments(original, args, kwargs)['key']
+            key = safe_key(raw)
+            if raw.rstrip().endswith("*"):
+                return self._format_list(self.keys(key), f" matching {raw.strip()}")
+            content = self.get(key)
+            if content is not None:
+                return f"Memory: {key}\n\n{content}"
+            if not self._keys:
+                return f"Memory not found: {key}\nNo memories stored yet"
+            return f"Memory not found: {key}\nAvailable memories: {self._suggestions(key)}"
+
+        def list_memories(original, *args, **kwargs):
+            return self._format_list(self.keys())
+
+        def search_memory(original, *args, **kwargs):
+            pattern = call_arguments(original, args, kwargs)['pattern']
+            items = self.items()
+            if not items:
+                return "No memories to search"
+
+            regex = re.compile(pattern)
+            results = []
+            total_matches = 0
+            for key, content in items:
+                matches = [(n, line.strip()) for n, line in enumerate(content.split('\n'), 1) if regex.search(line)]
+                if matches:
+                    total_matches += len(matches)
+                    results.append(f"\n{key}:")
+                    results.extend(f"  Line {n}: {line}" for n, line in matches)
+
+            if not results:
+                return f"No matches found for pattern: {pattern}"
+            return "\n".join([f"Search Results ({total_matches} matches):"] + results)
+
+        wrap_method(memory, "write_memory", write_memory)
+        wrap_method(memory, "read_memory", read_memory)
+        wrap_method(memory, "list_memories", list_memories)
+        wrap_method(memory, "search_memory", search_memory)
+        memory.store = self
+        return memory
+
+    def _format_list(self, keys: list[str], label: str = "") -> str:
+        if not keys:
+            return "No memories stored yet" if not label else f"No memories{label}"
+        output = [f"Stored Memories{label} ({len(keys)}):"]
+        for i, key in enumerate(keys, 1):
+            output.append(f"{i}. {key} ({len(self._values[key])} bytes)")
+        return "\n".join(output)
+
+    def _suggestions(self, key: str) -> str:
+        """Keys sharing the longest prefix with key, capped at MAX_SUGGESTIONS."""
+        for length in range(len(key), -1, -1):
+            matches = self.keys(key[:length])
+            if matches:
+                break
+        shown = ", ".join(matches[:MAX_SUGGESTIONS])
+        if len(self._keys) > len(matches[:MAX_SUGGESTIONS]):
+            shown += f" (+{len(self._keys) - len(matches[:MAX_SUGGESTIONS])} more; list with read_memory(\"prefix*\"))"
+        return shown
+
+
+def _write_records(f, records):
+    f.write(b"".join(
+        json.dumps({"key": key, "content": content}, ensure_ascii=False).encode() + b"\n"
+        for key, content in records
+    ))
+
+
+def _parse_sections(content: str) -> dict:
+    """Sections of a memory.md file (## key headings), as Memory writes them."""
+    sections = {}
+    current_key = None
+    current_content = []
+    for line in content.split('\n'):
+        if line.startswith('## '):
+            if current_key:
+                sections[current_key] = '\n'.join(current_content).strip()
+            current_key = line[3:].strip()
+            current_content = []
+        elif current_key:
+            current_content.append(line)
+    if current_key:
+        sections[current_key] = '\n'.join(current_content).strip()
+    return sections
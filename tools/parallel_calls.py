@@ -0,0 +1,215 @@
+"""
+Concurrent execution of independent tool calls from one model turn.
+
+The agent loop runs the tool calls of a turn one after another. Before
+proposing a meeting the agent asks for free slots, recent emails with the
+attendee and what memory says about them in a single turn, and those calls
+don't depend on each other. ParallelCalls starts them together:
+
+- on before_tools, every read-only call of the turn (PARALLEL_SAFE) is
+  submitted to a thread pool
+- the loop then executes the calls in order as usual; each wrapped method
+  picks up its already running result, so results, events and approvals
+  reach the model in the order it asked for them
+- a started call has a timeout (TIMEOUTS, default `timeout`); one that runs
+  past it fails with TimeoutError instead of stalling the turn. The thread
+  can't be stopped, so it finishes in the background, but it gives up its
+  provider slot (quota is still enforced by the rate limiter)
+- at most `provider_limit` started provider calls run at once, to stay
+  under Gmail and Graph quotas
+- started calls belong to the thread running the turn, so pooled agents
+  in host mode don't pick up or discard each other's
+
+Only the calls of a turn with two or more parallel-safe calls are started
+early. A single call, mutations, shell commands and anything not listed
+run inline as before, and so does every call made outside an agent turn
+(the CLI's inbox, today and unanswered commands) or inside another tool
+(CRM init, get_email_bodies).
+
+Usage:
+    from tools.parallel_calls import ParallelCalls
+
+    parallel = ParallelCalls()
+    parallel.attach(gmail)
+    parallel.attach(memory, provider=False)
+    Agent(..., on_events=parallel.events())
+"""
+
+import inspect
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from .result_cache import READS
+from .wrapping import wrap_method, call_arguments
+
+
+# Methods with no side effects, safe to start before their turn comes
+PARALLEL_SAFE = set(READS) | {"read_memory", "search_memory", "list_memories"}
+
+# Seconds before a call is given up on (others use the default timeout)
+TIMEOUTS = {
+    "get_email_bodies": 90,
+    "search_emails": 45,
+}
+
+
+class _Call:
+    """A call started on the pool, and whether it holds a provider slot."""
+
+    __slots__ = ("original", "provider", "future", "started", "holds_slot", "abandoned")
+
+    def __init__(self, original, provider: bool):
+        self.original = original
+        self.provider = provider
+        self.future = None
+        self.started = time.monotonic()
+        self.holds_slot = False
+        self.abandoned = False  # its turn stopped waiting for it
+
+
+class ParallelCalls:
+    """Starts the read-only tool calls of a turn together on a bounded pool."""
+
+    def __init__(self, workers: int = 8, provider_limit: int = 4, timeout: float = 30,
+                 timeouts: dict = None):
+        self.timeout = timeout
+        self.timeouts = {**TIMEOUTS, **(timeouts or {})}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tool")
+        self._provider = threading.BoundedSemaphore(provider_limit)
+        self._methods = {}  # name -> (original method, counts against the provider limit)
+        self._pending = {}  # thread id -> {(name, args) -> [_Call]}; present while a turn runs
+        self._lock = threading.Lock()
+        self._inside = threading.local()
+        self.batches = 0
+        self.started = 0
+        self.timed_out = 0
+
+    def attach(self, tool, provider: bool = True):
+        """Route the tool's parallel-safe methods through the pool. Attach after every other layer."""
+        for name in PARALLEL_SAFE:
+            original = wrap_method(tool, name, self._serve(name))
+            if original is not None:
+                self._methods[name] = (original, provider)
+        tool.parallel_calls = self
+        return tool
+
+    # === Turn lifecycle ===
+
+    def start(self, calls: list[tuple[str, dict]]) -> int:
+        """Begin this thread's turn and submit its parallel-safe calls. Returns how many were started."""
+        eligible = []
+        for name, args in calls:
+            if name not in self._methods:
+                continue
+            original = self._methods[name][0]
+            accepted = inspect.signature(original).parameters
+            try:
+                params = call_arguments(original, (), {k: v for k, v in args.items() if k in accepted})
+            except TypeError:
+                continue  # malformed arguments fail when the loop runs the call
+            eligible.append((name, params))
+
+        self.discard()
+        with self._lock:
+            pending = self._pending[threading.get_ident()] = {}
+            # A single call gains nothing from running early
+            if len(eligible) < 2:
+                return 0
+            for name, params in eligible:
+                call = _Call(*self._methods[name])
+                call.future = self._pool.submit(self._run, call, params)
+                pending.setdefault(_key(name, params), []).append(call)
+            self.batches += 1
+            self.started += len(eligible)
+        return len(eligible)
+
+    def discard(self):
+        """End this thread's turn, forgetting results nobody claimed (the turn was stopped or a call rejected)."""
+        with self._lock:
+            for queued in self._pending.pop(threading.get_ident(), {}).values():
+                for call in queued:
+                    call.future.cancel()
+                    call.abandoned = True
+                    self._release(call)
+
+    def events(self) -> list:
+        """Agent event handlers: start the turn's calls before they run, drop leftovers after."""
+        from connectonion import before_tools, after_tools
+
+        def start_turn(agent):
+            message = agent.current_session['messages'][-1]
+            calls = []
+            for call in message.get('tool_calls', []):
+                try:
+                    calls.append((call['function']['name'], json.loads(call['function']['arguments'] or "{}")))
+                except (KeyError, ValueError):
+                    continue
+            self.start(calls)
+
+        def finish_turn(agent):
+            self.discard()
+
+        return [before_tools(start_turn), after_tools(finish_turn)]
+
+    # === Calls ===
+
+    def timeout_for(self, name: str) -> float:
+        return self.timeouts.get(name, self.timeout)
+
+    def _run(self, call: _Call, params: dict):
+        self._inside.active = True
+        try:
+            if not call.provider:
+                return call.original(**params)
+            self._provider.acquire()
+            with self._lock:
+                call.holds_slot = True
+                if call.abandoned:
+                    self._release(call)
+                    return None
+            try:
+                return call.original(**params)
+            finally:
+                with self._lock:
+                    self._release(call)
+        finally:
+            self._inside.active = False
+
+    def _release(self, call: _Call):
+        """Give back the call's provider slot, once. Caller holds self._lock."""
+        if call.holds_slot:
+            call.holds_slot = False
+            self._provider.release()
+
+    def _serve(self, name: str):
+        def around(original, *args, **kwargs):
+            if getattr(self._inside, "active", False):
+                return original(*args, **kwargs)
+            params = call_arguments(original, args, kwargs)
+            with self._lock:
+                pending = self._pending.get(threading.get_ident(), {})
+                queued = pending.get(_key(name, params), [])
+                # Only a call started for this very method (another tool may share the name)
+                call = next((c for c in queued if c.original == original), None)
+                if call is not None:
+                    queued.remove(call)
+            if call is None:
+                return original(*args, **kwargs)
+
+            timeout = self.timeout_for(name)
+            try:
+                return call.future.result(timeout=max(timeout - (time.monotonic() - call.started), 0))
+            except FutureTimeout:
+                call.future.cancel()
+                with self._lock:
+                    call.abandoned = True
+                    self._release(call)
+                    self.timed_out += 1
+                raise TimeoutError(f"{name} did not finish within {timeout:g}s") from None
+        return around
+
+
+def _key(name: str, params: dict) -> tuple:
+    return name, tuple(sorted((k, repr(v)) for k, v in params.items()))
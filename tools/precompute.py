@@ -0,0 +1,114 @@
+"""
+Background pre-computation of the morning commands.
+
+`email today` and `email unanswered` block on provider and LLM work every
+time they run. PrecomputeWorker runs those jobs on a schedule instead (first
+a mailbox delta sync, then the briefing and the unanswered list) and keeps
+the results in data/precomputed.json. The interactive commands serve a
+stored result straight away with its freshness, and only compute inline
+when there is none or it has gone stale.
+
+The store is a file, so a worker started with `email worker` in another
+terminal serves the CLI as well as one started alongside `email host`.
+A failing job keeps its last good result and is retried on the next run.
+
+Usage:
+    from tools.precompute import Precomputed, PrecomputeWorker
+
+    store = Precomputed()
+    worker = PrecomputeWorker(store, [("today", build_today)], interval=300)
+    worker.start()                       # daemon thread
+    store.get("today", max_age=900)      # {"result": ..., "computed_at": ...} or None
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+class Precomputed:
+    """Named results with the time they were computed, shared through a JSON file."""
+
+    def __init__(self, path: str = "data/precomputed.json"):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def get(self, name: str, max_age: float) -> dict | None:
+        """{"result", "computed_at"} for `name` if computed within `max_age` seconds."""
+        entry = self._load().get(name)
+        if entry and time.time() - entry["computed_at"] <= max_age:
+            return entry
+        return None
+
+    def put(self, name: str, result: str, computed_at: float = None):
+        with self._lock:
+            data = self._load()
+            data[name] = {"result": result, "computed_at": computed_at or time.time()}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def _load(self) -> dict:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+
+class PrecomputeWorker:
+    """Runs `jobs` (name, fn) in order every `interval` seconds and stores what they return.
+
+    Jobs returning None (like the mailbox sync) are run for their effect and not stored.
+    """
+
+    def __init__(self, store: Precomputed, jobs: list, interval: float = 300, on_run=None):
+        self.store = store
+        self.jobs = jobs
+        self.interval = interval
+        self.errors = {}  # job name -> last error, cleared when it succeeds again
+        self._on_run = on_run  # on_run(name, seconds, error)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        for name, job in self.jobs:
+            started = time.monotonic()
+            error = None
+            try:
+                result = job()
+                if result is not None:
+                    self.store.put(name, result)
+                self.errors.pop(name, None)
+            except Exception as e:
+                error = self.errors[name] = f"{type(e).__name__}: {e}"
+            if self._on_run:
+                self._on_run(name, time.monotonic() - started, error)
+
+    def run_forever(self):
+        """Run the jobs now and then every `interval` seconds until stop()."""
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+    def start(self) -> threading.Thread:
+        """Run in a daemon thread (exits with the process)."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="precompute", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def freshness(computed_at: float, now: float = None) -> str:
+    """'as of 09:14 (3 min ago)' for a stored result."""
+    minutes = int(((now or time.time()) - computed_at) // 60)
+    ago = "just now" if minutes < 1 else f"{minutes} min ago" if minutes < 60 else f"{minutes // 60} h ago"
+    return f"as of {datetime.fromtimestamp(computed_at).strftime('%H:%M')} ({ago})"
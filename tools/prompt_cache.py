@@ -0,0 +1,96 @@
+"""
+Prompt-prefix caching for the agent's LLM calls.
+
+Every request of a tool loop resends the tool schemas, the system prompt and
+the conversation so far; only the tail is new. PromptCache marks cache
+breakpoints on a copy of each request so the provider serves the unchanged
+prefix from its prompt cache:
+
+- after the system prompt (tools render before it, so schemas are covered)
+- on the newest message, so the next iteration of the same turn reuses
+  everything up to it
+
+The session's own messages are never modified. It also keeps per-call
+figures (latency, input tokens, cached tokens) in `calls`, which the agent
+logs after each turn and benchmarks/bench_prompt_variants.py reports.
+
+Only applies to OpenAI-compatible clients (co/ managed models, which route
+Claude through the managed backend); other LLMs are left alone.
+
+Usage:
+    from tools.prompt_cache import PromptCache
+
+    PromptCache().attach(agent.llm)
+"""
+
+import threading
+import time
+
+from .wrapping import wrap_method
+
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def with_breakpoints(messages: list[dict]) -> list[dict]:
+    """A copy of `messages` with cache breakpoints on the system prompt and the newest message."""
+    marked = [dict(m) for m in messages]
+    targets = [i for i, m in enumerate(marked) if m.get("role") == "system"][:1]
+    if len(marked) > 1 and marked[-1].get("role") in ("user", "tool"):
+        targets.append(len(marked) - 1)
+    for i in targets:
+        content = marked[i].get("content")
+        if isinstance(content, str) and content:
+            marked[i]["content"] = [{"type": "text", "text": content, "cache_control": CACHE_CONTROL}]
+    return marked
+
+
+class PromptCache:
+    """Adds cache breakpoints to LLM requests and records what each call cost."""
+
+    def __init__(self, keep: int = 200):
+        self.keep = keep
+        self.calls = []  # {"seconds", "input_tokens", "cached_tokens"} per call, newest last
+        self._lock = threading.Lock()
+        self._reported = 0
+
+    @staticmethod
+    def supports(llm) -> bool:
+        """Whether the LLM sends OpenAI-style messages (content parts pass through)."""
+        return hasattr(llm, "client") and hasattr(getattr(llm, "client"), "chat")
+
+    def attach(self, llm):
+        def complete(original, messages, tools=None, **kwargs):
+            started = time.monotonic()
+            response = original(with_breakpoints(messages), tools=tools, **kwargs)
+            usage = getattr(response, "usage", None)
+            with self._lock:
+                self.calls.append({
+                    "seconds": time.monotonic() - started,
+                    "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+                    "cached_tokens": getattr(usage, "cached_tokens", 0) or 0,
+                })
+                del self.calls[:-self.keep]
+            return response
+
+        if self.supports(llm):
+            wrap_method(llm, "complete", complete)
+        llm.prompt_cache = self
+        return llm
+
+    def summary(self, calls: list[dict] = None) -> str:
+        calls = self.calls if calls is None else calls
+        if not calls:
+            return "Prompt cache: no LLM calls"
+        total = sum(c["input_tokens"] for c in calls)
+        cached = sum(c["cached_tokens"] for c in calls)
+        seconds = sum(c["seconds"] for c in calls)
+        return (f"Prompt cache: {len(calls)} LLM call(s), {total:,} input tokens, {cached:,} cached "
+                f"({cached / total if total else 0:.0%}), {seconds / len(calls):.1f}s per call")
+
+    def report_turn(self) -> str | None:
+        """Summary of the calls since the last report, or None if there were none."""
+        with self._lock:
+            calls = self.calls[self._reported:] if self._reported <= len(self.calls) else self.calls
+            self._reported = len(self.calls)
+        return self.summary(calls) if calls else None
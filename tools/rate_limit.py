@@ -0,0 +1,314 @@
+"""
+Quota-aware rate limiting of provider API requests.
+
+Gmail charges every request in quota units against a per-user budget
+(messages.get 5, messages.send 100, history.list 2, ...), Google Calendar
+counts queries, and Microsoft Graph throttles each mailbox by request count.
+Nothing kept track, so a contact scan or a busy host ran straight into 429s
+and then sat in the SDK's slow backoff. RateLimiter keeps one token bucket
+per API for the whole process and charges each request its cost before it
+goes out:
+
+- costs are per API request (COSTS, by Google method id), not per tool
+  method: one get_all_contacts call is a few thousand requests, and each
+  page is charged as it is fetched
+- Gmail and Graph batch requests are charged for every request inside them
+- a 429 (or Google's rateLimitExceeded 403) pauses the bucket for the
+  server's Retry-After, halves its rate and retries the request; the rate
+  climbs back toward the quota with every success, so throughput settles
+  just under the ceiling instead of alternating bursts and error storms
+
+The limiter hooks the clients the tools already use: `_get_service()` of
+the Google tools (every request and batch built from the service) and
+`_request()` of the Graph tools. Those are also what the mailbox mirror,
+contact scan and batch body reads go through, so the main agent, the
+crm-init sub-agent and the CLI commands all draw from the same buckets.
+Calls that aren't provider requests can draw from a bucket of their own
+with call(): a parallel CRM init spaces its LLM and web calls on "crm_init".
+
+Usage:
+    from tools.rate_limit import RateLimiter
+
+    limiter = RateLimiter()
+    limiter.attach(gmail)
+    limiter.attach(calendar)
+    limiter.stats()   # per API: rate, units used, time waited, throttles
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from .wrapping import wrap_method
+
+
+# Sustained units per second and burst size, per API
+QUOTAS = {
+    "gmail": (250, 250),      # 15,000 quota units per user per minute
+    "calendar": (10, 20),     # 600 queries per user per minute
+    "graph": (16, 40),        # 10,000 requests per mailbox per 10 minutes
+    "crm_init": (4, 4),       # LLM and web calls of a parallel CRM init
+}
+
+# Quota units per Gmail request; other Google methods cost DEFAULT_COST
+COSTS = {
+    "gmail.users.getProfile": 1,
+    "gmail.users.labels.list": 1,
+    "gmail.users.labels.get": 1,
+    "gmail.users.labels.create": 5,
+    "gmail.users.history.list": 2,
+    "gmail.users.messages.list": 5,
+    "gmail.users.messages.get": 5,
+    "gmail.users.messages.attachments.get": 5,
+    "gmail.users.messages.modify": 5,
+    "gmail.users.messages.trash": 5,
+    "gmail.users.messages.batchModify": 50,
+    "gmail.users.messages.send": 100,
+    "gmail.users.threads.list": 10,
+    "gmail.users.threads.get": 10,
+    "gmail.users.threads.modify": 10,
+    "gmail.users.drafts.create": 10,
+    "gmail.users.drafts.send": 100,
+}
+DEFAULT_COST = 1
+
+MAX_RETRIES = 3  # retries of a throttled request before its 429 is raised
+MAX_PAUSE = 60.0  # seconds; longest pause without a Retry-After
+
+
+class TokenBucket:
+    """Cost-weighted token bucket whose rate backs off on throttling and recovers on success."""
+
+    def __init__(self, rate: float, burst: float, min_rate: float = None):
+        self.ceiling = rate
+        self.rate = rate
+        self.min_rate = min_rate or rate / 16
+        self.burst = burst
+        self.tokens = burst
+        self.units = 0
+        self.waited = 0.0
+        self.throttles = 0
+        self._strikes = 0  # throttles since the last success, for backoff without Retry-After
+        self._paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, units: float = 1) -> float:
+        """Wait until `units` can be spent and spend them. Returns seconds waited.
+
+        A request costlier than the burst waits for a full bucket and leaves it
+        in debt, so the requests after it wait for the rest.
+        """
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                need = min(units, self.burst)
+                if now >= self._paused_until and self.tokens >= need:
+                    self.tokens -= units
+                    self.units += units
+                    waited = now - started
+                    self.waited += waited
+                    return waited
+                delay = max(self._paused_until - now, (need - self.tokens) / self.rate)
+            time.sleep(min(delay, 1.0))
+
+    def throttled(self, retry_after: float = None):
+        """The server refused a request: pause, and halve the rate."""
+        with self._lock:
+            self.throttles += 1
+            self._strikes += 1
+            pause = retry_after if retry_after is not None else min(MAX_PAUSE, 2.0 ** self._strikes)
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+    def succeeded(self):
+        """A request went through: move the rate back toward the ceiling."""
+        with self._lock:
+            self._strikes = 0
+            if self.rate < self.ceiling:
+                self.rate = min(self.ceiling, self.rate + self.ceiling / 20)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate": round(self.rate, 2),
+                "ceiling": self.ceiling,
+                "units": self.units,
+                "waited_seconds": round(self.waited, 3),
+                "throttles": self.throttles,
+            }
+
+
+class RateLimiter:
+    """One token bucket per provider API, shared by every tool attached to it."""
+
+    def __init__(self, quotas: dict = None, costs: dict = None, max_retries: int = MAX_RETRIES):
+        self.quotas = {**QUOTAS, **(quotas or {})}
+        self.costs = {**COSTS, **(costs or {})}
+        self.max_retries = max_retries
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, api: str) -> TokenBucket:
+        with self._lock:
+            if api not in self._buckets:
+                rate, burst = self.quotas.get(api, (10, 20))
+                self._buckets[api] = TokenBucket(rate, burst)
+            return self._buckets[api]
+
+    def cost(self, method_id: str) -> int:
+        return self.costs.get(method_id, DEFAULT_COST)
+
+    def call(self, api: str, units: float, run):
+        """run() once `units` are available, retrying after the server throttles it."""
+        bucket = self.bucket(api)
+        for attempt in range(self.max_retries + 1):
+            bucket.take(units)
+            try:
+                result = run()
+            except Exception as e:
+                throttled, retry_after = rate_limited(e)
+                if not throttled:
+                    raise
+                bucket.throttled(retry_after)
+                if attempt == self.max_retries:
+                    raise
+                continue
+            bucket.succeeded()
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {api: bucket.stats() for api, bucket in buckets.items()}
+
+    def summary(self) -> str:
+        return "Rate limits: " + ", ".join(
+            f"{api} {s['units']} units at {s['rate']:g}/{s['ceiling']:g}/s, "
+            f"waited {s['waited_seconds']:.1f}s, {s['throttles']} throttled"
+            for api, s in self.stats().items())
+
+    # === Tool integration ===
+
+    def attach(self, tool):
+        """Charge the tool's API requests to the shared buckets (Google service tools and Graph tools)."""
+
+        def get_service(original, *args, **kwargs):
+            service = original(*args, **kwargs)
+            if not getattr(service, "_rate_limited", False):
+                self._limit_service(service)
+            return service
+
+        def request(original, *args, **kwargs):
+            endpoint = str(args[1] if len(args) > 1 else kwargs.get("endpoint", ""))
+            body = kwargs.get("json") or {}
+            units = len(body.get("requests", ())) if endpoint.startswith("/$batch") else 1
+            return self.call("graph", max(units, 1), lambda: original(*args, **kwargs))
+
+        if hasattr(tool, "_get_service"):
+            wrap_method(tool, "_get_service", get_service)
+        elif hasattr(tool, "_request"):
+            wrap_method(tool, "_request", request)
+        tool.rate_limiter = self
+        return tool
+
+    def _limit_service(self, service):
+        """Route every request and batch built from a Google API service through the buckets."""
+        build_request = service._requestBuilder
+
+        def request_builder(*args, **kwargs):
+            request = build_request(*args, **kwargs)
+            # A subclass rather than a patched execute: list_next() copies the request
+            request.__class__ = _limited_class(type(request))
+            request._rate_limiter = self
+            return request
+
+        service._requestBuilder = request_builder
+        new_batch = getattr(service, "new_batch_http_request", None)
+        if new_batch is not None:
+            service.new_batch_http_request = lambda *a, **kw: self._limit_batch(new_batch(*a, **kw))
+        service._rate_limited = True
+
+    def _limit_batch(self, batch):
+        """Charge a batch for the requests in it; a throttled request inside pauses the bucket."""
+        execute = batch.execute
+        callback = batch._callback
+
+        def requests():
+            return [r for r in batch._requests.values() if r is not None]
+
+        def api():
+            return _api(next((r.methodId for r in requests() if r.methodId), ""))
+
+        def on_response(request_id, response, exception):
+            if exception is not None:
+                throttled, retry_after = rate_limited(exception)
+                if throttled:
+                    self.bucket(api()).throttled(retry_after)
+            if callback is not None:
+                callback(request_id, response, exception)
+
+        def limited(*args, **kwargs):
+            units = sum(self.cost(r.methodId or "") for r in requests())
+            return self.call(api(), max(units, 1), lambda: execute(*args, **kwargs))
+
+        batch._callback = on_response
+        batch.execute = limited
+        return batch
+
+
+_limited_classes = {}
+
+
+def _limited_class(request_class):
+    """Subclass of a Google HttpRequest class whose execute() goes through the request's rate limiter."""
+    if request_class not in _limited_classes:
+        class LimitedRequest(request_class):
+            def execute(self, *args, **kwargs):
+                method_id = self.methodId or ""
+                limiter = self._rate_limiter
+                run = lambda: super(LimitedRequest, self).execute(*args, **kwargs)
+                return limiter.call(_api(method_id), limiter.cost(method_id), run)
+
+        _limited_classes[request_class] = LimitedRequest
+    return _limited_classes[request_class]
+
+
+def _api(method_id: str) -> str:
+    """Bucket for a Google method id: "gmail.users.messages.get" -> "gmail"."""
+    return method_id.split(".")[0] or "google"
+
+
+def rate_limited(error) -> tuple[bool, float | None]:
+    """(whether the error is the server throttling us, its Retry-After in seconds or None)."""
+    resp = getattr(error, "resp", None)  # googleapiclient HttpError
+    if resp is not None:
+        status = getattr(resp, "status", None)
+        content = getattr(error, "content", b"") or b""
+        if status == 429 or (status == 403 and b"ateLimitExceeded" in content):
+            return True, retry_after(resp.get("retry-after") if hasattr(resp, "get") else None)
+        return False, None
+    response = getattr(error, "response", None)  # httpx / requests HTTPStatusError
+    status = getattr(error, "status", None) or getattr(response, "status_code", None)
+    if status == 429:
+        headers = getattr(response, "headers", None) or {}
+        return True, retry_after(headers.get("Retry-After"))
+    return False, None
+
+
+def retry_after(value) -> float | None:
+    """Seconds from a Retry-After header (delta seconds or an HTTP date), or None."""
+    if value in (None, ""):
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
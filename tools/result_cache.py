@@ -0,0 +1,190 @@
+"""
+In-process cache for provider tool results.
+
+Within one conversation the agent asks for the same inbox listing, search,
+email body or day's events again and again (/today, /inbox and follow-up
+questions all start the same way), and every repeat went to the network.
+ResultCache keeps the text each read returned, keyed on method + arguments:
+
+- every cached read has its own TTL (READS); bodies hardly ever change, the
+  inbox listing does
+- a mutating call drops exactly the reads it can make stale (INVALIDATES):
+  mark_read clears listings and the unread count but not bodies, calendar
+  changes clear calendar reads only
+- a read that was in flight while a mutation ran is not stored
+
+Hits, misses and the provider time saved are kept in `stats()`; the agent
+logs them after every turn.
+
+Usage:
+    from tools.result_cache import ResultCache
+
+    cache = ResultCache()
+    cache.attach(gmail)
+    cache.attach(calendar)   # gmail.read_inbox() twice in a row calls the API once
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from .wrapping import wrap_method, call_arguments
+
+
+# Read methods (all return text) and how long their results stay fresh, in seconds
+READS = {
+    # Email
+    "read_inbox": 60,
+    "search_emails": 120,
+    "get_email_body": 3600,
+    "get_email_bodies": 3600,
+    "count_unread": 60,
+    "get_unanswered_emails": 300,
+    "get_sent_emails": 300,
+    "get_emails_with_label": 120,
+    "get_labels": 900,
+    # Calendar
+    "get_today_events": 300,
+    "list_events": 300,
+    "get_event": 300,
+    "get_upcoming_meetings": 300,
+    "find_free_slots": 300,
+    "check_availability": 300,
+}
+
+_LISTINGS = ("read_inbox", "search_emails", "get_emails_with_label")
+_SENT = ("read_inbox", "search_emails", "get_sent_emails", "get_unanswered_emails")
+_CALENDAR = ("get_today_events", "list_events", "get_event", "get_upcoming_meetings",
+             "find_free_slots", "check_availability")
+
+# Mutating methods and the reads whose results they can change
+INVALIDATES = {
+    "send": _SENT,
+    "reply": _SENT,
+    "mark_read": _LISTINGS + ("count_unread",),
+    "mark_unread": _LISTINGS + ("count_unread",),
+    "archive_email": _LISTINGS + ("count_unread", "get_unanswered_emails"),
+    "star_email": _LISTINGS,
+    "unstar_email": _LISTINGS,
+    "add_label": _LISTINGS + ("count_unread",),
+    "remove_label": _LISTINGS + ("count_unread",),
+    "create_event": _CALENDAR,
+    "create_meet": _CALENDAR,
+    "create_teams_meeting": _CALENDAR,
+    "update_event": _CALENDAR,
+    "delete_event": _CALENDAR,
+}
+
+
+class ResultCache:
+    """TTL cache of tool results with mutation-aware invalidation."""
+
+    def __init__(self, ttls: dict = None, max_entries: int = 256):
+        self.ttls = {**READS, **(ttls or {})}
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (method, args) -> (stored_at, result, call seconds)
+        self._generations = {}  # method -> bumped on every invalidation
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.saved = 0.0
+        self.invalidations = 0
+
+    def get(self, method: str, params: dict):
+        """(result, call seconds) for a fresh entry, or None."""
+        key = _key(method, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, result, elapsed = entry
+            if time.monotonic() - stored_at > self.ttls[method]:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result, elapsed
+
+    def put(self, method: str, params: dict, result, elapsed: float, generation: int = None):
+        """Store a result, unless `method` was invalidated since `generation` was read."""
+        with self._lock:
+            if generation is not None and self._generations.get(method, 0) != generation:
+                return
+            key = _key(method, params)
+            self._entries[key] = (time.monotonic(), result, elapsed)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, methods=None) -> int:
+        """Drop the entries of the given read methods (all of them if None). Returns how many."""
+        with self._lock:
+            methods = set(self.ttls if methods is None else methods)
+            for method in methods:
+                self._generations[method] = self._generations.get(method, 0) + 1
+            stale = [key for key in self._entries if key[0] in methods]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / calls if calls else 0.0,
+                "saved_seconds": round(self.saved, 3),
+                "invalidated": self.invalidations,
+                "entries": len(self._entries),
+            }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (f"Result cache: {s['hits']}/{s['hits'] + s['misses']} hits ({s['hit_rate']:.0%}), "
+                f"saved {s['saved_seconds']:.1f}s, {s['invalidated']} invalidated, {s['entries']} entries")
+
+    # === Tool integration ===
+
+    def attach(self, tool):
+        """Serve the tool's reads from the cache and invalidate on its mutations."""
+
+        def read(name):
+            def around(original, *args, **kwargs):
+                params = call_arguments(original, args, kwargs)
+                cached = self.get(name, params)
+                if cached is not None:
+                    result, elapsed = cached
+                    with self._lock:
+                        self.hits += 1
+                        self.saved += elapsed
+                    return result
+                with self._lock:
+                    self.misses += 1
+                    generation = self._generations.get(name, 0)
+                started = time.monotonic()
+                result = original(*args, **kwargs)
+                if isinstance(result, str):
+                    self.put(name, params, result, time.monotonic() - started, generation)
+                return result
+            return around
+
+        def mutation(name):
+            def around(original, *args, **kwargs):
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    # Also on failure: the provider may have applied part of the change
+                    self.invalidate(INVALIDATES[name])
+            return around
+
+        for name in self.ttls:
+            wrap_method(tool, name, read(name))
+        for name in INVALIDATES:
+            wrap_method(tool, name, mutation(name))
+        tool.result_cache = self
+        return tool
+
+
+def _key(method: str, params: dict) -> tuple:
+    return method, tuple(sorted((name, repr(value)) for name, value in params.items()))
@@ -0,0 +1,267 @@
+"""
+Full-text search over the local mailbox mirror.
+
+An SQLite FTS5 index (subject, sender, recipients, snippet, body) sits next to
+the messages table and is kept in sync by triggers. Gmail queries are
+translated into an FTS MATCH expression plus SQL filters:
+
+    from: to: cc: subject:       column-scoped phrase match
+    bare words, "quoted phrases" ranked full-text match (BM25)
+    after: before: newer_than: older_than:
+    is:unread is:read is:starred is:important
+    in: label:                   system labels and user labels by name
+    OR, -negation
+
+Like Gmail, results leave out trash and spam unless the query asks for
+them with in: or label:.
+
+Anything else (has:, filename:, size, grouping) returns None so the caller
+can fall back to the provider API. Without FTS5 the same terms run as LIKE.
+"""
+
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE messages_fts USING fts5(
+    subject, sender, recipients, snippet, body,
+    content='messages', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, subject, sender, recipients, snippet, body)
+    VALUES (new.rowid, new.subject, new.sender, new.recipients, new.snippet, new.body);
+END;
+CREATE TRIGGER messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, subject, sender, recipients, snippet, body)
+    VALUES ('delete', old.rowid, old.subject, old.sender, old.recipients, old.snippet, old.body);
+END;
+CREATE TRIGGER messages_fts_update AFTER UPDATE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, subject, sender, recipients, snippet, body)
+    VALUES ('delete', old.rowid, old.subject, old.sender, old.recipients, old.snippet, old.body);
+    INSERT INTO messages_fts(rowid, subject, sender, recipients, snippet, body)
+    VALUES (new.rowid, new.subject, new.sender, new.recipients, new.snippet, new.body);
+END;
+INSERT INTO messages_fts(messages_fts) VALUES ('rebuild');
+"""
+
+# BM25 column weights: subject, sender, recipients, snippet, body
+WEIGHTS = (10.0, 5.0, 3.0, 2.0, 1.0)
+
+# Gmail system labels; other label: values are resolved by name
+SYSTEM_LABELS = {"INBOX", "SENT", "STARRED", "IMPORTANT", "UNREAD", "DRAFT", "SPAM", "TRASH"}
+
+# Left out of every search that doesn't name them
+HIDDEN_LABELS = ("TRASH", "SPAM")
+
+_TOKEN = re.compile(r'-?[\w.]+:"[^"]*"|-?"[^"]*"|\S+')
+
+
+def ensure_index(conn: sqlite3.Connection) -> bool:
+    """Create the FTS index (and backfill it) if missing. Returns False without FTS5."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'"
+    ).fetchone()
+    if exists:
+        return True
+    try:
+        with conn:
+            conn.executescript(FTS_SCHEMA)
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+@dataclass
+class Term:
+    """One query term: an FTS expression and/or an SQL condition."""
+    fts: str = None
+    sql: str = None
+    params: list = field(default_factory=list)
+    negate: bool = False
+    text: bool = False  # bare words / subject: — these make the result ranked
+    after: float = None  # lower date bound set by after: / newer_than:
+    label: str = None  # label required by in: / label:
+
+
+@dataclass
+class Query:
+    """A translated Gmail query."""
+    match: str = None
+    where: list = field(default_factory=list)
+    params: list = field(default_factory=list)
+    after: float = None  # lower date bound every match satisfies
+    labels: set = field(default_factory=set)  # labels every match carries
+    ranked: bool = False
+
+
+def translate(query: str, resolve_label=None, fts: bool = True) -> Query | None:
+    """Translate a Gmail query into a Query, or None if it uses unsupported syntax.
+
+    Args:
+        query: Gmail search query
+        resolve_label: Callable mapping a label name to its stored id (or None)
+        fts: Whether the FTS index is available (otherwise text terms use LIKE)
+    """
+    groups, pending_or = [], False
+    result = Query()
+    for token in _TOKEN.findall(query):
+        if token == "OR":
+            pending_or = True
+            continue
+        if token.startswith(("(", "{")) or token.endswith((")", "}")) or token == "AND":
+            return None
+        term = _term(token, resolve_label)
+        if term is None:
+            return None
+        if pending_or and groups:
+            groups[-1].append(term)
+        else:
+            groups.append([term])
+        pending_or = False
+
+    match = []
+    for group in groups:
+        # Only terms every match must satisfy narrow the query: not those inside an OR group
+        required = group[0] if len(group) == 1 and not group[0].negate else None
+        if required is not None and required.after is not None:
+            result.after = required.after if result.after is None else max(result.after, required.after)
+        if required is not None and required.label:
+            result.labels.add(required.label)
+        result.ranked |= any(t.text and not t.negate for t in group)
+        if fts and all(t.fts and not t.negate for t in group):
+            match.append(group[0].fts if len(group) == 1 else "(" + " OR ".join(t.fts for t in group) + ")")
+            continue
+        parts = []
+        for term in group:
+            sql, params = _as_sql(term, fts)
+            parts.append(f"NOT ({sql})" if term.negate else sql)
+            result.params.extend(params)
+        result.where.append("(" + " OR ".join(parts) + ")")
+    asked = {t.label for group in groups for t in group if t.label and not t.negate}
+    for label in HIDDEN_LABELS:
+        if label not in asked:
+            result.where.append(f"m.labels NOT LIKE '%,{label},%'")
+    result.match = " AND ".join(match) or None
+    return result
+
+
+def search(conn: sqlite3.Connection, query: str, max_results: int = 10,
+           resolve_label=None, fts: bool = True) -> list[dict] | None:
+    """Run a Gmail query against the mirror. Returns rows, or None if untranslatable."""
+    parsed = translate(query, resolve_label, fts)
+    if parsed is None:
+        return None
+
+    params = []
+    if parsed.match:
+        sql = "SELECT m.* FROM messages_fts JOIN messages m ON m.rowid = messages_fts.rowid WHERE messages_fts MATCH ?"
+        params.append(parsed.match)
+    else:
+        sql = "SELECT m.* FROM messages m WHERE 1"
+    for condition in parsed.where:
+        sql += f" AND {condition}"
+    params.extend(parsed.params)
+
+    if parsed.match and parsed.ranked:
+        sql += f" ORDER BY bm25(messages_fts, {', '.join(map(str, WEIGHTS))}), m.date DESC"
+    else:
+        sql += " ORDER BY m.date DESC"
+    rows = conn.execute(sql + " LIMIT ?", (*params, max_results)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def _term(token: str, resolve_label) -> Term | None:
+    """Translate one query token, or None if unsupported."""
+    negate = token.startswith("-") and len(token) > 1
+    if negate:
+        token = token[1:]
+
+    op, sep, value = token.partition(":")
+    if not sep or not value or op.startswith('"'):
+        op, value = "", token
+    op = op.lower()
+    value = value.strip('"')
+    if not value:
+        return None
+
+    if op == "":
+        term = Term(fts=_phrase(value), sql=_like_any(), params=[f"%{value}%"] * 5, text=True)
+    elif op == "from":
+        term = Term(fts=f"sender : {_phrase(value)}", sql="m.sender LIKE ?", params=[f"%{value}%"])
+    elif op in ("to", "cc", "bcc"):
+        term = Term(fts=f"recipients : {_phrase(value)}", sql="m.recipients LIKE ?", params=[f"%{value}%"])
+    elif op == "subject":
+        term = Term(fts=f"subject : {_phrase(value)}", sql="m.subject LIKE ?", params=[f"%{value}%"], text=True)
+    elif op in ("after", "newer_than", "before", "older_than"):
+        moment = _parse_date(value) if op in ("after", "before") else _parse_age(value)
+        if moment is None:
+            return None
+        if op in ("after", "newer_than"):
+            term = Term(sql="m.date >= ?", params=[moment], after=moment)
+        else:
+            term = Term(sql="m.date < ?", params=[moment])
+    elif op == "is":
+        flags = {
+            "unread": "m.unread = 1",
+            "read": "m.unread = 0",
+            "starred": "m.labels LIKE '%,STARRED,%'",
+            "important": "m.labels LIKE '%,IMPORTANT,%'",
+        }
+        if value.lower() not in flags:
+            return None
+        term = Term(sql=flags[value.lower()])
+    elif op in ("in", "label"):
+        label = value.upper() if value.upper() in SYSTEM_LABELS else None
+        if label is None and op == "label":
+            label = (resolve_label(value) if resolve_label else None) or value
+        if label is None:
+            return None
+        term = Term(sql="m.labels LIKE ?", params=[f"%,{label},%"], label=label)
+    else:
+        return None
+
+    term.negate = negate
+    return term
+
+
+def _as_sql(term: Term, fts: bool) -> tuple[str, list]:
+    """SQL form of a term: an FTS subquery when indexed, else its LIKE fallback."""
+    if term.fts and fts:
+        return "m.rowid IN (SELECT rowid FROM messages_fts WHERE messages_fts MATCH ?)", [term.fts]
+    return term.sql, list(term.params)
+
+
+def _phrase(value: str) -> str:
+    """Quote a value as an FTS5 phrase."""
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _like_any() -> str:
+    columns = ("m.subject", "m.sender", "m.recipients", "m.snippet", "m.body")
+    return "(" + " OR ".join(f"{c} LIKE ?" for c in columns) + ")"
+
+
+def _parse_date(value: str) -> float | None:
+    """Gmail date (YYYY/MM/DD, YYYY-MM-DD or epoch seconds) to epoch seconds."""
+    if value.isdigit():
+        return float(value)
+    for fmt in ("%Y/%m/%d", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_age(value: str) -> float | None:
+    """Gmail relative age (3d, 2m, 1y) to an epoch-seconds cutoff."""
+    match = re.fullmatch(r"(\d+)([dmy])", value.lower())
+    if not match:
+        return None
+    days = int(match.group(1)) * {"d": 1, "m": 30, "y": 365}[match.group(2)]
+    return time.time() - days * 86400
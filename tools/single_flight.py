@@ -0,0 +1,150 @@
+"""
+Single-flight coalescing of identical provider reads.
+
+In host mode the pooled agents share one set of provider tools, and a CRM
+init runs its sub-agent next to the main agent, so the same
+read_inbox(last=10), get_today_events() or search_emails(...) is often
+asked for several times at the same moment. The result cache can't help
+there: none of those calls has finished yet, so each one misses and goes to
+the API. SingleFlight lets the first call go through and makes identical
+calls that arrive while it is in flight wait for it and share its result
+(or its exception):
+
+- calls are identical when method and arguments (defaults filled in) match
+- only reads are coalesced (the result cache's READS plus get_all_contacts)
+- a mutation starts new flights for the reads it can change
+  (result_cache.INVALIDATES), so a read asked for after a send never gets a
+  listing fetched before it
+- a call made from inside a flight's own thread runs directly
+
+Flights, coalesced calls per method and the provider time saved are kept in
+`stats()`; the agent logs them after each turn and the host reports them at
+GET /admin/queue.
+
+Usage:
+    from tools.single_flight import SingleFlight
+
+    flights = SingleFlight()
+    flights.attach(gmail)   # two threads calling gmail.read_inbox() at once → one API call
+"""
+
+import threading
+import time
+from collections import Counter
+
+from .result_cache import INVALIDATES, READS
+from .wrapping import wrap_method, call_arguments
+
+
+# Read methods whose concurrent identical calls share one request
+COALESCED = set(READS) | {"get_all_contacts"}
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "thread", "started")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.thread = threading.get_ident()
+        self.started = time.monotonic()
+
+
+class SingleFlight:
+    """Shares one in-flight call among identical concurrent calls."""
+
+    def __init__(self, methods=None):
+        self.methods = set(COALESCED if methods is None else methods)
+        self._flights = {}  # (method, generation, args) -> _Flight
+        self._generations = {}  # method -> bumped when a mutation starts
+        self._lock = threading.Lock()
+        self.flights = 0
+        self.coalesced = Counter()  # method -> calls that shared another call's flight
+        self.saved = 0.0
+
+    def call(self, method: str, params: dict, run):
+        """run() once for all identical (method, params) calls in flight at the same time."""
+        with self._lock:
+            key = (method, self._generations.get(method, 0), _args(params))
+            flight = self._flights.get(key)
+            leader = flight is None or flight.thread == threading.get_ident()
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.flights += 1
+            else:
+                self.coalesced[method] += 1
+
+        if not leader:
+            joined = time.monotonic()
+            flight.done.wait()
+            with self._lock:
+                self.saved += joined - flight.started
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = run()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def invalidate(self, methods):
+        """Don't let later calls of these methods join flights that are already running."""
+        with self._lock:
+            for method in methods:
+                self._generations[method] = self._generations.get(method, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            coalesced = sum(self.coalesced.values())
+            calls = self.flights + coalesced
+            return {
+                "calls": calls,
+                "flights": self.flights,
+                "coalesced": coalesced,
+                "coalesced_rate": coalesced / calls if calls else 0.0,
+                "by_method": dict(self.coalesced),
+                "saved_seconds": round(self.saved, 3),
+            }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (f"Single-flight: {s['coalesced']}/{s['calls']} calls coalesced ({s['coalesced_rate']:.0%}), "
+                f"saved {s['saved_seconds']:.1f}s of provider time")
+
+    # === Tool integration ===
+
+    def attach(self, tool):
+        """Coalesce the tool's reads and start new flights after its mutations."""
+
+        def read(name):
+            def around(original, *args, **kwargs):
+                params = call_arguments(original, args, kwargs)
+                return self.call(name, params, lambda: original(*args, **kwargs))
+            return around
+
+        def mutation(name):
+            def around(original, *args, **kwargs):
+                self.invalidate(INVALIDATES[name])
+                return original(*args, **kwargs)
+            return around
+
+        for name in self.methods:
+            wrap_method(tool, name, read(name))
+        for name in INVALIDATES:
+            wrap_method(tool, name, mutation(name))
+        tool.single_flight = self
+        return tool
+
+
+def _args(params: dict) -> tuple:
+    return tuple(sorted((name, repr(value)) for name, value in params.items()))
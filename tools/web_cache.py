@@ -0,0 +1,166 @@
+"""
+Persistent cache for WebFetch domain analysis.
+
+analyze_page fetches a site and summarizes it with an LLM. CRM init calls it
+for every business domain, so re-running /init analyzed the same companies
+again. DomainCache keeps the summaries in data/web_cache.db:
+
+- keyed by registrable domain, so https://www.acme.com, acme.com and
+  mail.acme.com share one entry (URLs with a path are not cached)
+- entries expire after `ttl`; definitive failures (the domain doesn't
+  resolve, or the site answers 4xx) are cached for `negative_ttl` so a dead
+  site isn't fetched again on every run. Timeouts, 429, 5xx and LLM errors
+  are raised uncached and retried next time.
+- at most `max_entries` domains, least recently used evicted first
+
+Usage:
+    from tools.web_cache import DomainCache
+
+    web = WebFetch()
+    DomainCache().attach(web)   # web.analyze_page(...) now checks the cache first
+"""
+
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .wrapping import wrap_method, call_arguments
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS domains (
+    domain TEXT PRIMARY KEY,
+    result TEXT,
+    ok INTEGER,
+    fetched_at REAL,
+    used_at REAL
+);
+CREATE INDEX IF NOT EXISTS domains_used ON domains(used_at);
+"""
+
+# Second-level labels under country codes that are registry suffixes (acme.co.uk, acme.com.au)
+SECOND_LEVEL = {"co", "com", "net", "org", "ac", "gov", "edu", "ne", "or", "go", "ltd", "plc"}
+
+
+def registrable_domain(url: str) -> str | None:
+    """The registrable domain of a bare domain or site URL, or None for URLs with a path.
+
+    Uses the common ccTLD second-level suffixes instead of the full public
+    suffix list, which is enough for company sites.
+    """
+    url = url.strip()
+    parts = urlsplit(url if "//" in url else f"//{url}")
+    if parts.path.strip("/") or parts.query:
+        return None
+    host = (parts.hostname or "").rstrip(".")
+    labels = host.split(".")
+    if len(labels) < 2 or not all(labels):
+        return None
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+# Client errors that say nothing about the site itself
+TRANSIENT_STATUSES = {408, 429}
+
+
+def definitive_failure(error: BaseException) -> bool:
+    """Whether a fetch error will recur on retry: DNS failure, or a 4xx other than 408/429."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, socket.gaierror):
+            return True
+        response = getattr(error, "response", None)  # httpx / requests HTTPStatusError
+        status = getattr(error, "status", None) or getattr(response, "status_code", None)
+        if isinstance(status, int):
+            return 400 <= status < 500 and status not in TRANSIENT_STATUSES
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class DomainCache:
+    """SQLite cache of analyze_page results per domain."""
+
+    def __init__(self, db_path: str = "data/web_cache.db", ttl: float = 30 * 86400,
+                 negative_ttl: float = 86400, max_entries: int = 5000):
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+        self._conn = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """Open the database on first use (so constructing a cache is free)."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, domain: str) -> tuple[bool, str] | None:
+        """(ok, result) for a fresh entry, or None if missing or expired."""
+        now = time.time()
+        with self._lock, self.db:
+            row = self.db.execute("SELECT * FROM domains WHERE domain = ?", (domain,)).fetchone()
+            if row is None:
+                return None
+            if now - row['fetched_at'] > (self.ttl if row['ok'] else self.negative_ttl):
+                self.db.execute("DELETE FROM domains WHERE domain = ?", (domain,))
+                return None
+            self.db.execute("UPDATE domains SET used_at = ? WHERE domain = ?", (now, domain))
+        return bool(row['ok']), row['result']
+
+    def put(self, domain: str, result: str, ok: bool = True):
+        now = time.time()
+        with self._lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO domains (domain, result, ok, fetched_at, used_at) VALUES (?, ?, ?, ?, ?)",
+                (domain, result, int(ok), now, now),
+            )
+            self.db.execute(
+                "DELETE FROM domains WHERE domain IN "
+                "(SELECT domain FROM domains ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM domains").fetchone()[0]
+
+    def attach(self, web):
+        """Serve web.analyze_page from the cache for bare domains and site roots."""
+
+        def analyze_page(original, *args, **kwargs):
+            domain = registrable_domain(call_arguments(original, args, kwargs)['url'])
+            if domain is None:
+                return original(*args, **kwargs)
+
+            cached = self.get(domain)
+            if cached is not None:
+                ok, result = cached
+                if not ok:
+                    raise RuntimeError(f"Could not analyze {domain} (cached failure): {result}")
+                return result
+
+            try:
+                result = original(*args, **kwargs)
+            except Exception as e:
+                if definitive_failure(e):
+                    self.put(domain, f"{type(e).__name__}: {e}", ok=False)
+                raise
+            self.put(domain, result)
+            return result
+
+        wrap_method(web, "analyze_page", analyze_page)
+        web.domain_cache = self
+        return web
@@ -0,0 +1,40 @@
+"""
+Method wrapping for provider tool instances.
+
+The agent registers every public, annotated method of a tool instance
+(Gmail, Outlook, calendars) as a tool. Layers such as the local mailbox
+mirror replace those methods on the instance so the agent, the CLI and
+the sub-agents all go through them, while the name, signature and
+docstring the LLM sees stay exactly the same.
+"""
+
+import functools
+import inspect
+import types
+
+
+def wrap_method(instance, name: str, around):
+    """Replace instance.<name> with a method that calls around(original, *args, **kwargs).
+
+    Returns the original bound method. Methods the instance does not have are
+    left alone and None is returned.
+    """
+    original = getattr(instance, name, None)
+    if original is None or not callable(original):
+        return None
+
+    func = getattr(original, "__func__", original)
+
+    @functools.wraps(func)
+    def method(self, *args, **kwargs):
+        return around(original, *args, **kwargs)
+
+    setattr(instance, name, types.MethodType(method, instance))
+    return original
+
+
+def call_arguments(method, args: tuple, kwargs: dict) -> dict:
+    """Bind a call to its method signature, with defaults filled in."""
+    bound = inspect.signature(method).bind(*args, **kwargs)
+    bound.apply_defaults()
+    return dict(bound.arguments)